@@ -67,6 +67,8 @@ class CheatAdmin(admin.ModelAdmin):
         "views_count",
         "downloads_count",
         "liked_percent",
+        "likes",
+        "dislikes",
         "created_at",
         "updated_at",
     )
@@ -76,6 +78,8 @@ class CheatAdmin(admin.ModelAdmin):
         "views_count",
         "downloads_count",
         "liked_percent",
+        "likes",
+        "dislikes",
         "created_at",
         "updated_at",
     )
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class CheatsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'cheats'
+
+    def ready(self):
+        from . import signals  # noqa
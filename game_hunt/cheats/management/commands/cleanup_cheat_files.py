@@ -0,0 +1,71 @@
+import posixpath
+from datetime import timedelta
+
+from django.core.files import File
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from cheats.models import Cheat
+from cheats.storage import cheat_storage, digest_of
+
+ROOT = "cheat_files"
+
+
+def _walk(storage, path):
+    dirs, files = storage.listdir(path)
+    for name in files:
+        yield posixpath.join(path, name)
+    for name in dirs:
+        yield from _walk(storage, posixpath.join(path, name))
+
+
+class Command(BaseCommand):
+    help = "Удаляет файлы читов, на которые не ссылается ни один чит; --adopt переносит старые файлы в хранилище по хешу"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--min-age", type=int, default=24, metavar="HOURS",
+                            help="Не трогать файлы моложе HOURS часов: их чит может ещё сохраняться")
+        parser.add_argument("--adopt", action="store_true",
+                            help="Сначала перенести файлы, загруженные под исходными именами, в cheat_files/ab/cd/<sha256>")
+        parser.add_argument("--dry-run", action="store_true", help="Только показать, что будет сделано")
+
+    def handle(self, *args, **options):
+        if options["adopt"]:
+            self._adopt(options["dry_run"])
+
+        if not cheat_storage.exists(ROOT):
+            return
+        referenced = set(Cheat.objects.exclude(cheat_file="").values_list("cheat_file", flat=True))
+        threshold = timezone.now() - timedelta(hours=options["min_age"])
+
+        removed = 0
+        for name in _walk(cheat_storage, ROOT):
+            if name in referenced or cheat_storage.get_modified_time(name) > threshold:
+                continue
+            removed += 1
+            if options["dry_run"]:
+                self.stdout.write(f"  {name}")
+            else:
+                cheat_storage.delete(name)
+
+        verb = "К удалению" if options["dry_run"] else "Удалено"
+        self.stdout.write(self.style.SUCCESS(f"{verb} файлов без ссылок: {removed}"))
+
+    def _adopt(self, dry_run):
+        legacy = Cheat.objects.filter(sha256="").exclude(cheat_file="").exclude(cheat_file__isnull=True)
+        adopted = 0
+        for pk, name in legacy.values_list("pk", "cheat_file").iterator():
+            if dry_run:
+                adopted += 1
+                continue
+            try:
+                with cheat_storage.open(name, "rb") as fp:
+                    new_name = cheat_storage.save(posixpath.join(ROOT, posixpath.basename(name)), File(fp))
+            except FileNotFoundError:
+                self.stderr.write(f"Нет файла {name} (чит #{pk})")
+                continue
+            # update() в обход сигналов: старый файл остаётся без ссылок и уходит при очистке ниже
+            adopted += Cheat.objects.filter(pk=pk, cheat_file=name).update(
+                cheat_file=new_name, sha256=digest_of(new_name),
+            )
+        self.stdout.write(f"Перенесено в хранилище по хешу: {adopted}")
@@ -0,0 +1,42 @@
+from django.db import migrations, models
+from django.db.models import (
+    Count, ExpressionWrapper, F, FloatField, IntegerField, OuterRef, Subquery, Value,
+)
+from django.db.models.functions import Cast, Coalesce, NullIf, Round
+
+
+def backfill_vote_counters(apps, schema_editor):
+    Cheat = apps.get_model('cheats', 'Cheat')
+    CheatVote = apps.get_model('cheats', 'CheatVote')
+
+    def votes_count(value):
+        counted = (CheatVote.objects.filter(cheat=OuterRef('pk'), value=value)
+                   .order_by().values('cheat').annotate(c=Count('pk')).values('c'))
+        return Coalesce(Subquery(counted, output_field=IntegerField()), Value(0))
+
+    Cheat.objects.update(likes=votes_count(1), dislikes=votes_count(-1))
+    # liked_percent из уже посчитанных счётчиков (отдельной UPDATE - в одной видны старые значения)
+    ratio = ExpressionWrapper(F('likes') * Value(100.0) / NullIf(F('likes') + F('dislikes'), Value(0)),
+                              output_field=FloatField())
+    Cheat.objects.update(liked_percent=Coalesce(Cast(Round(ratio), IntegerField()), Value(0)))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cheats', '0002_alter_cheat_options_remove_cheat_code_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cheat',
+            name='likes',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Лайки'),
+        ),
+        migrations.AddField(
+            model_name='cheat',
+            name='dislikes',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Дизлайки'),
+        ),
+        migrations.RunPython(backfill_vote_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.8 on 2026-10-18 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cheats', '0003_cheat_likes_dislikes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='cheat',
+            index=models.Index(fields=['is_published', '-updated_at'], name='cheat_pub_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='cheat',
+            index=models.Index(fields=['author', '-updated_at'], name='cheat_author_updated_idx'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.8 on 2026-10-18 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cheats', '0005_cheat_is_rejected'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='cheat',
+            index=models.Index(condition=models.Q(('is_published', True)), fields=['-created_at'], name='cheat_pub_new_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='cheat',
+            index=models.Index(condition=models.Q(('is_published', True)), fields=['-downloads_count', '-views_count'], name='cheat_pub_popular_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='cheatcomment',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['cheat', '-created_at'], name='cheatcomment_live_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='cheatcomment',
+            index=models.Index(fields=['user', '-created_at'], name='cheatcomment_user_idx'),
+        ),
+    ]
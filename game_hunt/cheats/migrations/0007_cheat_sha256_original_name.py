@@ -0,0 +1,46 @@
+# Generated by Django 5.2.8 on 2026-10-18 12:00
+
+import os
+
+import cheats.storage
+from django.db import migrations, models
+
+
+def fill_original_name(apps, schema_editor):
+    # старые файлы лежат под исходными именами; хеш им проставит cleanup_cheat_files --adopt
+    Cheat = apps.get_model('cheats', 'Cheat')
+    batch = []
+    for cheat in Cheat.objects.exclude(cheat_file='').exclude(cheat_file__isnull=True).only('cheat_file').iterator():
+        cheat.original_name = os.path.basename(cheat.cheat_file.name)[:255]
+        batch.append(cheat)
+        if len(batch) >= 500:
+            Cheat.objects.bulk_update(batch, ['original_name'])
+            batch = []
+    if batch:
+        Cheat.objects.bulk_update(batch, ['original_name'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cheats', '0006_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='cheat',
+            name='cheat_file',
+            field=models.FileField(blank=True, null=True, storage=cheats.storage.ContentAddressedStorage(), upload_to='cheat_files/', verbose_name='Файл чита/тренера'),
+        ),
+        migrations.AddField(
+            model_name='cheat',
+            name='sha256',
+            field=models.CharField(blank=True, default='', editable=False, max_length=64, verbose_name='SHA-256'),
+        ),
+        migrations.AddField(
+            model_name='cheat',
+            name='original_name',
+            field=models.CharField(blank=True, default='', editable=False, max_length=255, verbose_name='Имя файла'),
+        ),
+        migrations.RunPython(fill_original_name, migrations.RunPython.noop),
+    ]
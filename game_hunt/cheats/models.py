@@ -1,9 +1,13 @@
+import os
+
 from django.db import models
 from django.contrib.auth.models import User
 from django.db.models import Count, Q
+from core.votes import VoteCountsMixin, liked_percent_value
 from slugify import slugify
 
 from games.models import Game
+from .storage import cheat_storage, digest_of
 
 
 def unique_slugify(instance, base: str, slug_field: str = "slug"):
@@ -16,7 +20,7 @@ def unique_slugify(instance, base: str, slug_field: str = "slug"):
     return slug
 
 
-class Cheat(models.Model):
+class Cheat(VoteCountsMixin, models.Model):
     # ⚠️ platform оставь свои choices (если они уже есть в проекте) — здесь пример:
     PLATFORM_CHOICES = (
         ("pc", "PC"),
@@ -66,21 +70,40 @@ class Cheat(models.Model):
 
     cheat_file = models.FileField(
         upload_to="cheat_files/",
+        storage=cheat_storage,
         blank=True,
         null=True,
         verbose_name="Файл чита/тренера",
     )
+    # файл лежит под своим хешем (cheats.storage), исходное имя - для скачивания
+    sha256 = models.CharField(max_length=64, blank=True, default="", editable=False, verbose_name="SHA-256")
+    original_name = models.CharField(max_length=255, blank=True, default="", editable=False,
+                                     verbose_name="Имя файла")
 
     is_published = models.BooleanField(default=True, verbose_name="Опубликован")
+    # отклонён модератором: не публикуется и не висит в очереди, пока автор не исправит
+    is_rejected = models.BooleanField(default=False, editable=False, verbose_name="Отклонён")
 
     views_count = models.PositiveIntegerField(default=0, verbose_name="Просмотры")
     liked_percent = models.PositiveSmallIntegerField(blank=True, default=0, verbose_name="Понравилось")
+    # Денормализованные счётчики голосов, двигаются сигналами голосов (core.votes)
+    likes = models.PositiveIntegerField(default=0, editable=False, verbose_name="Лайки")
+    dislikes = models.PositiveIntegerField(default=0, editable=False, verbose_name="Дизлайки")
     downloads_count = models.PositiveIntegerField(default=0, verbose_name="Скачивания")
 
     class Meta:
         verbose_name = "чит"
         verbose_name_plural = "читы"
         ordering = ["-updated_at"]
+        # админ-панель и очередь модерации: фильтр по статусу/автору + сортировка по updated_at
+        indexes = [
+            models.Index(fields=["is_published", "-updated_at"], name="cheat_pub_updated_idx"),
+            models.Index(fields=["author", "-updated_at"], name="cheat_author_updated_idx"),
+            # публичный список: только опубликованные (частичные индексы)
+            models.Index(fields=["-created_at"], condition=models.Q(is_published=True), name="cheat_pub_new_idx"),
+            models.Index(fields=["-downloads_count", "-views_count"], condition=models.Q(is_published=True),
+                         name="cheat_pub_popular_idx"),
+        ]
 
     def __str__(self):
         return f"{self.title} — {self.game}"
@@ -89,18 +112,28 @@ class Cheat(models.Model):
         if not self.slug:
             base = slugify(self.title)
             self.slug = unique_slugify(self, base)
+        if self.cheat_file and not self.cheat_file._committed:
+            # новый файл: исходное имя запоминаем до того, как хранилище заменит его хешем
+            self.original_name = os.path.basename(self.cheat_file.name)[:255]
+            self.cheat_file.save(self.cheat_file.name, self.cheat_file.file, save=False)
+        if not self.cheat_file:
+            self.original_name = ""
+        self.sha256 = digest_of(self.cheat_file.name if self.cheat_file else "")
         super().save(*args, **kwargs)
 
-    def recalc_liked_percent(self):
-        votes = self.votes.all()
+    @property
+    def download_name(self):
+        return self.original_name or os.path.basename(self.cheat_file.name)
 
-        agg = votes.aggregate(
-            total=Count("id"),
+    def recalc_liked_percent(self):
+        # Полный пересчёт по всем голосам (сверка); обычно счётчики двигает core.votes
+        agg = self.votes.aggregate(
             likes=Count("id", filter=Q(value=CheatVote.LIKE)),
+            dislikes=Count("id", filter=Q(value=CheatVote.DISLIKE)),
         )
-        total = agg["total"] or 0
-        self.liked_percent = round((agg["likes"] / total) * 100) if total > 0 else 0
-        self.save(update_fields=["liked_percent"])
+        self.likes, self.dislikes = agg["likes"], agg["dislikes"]
+        self.liked_percent = liked_percent_value(self.likes, self.dislikes)
+        self.save(update_fields=["likes", "dislikes", "liked_percent"])
 
 
 class CheatVote(models.Model):
@@ -138,6 +171,13 @@ class CheatComment(models.Model):
         verbose_name = "комментарий к читу"
         verbose_name_plural = "комментарии к читам"
         ordering = ["-created_at"]
+        indexes = [
+            # лента комментариев на странице: только неудалённые (частичный индекс)
+            models.Index(fields=["cheat", "-created_at"], condition=models.Q(is_deleted=False),
+                         name="cheatcomment_live_idx"),
+            # ограничение "1 комментарий в минуту": последний комментарий пользователя
+            models.Index(fields=["user", "-created_at"], name="cheatcomment_user_idx"),
+        ]
 
     def __str__(self):
         return f"Комментарий от {self.user} к {self.cheat}"
\ No newline at end of file
@@ -0,0 +1,22 @@
+from django.db.models.signals import post_save, post_delete, pre_save
+from django.dispatch import receiver
+from core import votes
+from .models import Cheat, CheatVote
+
+
+# Счётчики лайков чита двигаются на дельту голоса (core.votes), без пересчёта всех голосов
+
+@receiver(pre_save, sender=CheatVote)
+def remember_prev_cheat_vote(sender, instance, **kwargs):
+    votes.remember_prev_vote(instance)
+
+
+@receiver(post_save, sender=CheatVote)
+def cheat_vote_saved(sender, instance, **kwargs):
+    votes.apply_vote_change(Cheat, instance.cheat_id, getattr(instance, "_prev_vote_value", None), instance.value)
+
+
+@receiver(post_delete, sender=CheatVote)
+def cheat_vote_deleted(sender, instance, **kwargs):
+    votes.apply_vote_change(Cheat, instance.cheat_id, instance.value, None)
+
@@ -0,0 +1,48 @@
+"""
+Хранилище файлов читов по содержимому: cheat_files/ab/cd/<sha256>.
+
+Один и тот же трейнер, загруженный к нескольким играм/платформам, лежит на диске один раз;
+имя для скачивания хранится в Cheat.original_name, хеш - в Cheat.sha256 (он же строгий ETag).
+Счётчик ссылок - сами записи Cheat. Файлы без ссылок удаляет только команда cleanup_cheat_files
+и только старше --min-age: одинаковую загрузку, чья запись ещё не закоммичена, по ссылкам не видно.
+Поэтому повторная загрузка того же содержимого обновляет время изменения общего файла.
+"""
+import hashlib
+import os
+import posixpath
+import re
+
+from django.core.files.storage import FileSystemStorage
+
+DIGEST_RE = re.compile(r"^[0-9a-f]{64}$")
+
+
+def file_digest(content):
+    h = hashlib.sha256()
+    for chunk in content.chunks():
+        h.update(chunk)
+    return h.hexdigest()
+
+
+def digest_of(name):
+    """SHA-256 из имени файла в хранилище; "" для старых файлов, лежащих под исходными именами."""
+    base = posixpath.basename(name or "")
+    return base if DIGEST_RE.match(base) else ""
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    def _save(self, name, content):
+        digest = file_digest(content)
+        target = posixpath.join(posixpath.dirname(name), digest[:2], digest[2:4], digest)
+        # такой файл уже есть - второй раз не пишем, только "освежаем" его для --min-age очистки
+        if self.exists(target):
+            try:
+                os.utime(self.path(target))
+                return target
+            except FileNotFoundError:
+                # очистка успела удалить файл между проверкой и касанием - пишем заново
+                pass
+        return super()._save(target, content)
+
+
+cheat_storage = ContentAddressedStorage()
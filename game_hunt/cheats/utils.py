@@ -0,0 +1,148 @@
+"""
+Отдача файлов читов: Range / If-Range, ETag и Last-Modified, условные запросы (304).
+
+CHEATS_SENDFILE - кому отдавать байты:
+    ""           - сам Django (StreamingHttpResponse, докачка через Range);
+    "x-accel"    - nginx: X-Accel-Redirect на internal-location CHEATS_SENDFILE_PREFIX + имя файла;
+    "x-sendfile" - Apache mod_xsendfile / lighttpd: X-Sendfile с путём на диске.
+В режимах прокси Range, докачку и передачу делает прокси, воркер освобождается сразу.
+Проверка доступа и счётчик скачиваний в любом режиме остаются во view.
+"""
+import mimetypes
+import re
+
+from django.conf import settings
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import content_disposition_header, http_date, parse_http_date_safe, quote_etag
+
+CHUNK_SIZE = 64 * 1024
+
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def file_validators(field_file, digest=""):
+    """
+    (ETag, Last-Modified как timestamp или None, размер).
+    ETag - хеш содержимого (digest), а для файлов без хеша - по размеру и времени изменения.
+    """
+    storage, name = field_file.storage, field_file.name
+    size = storage.size(name)
+    try:
+        modified = int(storage.get_modified_time(name).timestamp())
+    except NotImplementedError:
+        modified = None
+    return quote_etag(digest or f"{modified or 0:x}-{size:x}"), modified, size
+
+
+def parse_range(header, size):
+    """
+    (start, end) включительно для Range: bytes=a-b / a- / -n.
+    None - заголовка нет или он не из одного диапазона (отдаём файл целиком);
+    False - диапазон вне файла (416).
+    """
+    match = RANGE_RE.match(header.replace(" ", "")) if header else None
+    if not match or not any(match.groups()):
+        return None
+    first, last = match.groups()
+    if not first:
+        # последние n байт
+        length = int(last)
+        if not length:
+            return False
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return False
+    return start, end
+
+
+def _if_range_matches(request, etag, modified):
+    value = request.META.get("HTTP_IF_RANGE")
+    if not value:
+        return True
+    if value.startswith(("W/", '"')):
+        # слабый ETag для If-Range не подходит
+        return value == etag
+    return modified is not None and parse_http_date_safe(value) == modified
+
+
+def _chunks(storage, name, start, length):
+    # файл открывается при первой итерации: ответ, который так и не отдали (429), дескриптор не держит
+    with storage.open(name, "rb") as fp:
+        fp.seek(start)
+        while length > 0:
+            data = fp.read(min(CHUNK_SIZE, length))
+            if not data:
+                break
+            length -= len(data)
+            yield data
+
+
+def _sendfile_response(field_file):
+    mode = getattr(settings, "CHEATS_SENDFILE", "")
+    if mode == "x-accel":
+        response = HttpResponse()
+        response["X-Accel-Redirect"] = getattr(settings, "CHEATS_SENDFILE_PREFIX", "/protected/") + field_file.name
+        return response
+    if mode == "x-sendfile":
+        response = HttpResponse()
+        response["X-Sendfile"] = field_file.path
+        return response
+    return None
+
+
+def serve_file(request, field_file, filename, digest=""):
+    """Ответ со скачиванием field_file под именем filename: 200, 206, 304/412 или 416."""
+    etag, modified, size = file_validators(field_file, digest)
+
+    # If-None-Match / If-Modified-Since / If-Match / If-Unmodified-Since
+    conditional = get_conditional_response(request, etag=etag, last_modified=modified)
+    if conditional is not None:
+        return conditional
+
+    response = _sendfile_response(field_file)
+    if response is None:
+        byte_range = None
+        if _if_range_matches(request, etag, modified):
+            byte_range = parse_range(request.META.get("HTTP_RANGE"), size)
+
+        if byte_range is False:
+            response = HttpResponse(status=416)
+            response["Content-Range"] = f"bytes */{size}"
+            return response
+
+        start, end = byte_range or (0, size - 1)
+        length = max(end - start + 1, 0)
+        response = StreamingHttpResponse(_chunks(field_file.storage, field_file.name, start, length))
+        if byte_range:
+            response.status_code = 206
+            response["Content-Range"] = f"bytes {start}-{end}/{size}"
+        response["Content-Length"] = str(length)
+        response["Accept-Ranges"] = "bytes"
+
+    response["Content-Type"] = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+    response["Content-Disposition"] = content_disposition_header(True, filename)
+    response["ETag"] = etag
+    if modified is not None:
+        response["Last-Modified"] = http_date(modified)
+    return response
+
+
+def is_new_download(request, response):
+    """
+    Скачивание с начала файла: докачка, 304 и ошибки новым скачиванием не считаются.
+    Докачку определяем по Range запроса, а не по статусу: в режимах прокси Range обрабатывает прокси
+    и view всегда отвечает 200.
+    """
+    if response.status_code not in (200, 206):
+        return False
+    match = RANGE_RE.match(request.META.get("HTTP_RANGE", "").replace(" ", ""))
+    if not match or not any(match.groups()):
+        return True
+    # If-Range не совпал - файл отдаётся целиком
+    if not _if_range_matches(request, response.get("ETag"), parse_http_date_safe(response.get("Last-Modified"))):
+        return True
+    first = match.group(1)
+    return bool(first) and int(first) == 0
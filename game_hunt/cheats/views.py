@@ -1,16 +1,16 @@
-from datetime import timedelta
-import os
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required, user_passes_test
-from django.db.models import F, Q
-from django.http import JsonResponse, Http404, FileResponse, HttpResponseForbidden
+from django.db.models import Q
+from django.http import JsonResponse, Http404, HttpResponseForbidden
 from django.shortcuts import get_object_or_404, redirect, render
 from django.template.loader import render_to_string
-from django.utils import timezone
 from django.views.decorators.http import require_POST
 from django.conf import settings
 from games.utils import paginate_games
+from core.search import search_ids
+from core import counters, pagecache, ratelimit
 from .models import Cheat, CheatVote, CheatComment
+from .utils import serve_file, is_new_download
 from .forms import CheatFormAdminCreate, CheatFormAdminEdit, CheatCommentForm, CheatFormStaffCreateForGame
 from games.models import Game
 
@@ -19,6 +19,7 @@ def staff_check(u):
     return u.is_authenticated and (u.is_staff or u.is_superuser)
 
 
+@pagecache.cache_anonymous("cheats", "games")
 def cheat_list(request):
     qs = (
         Cheat.objects
@@ -26,15 +27,20 @@ def cheat_list(request):
         .filter(is_published=True)
     )
 
+    # поиск по игре, названию чита и автору - через единый индекс core.search
     game_search = request.GET.get("game_search", "").strip()
     if game_search:
-        qs = qs.filter(
-            Q(game__title__icontains=game_search) |
-            Q(game__slug__icontains=game_search) |
-            Q(title__icontains=game_search) |  # название чита
-            Q(author__username__icontains=game_search) |
-            Q(author__profile__nickname__icontains=game_search)
-        )
+        found_ids = search_ids("cheat", game_search)
+        if found_ids is not None:
+            qs = qs.filter(pk__in=found_ids)
+        else:
+            qs = qs.filter(
+                Q(game__title__icontains=game_search) |
+                Q(game__slug__icontains=game_search) |
+                Q(title__icontains=game_search) |  # название чита
+                Q(author__username__icontains=game_search) |
+                Q(author__profile__nickname__icontains=game_search)
+            )
 
     sort = request.GET.get("sort", "new")
     if sort == "popular":
@@ -46,6 +52,7 @@ def cheat_list(request):
 
     params = request.GET.copy()
     params.pop("page", None)
+    params.pop("cursor", None)
     extra_query = params.urlencode()
 
     return render(request, "cheats/cheat_list.html", {
@@ -71,7 +78,7 @@ def cheat_detail(request, slug):
     # +1 просмотр за сессию
     viewed = request.session.get("viewed_cheats", [])
     if cheat.id not in viewed:
-        Cheat.objects.filter(pk=cheat.id).update(views_count=F("views_count") + 1)
+        counters.increment(Cheat, cheat.id, "views_count")
         viewed.append(cheat.id)
         request.session["viewed_cheats"] = viewed
 
@@ -80,7 +87,7 @@ def cheat_detail(request, slug):
         .select_related("user", "user__profile")
         .order_by("-created_at")
     )
-    cheat_filename = os.path.basename(cheat.cheat_file.name) if cheat.cheat_file else ""
+    cheat_filename = cheat.download_name if cheat.cheat_file else ""
 
     user_vote = None
     if request.user.is_authenticated:
@@ -174,6 +181,7 @@ def cheat_delete(request, slug):
 
 
 @login_required
+@ratelimit.limit("vote", methods=("POST",))
 def cheat_vote(request, slug):
     cheat = get_object_or_404(Cheat, slug=slug)
 
@@ -192,8 +200,7 @@ def cheat_vote(request, slug):
         defaults={"value": vote_value},
     )
 
-    # пересчитать liked_percent
-    cheat.recalc_liked_percent()
+    # likes/dislikes/liked_percent обновляет сигнал голоса (cheats.signals)
 
     if request.headers.get("x-requested-with") == "XMLHttpRequest":
         return JsonResponse({"success": True, "value": vote_value})
@@ -211,20 +218,10 @@ def cheat_add_comment(request, slug):
     if not text:
         return JsonResponse({"error": "Комментарий пустой"}, status=400)
 
-    # 1 раз в минуту (как walkthroughs)
-    last_comment = (
-        CheatComment.objects
-        .filter(user=request.user, cheat=cheat)
-        .order_by("-created_at")
-        .first()
-    )
-    if last_comment:
-        delta = timezone.now() - last_comment.created_at
-        if delta < timedelta(minutes=1):
-            seconds_left = 60 - int(delta.total_seconds())
-            return JsonResponse({
-                "error": f"Можно комментировать раз в минуту. Подождите {seconds_left} сек."
-            }, status=429)
+    # ограничение частоты (как walkthroughs)
+    retry_after = ratelimit.check(request, "comment", scope="cheats")
+    if retry_after:
+        return ratelimit.limited_response(request, retry_after, f"Можно комментировать не так часто. Подождите {retry_after} сек.")
 
     comment = CheatComment.objects.create(
         cheat=cheat,
@@ -297,11 +294,20 @@ def cheat_download(request, slug):
     if not cheat.cheat_file:
         raise Http404("Файл не найден")
 
+    # Range/ETag/304 и, если настроено, передача байтов прокси (CHEATS_SENDFILE)
+    response = serve_file(request, cheat.cheat_file, cheat.download_name, digest=cheat.sha256)
+    if not is_new_download(request, response):
+        return response
+
+    # лимит (RATE_LIMITS["download"]) - только на новое полное скачивание: докачка и 304 жетон не тратят
+    retry_after = ratelimit.check(request, "download")
+    if retry_after:
+        return ratelimit.limited_response(request, retry_after)
+
     downloaded = request.session.get("downloaded_cheats", [])
     if cheat.id not in downloaded:
-        Cheat.objects.filter(pk=cheat.id).update(downloads_count=F("downloads_count") + 1)
+        counters.increment(Cheat, cheat.id, "downloads_count")
         downloaded.append(cheat.id)
         request.session["downloaded_cheats"] = downloaded
 
-    filename = os.path.basename(cheat.cheat_file.name)
-    return FileResponse(cheat.cheat_file.open("rb"), as_attachment=True, filename=filename)
\ No newline at end of file
+    return response
\ No newline at end of file
@@ -1,3 +1,24 @@
 from django.contrib import admin
 
-# Register your models here.
+from . import jobs
+from .models import Job, DeadJob
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ("id", "name", "attempts", "run_at", "locked_by", "created_at")
+    list_filter = ("name",)
+    readonly_fields = ("attempts", "locked_at", "locked_by", "last_error", "created_at")
+
+
+@admin.register(DeadJob)
+class DeadJobAdmin(admin.ModelAdmin):
+    list_display = ("id", "name", "attempts", "created_at", "failed_at")
+    list_filter = ("name",)
+    readonly_fields = ("name", "payload", "attempts", "last_error", "created_at", "failed_at")
+    actions = ("requeue",)
+
+    @admin.action(description="Вернуть в очередь")
+    def requeue(self, request, queryset):
+        count = jobs.requeue(queryset)
+        self.message_user(request, f"Возвращено в очередь: {count}")
@@ -0,0 +1,229 @@
+"""
+Подсказки при наборе (autocomplete): игры, разработчики, издатели и ники пользователей.
+
+Индекс живёт в памяти процесса: отсортированный список ключей, поиск по префиксу - bisect,
+поэтому запрос подсказок не обращается к БД и на десятках тысяч записей укладывается в доли миллисекунды.
+Ключ строится для каждого слова названия ("dark souls" -> "dark souls", "souls"),
+так что "sou" находит и "Dark Souls".
+
+Актуальность:
+- в своём процессе сигналы (core.signals) правят индекс точечно через update()/remove();
+- другие процессы узнают об изменениях по счётчику версии в кеше (VERSION_KEY)
+  и перестраивают свой индекс лениво, при следующем запросе.
+"""
+import threading
+import time
+from bisect import bisect_left, insort
+from urllib.parse import urlencode
+
+from django.core.cache import cache
+from django.urls import reverse
+
+from games.models import Game, Developer, Publisher
+from users.models import Profile
+
+VERSION_KEY = "autocomplete:version"
+# Как часто (сек) сверяться с версией в кеше - чтобы не ходить в общий кеш на каждое нажатие клавиши
+VERSION_CHECK_INTERVAL = 5
+
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 20
+MIN_QUERY_LENGTH = 2
+# Сколько ключей максимум просматриваем на один запрос (у частых префиксов совпадений тысячи)
+MAX_SCAN = 300
+
+KINDS = ("game", "developer", "publisher", "user")
+
+
+def normalize(text):
+    return " ".join((text or "").casefold().replace("ё", "е").split())
+
+
+def _keys(label):
+    # ключ на каждое слово: полное название + все его "хвосты"; позиция нужна для ранжирования
+    words = normalize(label).split()
+    return [(" ".join(words[i:]), i) for i in range(len(words))]
+
+
+class PrefixIndex:
+    def __init__(self):
+        # (ключ, позиция слова, тип, id) - отсортировано, поиск через bisect
+        self._keys = []
+        # (тип, id) -> (название, is_adult, аргумент для url)
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _add(self, kind, pk, label, is_adult, url_arg):
+        self._entries[(kind, pk)] = (label, is_adult, url_arg)
+        for key, pos in _keys(label):
+            insort(self._keys, (key, pos, kind, pk))
+
+    def _remove(self, kind, pk):
+        entry = self._entries.pop((kind, pk), None)
+        if entry is None:
+            return
+        for key, pos in _keys(entry[0]):
+            i = bisect_left(self._keys, (key, pos, kind, pk))
+            if i < len(self._keys) and self._keys[i] == (key, pos, kind, pk):
+                del self._keys[i]
+
+    def put(self, kind, pk, label, is_adult=False, url_arg=None):
+        with self._lock:
+            self._remove(kind, pk)
+            if label:
+                self._add(kind, pk, label, is_adult, url_arg)
+
+    def delete(self, kind, pk):
+        with self._lock:
+            self._remove(kind, pk)
+
+    def load(self, rows):
+        # Первичная загрузка: собираем ключи и сортируем один раз (insort на каждую запись - O(n^2))
+        keys = []
+        for kind, pk, label, is_adult, url_arg in rows:
+            if not label:
+                continue
+            self._entries[(kind, pk)] = (label, is_adult, url_arg)
+            keys.extend((key, pos, kind, pk) for key, pos in _keys(label))
+        keys.sort()
+        self._keys = keys
+
+    def lookup(self, query, limit=DEFAULT_LIMIT, kinds=None, adult_allowed=True):
+        prefix = normalize(query)
+        if not prefix:
+            return []
+
+        keys = self._keys
+        seen = set()
+        found = []
+        i = bisect_left(keys, (prefix,))
+        end = min(len(keys), i + MAX_SCAN)
+        while i < end and keys[i][0].startswith(prefix):
+            key, pos, kind, pk = keys[i]
+            i += 1
+            if (kind, pk) in seen or (kinds and kind not in kinds):
+                continue
+            entry = self._entries.get((kind, pk))
+            if entry is None or (entry[1] and not adult_allowed):
+                continue
+            seen.add((kind, pk))
+            found.append((pos > 0, len(entry[0]), kind, pk, entry))
+
+        # Сначала совпадения с начала названия, затем более короткие названия
+        found.sort(key=lambda item: (item[0], item[1]))
+        return [(kind, pk, entry) for _, _, kind, pk, entry in found[:limit]]
+
+
+# ---- Источники данных ----
+
+def _rows():
+    games = Game.objects.values_list("pk", "title", "is_adult_only", "slug")
+    for pk, title, is_adult, slug in games.iterator(chunk_size=2000):
+        yield "game", pk, title, is_adult, slug
+    for kind, model in (("developer", Developer), ("publisher", Publisher)):
+        for pk, name in model.objects.values_list("pk", "name").iterator(chunk_size=2000):
+            yield kind, pk, name, False, name
+    for pk, nickname in Profile.objects.values_list("pk", "nickname").iterator(chunk_size=2000):
+        yield "user", pk, nickname, False, pk
+
+
+def row_of(obj):
+    if isinstance(obj, Game):
+        return "game", obj.pk, obj.title, obj.is_adult_only, obj.slug
+    if isinstance(obj, Developer):
+        return "developer", obj.pk, obj.name, False, obj.name
+    if isinstance(obj, Publisher):
+        return "publisher", obj.pk, obj.name, False, obj.name
+    if isinstance(obj, Profile):
+        return "user", obj.pk, obj.nickname, False, obj.pk
+    return None
+
+
+def url_for(kind, url_arg):
+    if kind == "game":
+        return reverse("game_detail", args=[url_arg])
+    if kind == "user":
+        return reverse("profile-view", args=[url_arg])
+    # разработчик/издатель входят в поисковый документ игр - ведём в каталог с поиском по имени
+    return f"{reverse('game_list')}?{urlencode({'search': url_arg})}"
+
+
+# ---- Индекс процесса ----
+
+_index = None
+_version = None
+_checked_at = 0.0
+_build_lock = threading.Lock()
+
+
+def _cache_version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, 1, None)
+        version = cache.get(VERSION_KEY, 1)
+    return version
+
+
+def get_index():
+    global _index, _version, _checked_at
+    now = time.monotonic()
+    if _index is not None and now - _checked_at < VERSION_CHECK_INTERVAL:
+        return _index
+
+    version = _cache_version()
+    _checked_at = now
+    if _index is not None and version == _version:
+        return _index
+
+    with _build_lock:
+        if _index is None or version != _version:
+            index = PrefixIndex()
+            index.load(_rows())
+            # новый индекс подменяем целиком - параллельные запросы дочитывают старый
+            _index, _version = index, version
+    return _index
+
+
+def _bump_version():
+    global _version
+    try:
+        version = cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.add(VERSION_KEY, 1, None)
+        version = cache.get(VERSION_KEY, 1)
+    # Свои изменения уже внесены точечно - принимаем новую версию без перестройки,
+    # если между нами никто больше не менял данные
+    if _version is not None and version == _version + 1:
+        _version = version
+
+
+def update(obj):
+    row = row_of(obj)
+    if row is None:
+        return
+    if _index is not None:
+        _index.put(*row)
+    _bump_version()
+
+
+def remove(obj):
+    row = row_of(obj)
+    if row is None:
+        return
+    if _index is not None:
+        _index.delete(row[0], row[1])
+    _bump_version()
+
+
+def suggest(query, limit=DEFAULT_LIMIT, kinds=None, adult_allowed=True):
+    """Подсказки для строки query: список словарей type/id/label/url."""
+    if len(normalize(query)) < MIN_QUERY_LENGTH:
+        return []
+    hits = get_index().lookup(query, limit=limit, kinds=kinds, adult_allowed=adult_allowed)
+    return [
+        {"type": kind, "id": pk, "label": label, "url": url_for(kind, url_arg)}
+        for kind, pk, (label, _, url_arg) in hits
+    ]
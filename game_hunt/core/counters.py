@@ -0,0 +1,154 @@
+"""
+Буферизованные счётчики просмотров и скачиваний.
+
+Вместо UPDATE ... SET views_count = views_count + 1 на каждый первый просмотр за сессию
+запрос дописывает строку в spool-файл своего процесса (журнал упреждающей записи):
+
+    <app_label.model> <поле> <id> <приращение>
+
+Команда flush_counters периодически забирает файлы, суммирует приращения и применяет их
+пачкой UPDATE ... CASE WHEN. Поля моделей (views_count, downloads_count) остаются
+основным хранилищем, в файлах лежат только ещё не применённые приращения.
+
+Устойчивость к сбоям:
+- строка попадает в файл сразу (open/append/close), падение процесса её не теряет;
+- flush сначала переименовывает файл в *.flushing, затем применяет его в транзакции вместе
+  с записью AppliedCounterBatch - повторный flush после падения не посчитает пачку дважды.
+
+Выключено (COUNTERS_BUFFERED = False) - increment() пишет в БД сразу, как раньше.
+"""
+import glob
+import os
+import time
+import uuid
+from collections import defaultdict
+
+from django.apps import apps
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Case, When, Value
+
+SPOOL_PATTERN = "counters-*.log"
+FLUSHING_SUFFIX = ".flushing"
+BATCH_SIZE = 500
+
+# Какие поля можно увеличивать через журнал (строки из файла не должны трогать произвольные поля)
+ALLOWED_FIELDS = {
+    "games.game": ("views_count",),
+    "reviews.review": ("views_count",),
+    "walkthroughs.walkthrough": ("views_count",),
+    "cheats.cheat": ("views_count", "downloads_count"),
+}
+
+
+def is_buffered():
+    return getattr(settings, "COUNTERS_BUFFERED", False)
+
+
+def spool_dir():
+    return str(getattr(settings, "COUNTERS_SPOOL_DIR", settings.BASE_DIR / "var" / "counters"))
+
+
+def increment(model, pk, field, delta=1):
+    label = model._meta.label_lower
+    if field not in ALLOWED_FIELDS.get(label, ()):
+        raise ValueError(f"Счётчик {label}.{field} не поддерживается")
+
+    if not is_buffered():
+        model.objects.filter(pk=pk).update(**{field: F(field) + delta})
+        return
+
+    directory = spool_dir()
+    os.makedirs(directory, exist_ok=True)
+    # свой файл у каждого процесса; O_APPEND + одна короткая запись - строки не перемешиваются
+    path = os.path.join(directory, f"counters-{os.getpid()}.log")
+    line = f"{label} {field} {pk} {delta}\n".encode()
+    fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        os.write(fd, line)
+    finally:
+        os.close(fd)
+
+
+def count_view(request, model, pk, session_key):
+    """+1 просмотр, не чаще раза за сессию (список просмотренных id лежит в session[session_key])."""
+    viewed = request.session.get(session_key, [])
+    if pk in viewed:
+        return
+    increment(model, pk, "views_count")
+    viewed.append(pk)
+    request.session[session_key] = viewed
+
+
+def _read_spool(path):
+    # {(label, поле): {id: приращение}}; битые строки (оборванная запись при падении) пропускаем
+    deltas = defaultdict(lambda: defaultdict(int))
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) != 4 or parts[1] not in ALLOWED_FIELDS.get(parts[0], ()):
+                continue
+            try:
+                pk, delta = int(parts[2]), int(parts[3])
+            except ValueError:
+                continue
+            deltas[(parts[0], parts[1])][pk] += delta
+    return deltas
+
+
+def _apply(deltas):
+    updated = 0
+    for (label, field), by_pk in deltas.items():
+        model = apps.get_model(label)
+        items = sorted(by_pk.items())
+        for start in range(0, len(items), BATCH_SIZE):
+            chunk = items[start:start + BATCH_SIZE]
+            # одна UPDATE на пачку: views_count = views_count + CASE id WHEN .. THEN .. END
+            model.objects.filter(pk__in=[pk for pk, _ in chunk]).update(**{
+                field: F(field) + Case(*[When(pk=pk, then=Value(delta)) for pk, delta in chunk], default=Value(0))
+            })
+            updated += len(chunk)
+    return updated
+
+
+def _claim_spool_files(grace):
+    """Переименовывает активные журналы в *.flushing - новые строки процессы пишут уже в новые файлы."""
+    directory = spool_dir()
+    claimed = []
+    for path in glob.glob(os.path.join(directory, SPOOL_PATTERN)):
+        target = f"{path}.{uuid.uuid4().hex}{FLUSHING_SUFFIX}"
+        try:
+            os.rename(path, target)
+        except FileNotFoundError:
+            continue
+        claimed.append(target)
+    if claimed and grace:
+        # запись, открывшая файл до переименования, успевает закончиться
+        time.sleep(grace)
+    return claimed
+
+
+def flush(grace=1.0):
+    """Применяет все накопленные приращения. Возвращает (файлов, обновлённых строк)."""
+    from .models import AppliedCounterBatch
+
+    directory = spool_dir()
+    if not os.path.isdir(directory):
+        return 0, 0
+
+    claimed = _claim_spool_files(grace)
+    # плюс файлы, оставшиеся от упавшего flush
+    pending = sorted(set(claimed) | set(glob.glob(os.path.join(directory, f"*{FLUSHING_SUFFIX}"))))
+
+    files = updated = 0
+    for path in pending:
+        batch = os.path.basename(path)
+        with transaction.atomic():
+            # Пачка уже применена, но файл не успели удалить - второй раз не считаем
+            if not AppliedCounterBatch.objects.filter(name=batch).exists():
+                updated += _apply(_read_spool(path))
+                AppliedCounterBatch.objects.create(name=batch)
+        os.remove(path)
+        files += 1
+
+    return files, updated
@@ -0,0 +1,65 @@
+"""
+Кеш тяжёлых кусков карточек (галерея, платформы, комментарии) - тег {% cache_for %}.
+
+    {% load fragments %}
+    {% cache_for game "comments" per_user %} ... {% endcache_for %}
+
+Ключ фрагмента: модель и id объекта, его updated_at, версии перечисленных связей объекта
+и общая версия. Сигналы (core.signals) на картинки и комментарии увеличивают версию связи
+родителя (bump), общую версию - смена ника или аватара (они видны в комментариях везде).
+Устаревший фрагмент не удаляется, его ключ просто больше не собирается.
+
+per_user - фрагмент зависит от зрителя (кнопки правки/удаления своих комментариев):
+в ключ попадают id пользователя и хеш CSRF-секрета, чтобы закешированные формы
+с {% csrf_token %} оставались рабочими в его сессии.
+"""
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.middleware.csrf import get_token
+
+GLOBAL_VERSION_KEY = "frag_ver:global"
+
+
+def ttl():
+    return getattr(settings, "FRAGMENT_CACHE_TTL", 24 * 60 * 60)
+
+
+def _version_key(model, pk, relation):
+    return f"frag_ver:{model._meta.label_lower}:{pk}:{relation}"
+
+
+def _incr(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, None)
+
+
+def bump(model, pk, *relations):
+    for relation in relations:
+        _incr(_version_key(model, pk, relation))
+
+
+def bump_global():
+    _incr(GLOBAL_VERSION_KEY)
+
+
+def viewer_signature(request):
+    user = getattr(request, "user", None)
+    if user is None or not user.is_authenticated:
+        return "anon"
+    get_token(request)
+    secret = request.META.get("CSRF_COOKIE", "")
+    return hashlib.md5(f"{user.pk}:{secret}".encode()).hexdigest()[:12]
+
+
+def fragment_key(obj, relations, viewer=None):
+    """Ключ фрагмента; набор связей отличает фрагменты одного объекта друг от друга."""
+    keys = [_version_key(type(obj), obj.pk, r) for r in relations] + [GLOBAL_VERSION_KEY]
+    found = cache.get_many(keys)
+    versions = ".".join(str(found.get(key, 0)) for key in keys)
+    updated_at = getattr(obj, "updated_at", None)
+    stamp = f"{updated_at.timestamp():.6f}" if updated_at else "0"
+    return f"frag:{obj._meta.label_lower}:{obj.pk}:{stamp}:{'+'.join(relations)}={versions}:{viewer or '-'}"
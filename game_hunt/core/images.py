@@ -0,0 +1,280 @@
+"""
+Уменьшенные копии картинок (обложки, галереи, аватары) для srcset.
+
+Для загруженного файла строятся копии шириной IMAGE_VARIANT_WIDTHS (не шире оригинала)
+в WebP и, если Pillow собран с libavif, в AVIF:
+    MEDIA_ROOT/variants/3f/3fa4c1..._320.webp
+Имя копии - хеш содержимого оригинала: одинаковые файлы (default.png у профилей, повторная загрузка)
+делят копии, а новая картинка никогда не получит чужие копии из кеша браузера.
+
+Копии строит фоновая задача core.image_variants - сразу после загрузки (core.signals)
+или при первом показе картинки. Что уже построено, лежит в кеше (манифест по имени файла),
+поэтому тег {% picture %} на диск не ходит, а пока копий нет - отдаёт оригинал
+и не даёт закешировать такую страницу и фрагмент (mark_pending).
+
+Загрузки галерей и аватаров (NORMALIZED_FIELDS) запрос сохраняет как есть, а задача core.normalize_image
+в фоне пересохраняет их: без EXIF, не больше IMAGE_MAX_DIMENSION по большей стороне, заново сжатыми.
+Итог лежит под именем по хешу содержимого (<upload_to>/ab/ab12...ef.jpg): одинаковые загрузки делят
+один файл, поэтому удалять файл можно только если на него больше никто не ссылается (is_referenced).
+"""
+import hashlib
+import io
+import logging
+import re
+from functools import lru_cache
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps, UnidentifiedImageError, features
+
+from . import fragments, jobs, pagecache
+
+logger = logging.getLogger(__name__)
+
+VARIANTS_DIR = "variants"
+CACHE_PREFIX = "imgvar:"
+MANIFEST_TTL = 30 * 24 * 60 * 60
+# столько секунд повторный показ не ставит задачу заново
+PENDING_TTL = 10 * 60
+
+
+def widths():
+    return sorted(getattr(settings, "IMAGE_VARIANT_WIDTHS", (160, 320, 640, 1280)))
+
+
+@lru_cache(maxsize=None)
+def formats():
+    """(расширение, MIME, параметры сохранения); AVIF первым - браузер берёт первый подходящий <source>."""
+    result = [("webp", "image/webp", {"quality": 80, "method": 4})]
+    if features.check("avif"):
+        result.insert(0, ("avif", "image/avif", {"quality": 60}))
+    return tuple(result)
+
+
+def _key(name, suffix=""):
+    return CACHE_PREFIX + suffix + hashlib.md5(name.encode()).hexdigest()
+
+
+def variant_name(digest, width, ext):
+    return f"{VARIANTS_DIR}/{digest[:2]}/{digest}_{width}.{ext}"
+
+
+def _content_hash(fp):
+    h = hashlib.sha256()
+    for chunk in iter(lambda: fp.read(64 * 1024), b""):
+        h.update(chunk)
+    return h.hexdigest()[:20]
+
+
+def _prepare(image):
+    # поворот по EXIF и режим, который умеют WebP/AVIF
+    image = ImageOps.exif_transpose(image)
+    if image.mode in ("RGB", "RGBA"):
+        return image
+    has_alpha = image.mode in ("LA", "PA") or "transparency" in image.info
+    return image.convert("RGBA" if has_alpha else "RGB")
+
+
+def build(name, storage=default_storage):
+    """Строит недостающие копии файла name и кладёт манифест в кеш. Возвращает манифест."""
+    try:
+        with storage.open(name, "rb") as fp:
+            digest = _content_hash(fp)
+            fp.seek(0)
+            image = Image.open(fp)
+            image.load()
+    except (FileNotFoundError, UnidentifiedImageError) as exc:
+        # битый или пропавший файл: пустой манифест, чтобы не строить его снова на каждом показе
+        logger.warning("Копии картинки %s не построены: %s", name, exc)
+        data = {"hash": None, "widths": [], "formats": []}
+        cache.set(_key(name), data, MANIFEST_TTL)
+        return data
+
+    image = _prepare(image)
+    # не увеличиваем: узкий оригинал получает одну копию своей ширины (ради WebP/AVIF)
+    sizes = [w for w in widths() if w < image.width] or [image.width]
+    for width in sizes:
+        copy = None
+        for ext, _, options in formats():
+            target = variant_name(digest, width, ext)
+            if storage.exists(target):
+                continue
+            if copy is None:
+                copy = image.copy()
+                copy.thumbnail((width, image.height), Image.Resampling.LANCZOS)
+            buffer = io.BytesIO()
+            copy.save(buffer, ext.upper(), **options)
+            storage.save(target, ContentFile(buffer.getvalue()))
+
+    data = {"hash": digest, "widths": sizes, "formats": [ext for ext, _, _ in formats()]}
+    cache.set(_key(name), data, MANIFEST_TTL)
+    cache.delete(_key(name, "pending:"))
+    return data
+
+
+# Обработчик живёт здесь, а не в core/jobs.py (там сама очередь); модуль импортируют core.signals
+@jobs.register("core.image_variants")
+def image_variants_job(path):
+    # path, а не name: name - первый аргумент jobs.enqueue (имя задачи)
+    build(path)
+
+
+def variants(field_file):
+    """Манифест готовых копий или None; если копий ещё нет - ставит их построение в очередь."""
+    name = getattr(field_file, "name", None)
+    if not name:
+        return None
+    data = cache.get(_key(name))
+    if data is None and cache.add(_key(name, "pending:"), 1, PENDING_TTL):
+        jobs.enqueue("core.image_variants", path=name)
+    return data
+
+
+def mark_pending(request):
+    """
+    Картинка показана без копий (ещё строятся): страницу и фрагмент с ней не кешируем,
+    иначе оригинал без srcset отдавался бы из кеша и после появления копий.
+    """
+    if request is not None:
+        request._images_pending = pending_count(request) + 1
+
+
+def pending_count(request):
+    return getattr(request, "_images_pending", 0)
+
+
+def sources(field_file, request=None):
+    """[(MIME, srcset), ...] для <source>; пустой список - копий пока нет (тогда отмечает request)."""
+    data = variants(field_file)
+    if data is None:
+        mark_pending(request)
+    if not data or not data["widths"]:
+        return []
+    result = []
+    for ext, mime, _ in formats():
+        if ext not in data["formats"]:
+            continue
+        srcset = ", ".join(
+            f"{default_storage.url(variant_name(data['hash'], width, ext))} {width}w" for width in data["widths"]
+        )
+        result.append((mime, srcset))
+    return result
+
+
+# ---- Нормализация загрузок ----
+
+# модель -> поле с картинкой, которую пересохраняем после загрузки
+NORMALIZED_FIELDS = {
+    "games.gameimage": "image",
+    "reviews.reviewimage": "image",
+    "walkthroughs.walkthroughimage": "image",
+    "users.profile": "profile_image",
+}
+
+# что сбросить после замены файла: пространства кеша страниц (core.pagecache)
+# и фрагмент родителя (core.fragments); аватар виден в комментариях везде - общая версия фрагментов
+NORMALIZED_DEPENDENTS = {
+    "games.gameimage": (("games",), ("game", "gallery")),
+    "reviews.reviewimage": (("reviews",), ("review", "images")),
+    "walkthroughs.walkthroughimage": (("walkthroughs",), ("walkthrough", "images")),
+    "users.profile": (("games", "reviews", "walkthroughs", "cheats"), None),
+}
+
+NORMALIZED_NAME_RE = re.compile(r"(^|/)([0-9a-f]{2})/\2[0-9a-f]{18}\.(jpg|png|webp)$")
+
+
+def is_normalized(name):
+    return bool(NORMALIZED_NAME_RE.search(name))
+
+
+def needs_normalizing(instance, field):
+    if NORMALIZED_FIELDS.get(instance._meta.label_lower) != field:
+        return False
+    image = getattr(instance, field)
+    # общая картинка по умолчанию (default.png) не трогается
+    return bool(image) and image.name != instance._meta.get_field(field).default and not is_normalized(image.name)
+
+
+def schedule_normalize(instance, field):
+    name = getattr(instance, field).name
+    # профиль сохраняется часто: одна задача на загруженный файл
+    if cache.add(_key(name, "normalize:"), 1, PENDING_TTL):
+        jobs.enqueue("core.normalize_image", label=instance._meta.label_lower, pk=instance.pk, field=field, path=name)
+
+
+def _recompress(fp):
+    """Пересохраняет картинку без метаданных и не больше IMAGE_MAX_DIMENSION. Возвращает (байты, расширение)."""
+    image = Image.open(fp)
+    image.load()
+    source_format = image.format
+    image = _prepare(image)
+    limit = getattr(settings, "IMAGE_MAX_DIMENSION", 2560)
+    image.thumbnail((limit, limit), Image.Resampling.LANCZOS)
+
+    # EXIF не передаём в save() - в файл он не попадает
+    buffer = io.BytesIO()
+    if source_format == "WEBP":
+        image.save(buffer, "WEBP", quality=getattr(settings, "IMAGE_QUALITY", 85), method=4)
+        ext = "webp"
+    elif image.mode == "RGBA":
+        image.save(buffer, "PNG", optimize=True)
+        ext = "png"
+    else:
+        # PNG-скриншоты без прозрачности в JPEG - основной выигрыш в размере
+        image.save(buffer, "JPEG", quality=getattr(settings, "IMAGE_QUALITY", 85), optimize=True, progressive=True)
+        ext = "jpg"
+    return buffer.getvalue(), ext
+
+
+def is_referenced(name):
+    """Ссылается ли на файл хоть одна запись NORMALIZED_FIELDS (файлы с одинаковым содержимым общие)."""
+    return any(
+        apps.get_model(label).objects.filter(**{field: name}).exists()
+        for label, field in NORMALIZED_FIELDS.items()
+    )
+
+
+def _bump_dependents(model, label, pk):
+    namespaces, parent = NORMALIZED_DEPENDENTS[label]
+    pagecache.bump(*namespaces)
+    if parent is None:
+        fragments.bump_global()
+        return
+    field_name, relation = parent
+    parent_field = model._meta.get_field(field_name)
+    parent_id = model.objects.filter(pk=pk).values_list(parent_field.attname, flat=True).first()
+    fragments.bump(parent_field.related_model, parent_id, relation)
+
+
+@jobs.register("core.normalize_image")
+def normalize_image_job(label, pk, field, path):
+    model = apps.get_model(label)
+    model_field = model._meta.get_field(field)
+    storage = model_field.storage
+    try:
+        with storage.open(path, "rb") as fp:
+            data, ext = _recompress(fp)
+    except FileNotFoundError:
+        # файл успели заменить или удалить - нормализовать нечего
+        return
+    except UnidentifiedImageError as exc:
+        logger.warning("Картинка %s не нормализована: %s", path, exc)
+        return
+
+    digest = hashlib.sha256(data).hexdigest()[:20]
+    target = f"{str(model_field.upload_to).rstrip('/')}/{digest[:2]}/{digest}.{ext}"
+    if not storage.exists(target):
+        target = storage.save(target, ContentFile(data))
+    # копии - до переключения записи: страница, собранная после сброса кеша, сразу получит srcset
+    build(target)
+
+    # update() в обход сигналов; условие на имя - если пока шла задача картинку заменили, ничего не трогаем
+    if model.objects.filter(pk=pk, **{field: path}).update(**{field: target}):
+        # страницы и фрагменты со ссылкой на старый файл больше не отдаём
+        _bump_dependents(model, label, pk)
+        if not is_referenced(path):
+            storage.delete(path)
+
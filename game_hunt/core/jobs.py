@@ -0,0 +1,171 @@
+"""
+Фоновые задачи в БД: письма, уведомления в Telegram, массовые операции.
+
+    @jobs.register("users.send_mail")
+    def send_mail_job(subject, message, recipient_list): ...
+
+    jobs.enqueue("users.send_mail", subject=..., message=..., recipient_list=[...])
+
+enqueue() пишет строку Job в текущей транзакции: откат транзакции отменяет и задачу,
+а после коммита задача не теряется при падении процесса. Выполняет задачи команда run_jobs.
+
+- воркер забирает задачу условным UPDATE (locked_at), так что два воркера не выполнят её дважды;
+  задачи забираются по одной перед выполнением, долгие обработчики продлевают блокировку (heartbeat);
+  задача зависшего воркера снова становится доступной через JOBS_LOCK_TIMEOUT секунд;
+- ошибка -> повтор с экспоненциальной задержкой (JOBS_RETRY_DELAY * 2^попытка, с разбросом);
+- после JOBS_MAX_ATTEMPTS попыток задача переносится в DeadJob.
+
+Обработчики лежат в модулях <app>/jobs.py и подгружаются автоматически.
+JOBS_EAGER = True - задачи выполняются сразу после коммита в том же процессе (разработка, тесты).
+"""
+import logging
+import os
+import random
+import socket
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.utils.module_loading import autodiscover_modules
+
+logger = logging.getLogger(__name__)
+
+_handlers = {}
+_discovered = False
+# (id, воркер) задачи, которая сейчас выполняется в этом процессе (heartbeat)
+_current = None
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def register(name):
+    def decorator(func):
+        _handlers[name] = func
+        return func
+    return decorator
+
+
+def get_handler(name):
+    global _discovered
+    if name not in _handlers and not _discovered:
+        autodiscover_modules("jobs")
+        _discovered = True
+    return _handlers.get(name)
+
+
+def enqueue(name, delay=0, **payload):
+    """Ставит задачу в очередь. payload должен сериализоваться в JSON."""
+    from .models import Job
+
+    if _setting("JOBS_EAGER", False):
+        transaction.on_commit(lambda: get_handler(name)(**payload))
+        return None
+    return Job.objects.create(name=name, payload=payload, run_at=timezone.now() + timedelta(seconds=delay))
+
+
+def retry_delay(attempts):
+    base = _setting("JOBS_RETRY_DELAY", 30)
+    delay = min(base * 2 ** (attempts - 1), _setting("JOBS_RETRY_MAX_DELAY", 3600))
+    # разброс, чтобы пачка упавших задач не повторялась одновременно
+    return delay * random.uniform(0.8, 1.2)
+
+
+def worker_id():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _claim(worker):
+    """Забирает одну готовую задачу (или None): блокировка ставится прямо перед выполнением."""
+    from .models import Job
+
+    now = timezone.now()
+    stale = now - timedelta(seconds=_setting("JOBS_LOCK_TIMEOUT", 600))
+    candidates = (
+        Job.objects.filter(run_at__lte=now)
+        .exclude(locked_at__gt=stale)
+        .values_list("pk", "locked_at")[:10]
+    )
+    for pk, locked_at in candidates:
+        # забираем только если с момента выборки задачу никто не взял
+        if Job.objects.filter(pk=pk, locked_at=locked_at).update(locked_at=now, locked_by=worker):
+            return Job.objects.filter(pk=pk).first()
+    return None
+
+
+def heartbeat():
+    """
+    Продлевает блокировку выполняемой задачи. Обработчик, который может идти дольше
+    JOBS_LOCK_TIMEOUT (рассылка), вызывает её между пачками - иначе задачу заберёт второй воркер.
+    """
+    from .models import Job
+
+    if _current is not None:
+        pk, worker = _current
+        Job.objects.filter(pk=pk, locked_by=worker).update(locked_at=timezone.now())
+
+
+def _fail(job, error):
+    from .models import Job, DeadJob
+
+    job.attempts += 1
+    if job.attempts >= _setting("JOBS_MAX_ATTEMPTS", 5):
+        logger.error("Задача %s #%s отклонена после %s попыток", job.name, job.pk, job.attempts)
+        with transaction.atomic():
+            DeadJob.objects.create(
+                name=job.name, payload=job.payload, attempts=job.attempts,
+                last_error=error, created_at=job.created_at,
+            )
+            job.delete()
+        return
+
+    Job.objects.filter(pk=job.pk).update(
+        attempts=job.attempts,
+        last_error=error,
+        run_at=timezone.now() + timedelta(seconds=retry_delay(job.attempts)),
+        locked_at=None,
+        locked_by="",
+    )
+
+
+def run_pending(batch_size=20, worker=None):
+    """Выполняет готовые задачи. Возвращает (выполнено, ошибок)."""
+    global _current
+    worker = worker or worker_id()
+    done = failed = 0
+    # по одной: время блокировки каждой задачи отсчитывается от её собственного старта
+    while done + failed < batch_size:
+        job = _claim(worker)
+        if job is None:
+            break
+        handler = get_handler(job.name)
+        _current = (job.pk, worker)
+        try:
+            if handler is None:
+                raise LookupError(f"Нет обработчика задачи {job.name}")
+            handler(**job.payload)
+        except Exception:
+            failed += 1
+            _fail(job, traceback.format_exc(limit=5))
+        else:
+            done += 1
+            job.delete()
+        finally:
+            _current = None
+    return done, failed
+
+
+def requeue(dead_jobs):
+    """Возвращает неудачные задачи в очередь с нулём попыток."""
+    from .models import Job
+
+    dead_jobs = list(dead_jobs)
+    now = timezone.now()
+    with transaction.atomic():
+        Job.objects.bulk_create([Job(name=d.name, payload=d.payload, run_at=now) for d in dead_jobs])
+        for dead in dead_jobs:
+            dead.delete()
+    return len(dead_jobs)
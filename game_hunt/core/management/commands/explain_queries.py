@@ -0,0 +1,97 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from cheats.models import Cheat, CheatComment
+from games.models import Game, GameComment
+from reviews.models import Review, ReviewComment
+from users.models import AdminMessages, UserMessages
+from walkthroughs.models import Walkthrough, WalkthroughComment
+
+# Приложения, чьи Meta.indexes снимаются для плана "до"
+INDEXED_APPS = ("games", "reviews", "walkthroughs", "cheats", "users")
+
+
+def _any_pk(model):
+    return model.objects.order_by().values_list("pk", flat=True).first() or 1
+
+
+def hot_queries():
+    """Горячие запросы сайта: (название, queryset)."""
+    user_id = _any_pk(apps.get_model("auth", "User"))
+    queries = [
+        ("Каталог игр: популярные", Game.objects.order_by("-views_count", "-id")[:12]),
+        ("Каталог игр: лучшие", Game.objects.order_by("-avg_rating", "-views_count", "-id")[:12]),
+        ("Каталог игр: по дате выхода", Game.objects.order_by("-release_date", "-id")[:12]),
+        ("Обзоры: новые", Review.objects.filter(is_published=True).order_by("-created_at")[:3]),
+        ("Обзоры: популярные", Review.objects.filter(is_published=True).order_by("-views_count", "-created_at")[:3]),
+        ("Обзоры: по оценке", Review.objects.filter(is_published=True).order_by("-rating", "-created_at")[:3]),
+        ("Прохождения: новые", Walkthrough.objects.filter(is_published=True).order_by("-updated_at", "-id")[:3]),
+        ("Читы: популярные",
+         Cheat.objects.filter(is_published=True).order_by("-downloads_count", "-views_count")[:3]),
+        ("Очередь модерации",
+         Review.objects.filter(is_published=False, is_rejected=False).order_by("-updated_at", "-id")[:31]),
+        ("Уведомления пользователя",
+         UserMessages.objects.filter(user_id=user_id, is_published=True).order_by("is_read", "-created_at")[:10]),
+        ("Колокольчик: непрочитанные", UserMessages.objects.filter(user_id=user_id, is_read=False).values("pk")),
+        ("Колокольчик стаффа", AdminMessages.objects.filter(is_read=False).values("pk")),
+    ]
+    for model, parent in ((GameComment, "game"), (ReviewComment, "review"),
+                          (WalkthroughComment, "walkthrough"), (CheatComment, "cheat")):
+        name = model._meta.verbose_name_plural
+        parent_id = _any_pk(model._meta.get_field(parent).related_model)
+        queries.append((f"{name}: лента",
+                        model.objects.filter(**{parent: parent_id, "is_deleted": False}).order_by("-created_at")))
+        queries.append((f"{name}: последний пользователя",
+                        model.objects.filter(user_id=user_id).order_by("-created_at")[:1]))
+    return queries
+
+
+def _plans():
+    return [(title, qs.explain()) for title, qs in hot_queries()]
+
+
+class Command(BaseCommand):
+    help = "Показывает планы горячих запросов (EXPLAIN); --compare - без индексов из Meta.indexes и с ними"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--compare", action="store_true",
+                            help="Снять индексы в транзакции, показать план 'до', затем откатить")
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"СУБД: {connection.vendor}\n")
+        after = _plans()
+
+        before = None
+        if options["compare"]:
+            if not connection.features.can_rollback_ddl:
+                self.stderr.write("СУБД не откатывает DDL в транзакции - сравнение недоступно")
+            else:
+                # SQLite пускает редактор схемы в транзакцию только с выключенной проверкой FK,
+                # а выключить её можно лишь вне транзакции
+                connection.disable_constraint_checking()
+                try:
+                    with transaction.atomic():
+                        with connection.schema_editor() as editor:
+                            for app_label in INDEXED_APPS:
+                                for model in apps.get_app_config(app_label).get_models():
+                                    for index in model._meta.indexes:
+                                        editor.remove_index(model, index)
+                        before = _plans()
+                        # индексы возвращаются откатом, чем бы ни кончилась команда
+                        transaction.set_rollback(True)
+                finally:
+                    connection.enable_constraint_checking()
+
+        for i, (title, plan) in enumerate(after):
+            self.stdout.write(self.style.MIGRATE_HEADING(title))
+            if before is not None:
+                self.stdout.write("  до:")
+                self.stdout.write(_indent(before[i][1]))
+                self.stdout.write("  после:")
+            self.stdout.write(_indent(plan))
+            self.stdout.write("")
+
+
+def _indent(text):
+    return "\n".join(f"    {line}" for line in text.splitlines())
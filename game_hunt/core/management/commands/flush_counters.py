@@ -0,0 +1,35 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from datetime import timedelta
+
+from core import counters
+from core.models import AppliedCounterBatch
+
+
+class Command(BaseCommand):
+    help = "Применяет накопленные приращения просмотров/скачиваний (core.counters) к БД"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--loop", type=int, default=0, metavar="SECONDS",
+                            help="Работать постоянно, сбрасывая счётчики каждые SECONDS секунд")
+        parser.add_argument("--grace", type=float, default=1.0,
+                            help="Пауза после переименования журналов, чтобы дописались начатые строки")
+        parser.add_argument("--keep-days", type=int, default=7,
+                            help="Сколько дней хранить записи о применённых пачках")
+
+    def handle(self, *args, **options):
+        while True:
+            files, updated = counters.flush(grace=options["grace"])
+            if files:
+                self.stdout.write(f"Файлов: {files}, обновлено строк: {updated}")
+
+            # Старые отметки о пачках больше не нужны: их файлы давно удалены
+            AppliedCounterBatch.objects.filter(
+                applied_at__lt=timezone.now() - timedelta(days=options["keep_days"])
+            ).delete()
+
+            if not options["loop"]:
+                break
+            time.sleep(options["loop"])
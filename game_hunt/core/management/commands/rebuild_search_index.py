@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from core import search
+
+
+class Command(BaseCommand):
+    help = "Полностью перестраивает единый поисковый индекс (core_search_fts / core_search_document)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--kind", action="append", choices=search.KINDS,
+            help="Перестроить только указанный тип контента (можно несколько раз)",
+        )
+        parser.add_argument("--batch-size", type=int, default=search.BATCH_SIZE,
+                            help="Сколько объектов индексировать за транзакцию")
+
+    def handle(self, *args, **options):
+        if not search.is_supported():
+            raise CommandError("Полнотекстовый индекс поддерживается только для SQLite и PostgreSQL.")
+
+        batch_size = options["batch_size"]
+        for kind in options["kind"] or search.KINDS:
+            ids = list(search.KIND_MODELS[kind].objects.order_by("pk").values_list("pk", flat=True))
+            for start in range(0, len(ids), batch_size):
+                with transaction.atomic():
+                    search.reindex(kind, ids[start:start + batch_size])
+            self.stdout.write(f"{kind}: {len(ids)}")
+
+        search.prune_index()
+        self.stdout.write(self.style.SUCCESS("Поисковый индекс перестроен"))
@@ -0,0 +1,68 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F, IntegerField, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from cheats.models import Cheat, CheatVote
+from core.votes import LIKE, DISLIKE, liked_percent_expression
+from games.models import Game, GameVote
+from reviews.models import Review, ReviewVote
+from walkthroughs.models import Walkthrough, WalkthroughVote
+
+# (модель, модель голоса, FK голоса на модель)
+TARGETS = {
+    "games": (Game, GameVote, "game"),
+    "reviews": (Review, ReviewVote, "review"),
+    "walkthroughs": (Walkthrough, WalkthroughVote, "walkthrough"),
+    "cheats": (Cheat, CheatVote, "cheat"),
+}
+
+
+def _votes_count(vote_model, fk, value):
+    counted = (vote_model.objects.filter(**{fk: OuterRef("pk"), "value": value})
+               .order_by().values(fk).annotate(c=Count("pk")).values("c"))
+    return Coalesce(Subquery(counted, output_field=IntegerField()), Value(0))
+
+
+class Command(BaseCommand):
+    help = "Сверяет денормализованные likes/dislikes/liked_percent с таблицами голосов и чинит расхождения"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--only", choices=sorted(TARGETS), action="append",
+                            help="Проверить только указанные разделы (можно несколько раз)")
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument("--dry-run", action="store_true", help="Только показать число расхождений")
+
+    def handle(self, *args, **options):
+        for name in options["only"] or TARGETS:
+            model, vote_model, fk = TARGETS[name]
+
+            # Расходятся счётчики или процент - ищем одним запросом, сравнивая с подсчётом по голосам
+            real = model.objects.annotate(
+                real_likes=_votes_count(vote_model, fk, LIKE),
+                real_dislikes=_votes_count(vote_model, fk, DISLIKE),
+            )
+            drifted = list(
+                real.filter(
+                    ~Q(likes=F("real_likes"))
+                    | ~Q(dislikes=F("real_dislikes"))
+                    | ~Q(liked_percent=liked_percent_expression(F("real_likes"), F("real_dislikes")))
+                ).order_by("pk").values_list("pk", flat=True)
+            )
+
+            if options["dry_run"] or not drifted:
+                self.stdout.write(f"{name}: расхождений {len(drifted)}")
+                continue
+
+            size = options["batch_size"]
+            for start in range(0, len(drifted), size):
+                chunk = model.objects.filter(pk__in=drifted[start:start + size])
+                with transaction.atomic():
+                    chunk.update(
+                        likes=_votes_count(vote_model, fk, LIKE),
+                        dislikes=_votes_count(vote_model, fk, DISLIKE),
+                    )
+                    # отдельной UPDATE: в предыдущей liked_percent видел бы старые счётчики
+                    chunk.update(liked_percent=liked_percent_expression(F("likes"), F("dislikes")))
+
+            self.stdout.write(self.style.SUCCESS(f"{name}: исправлено {len(drifted)}"))
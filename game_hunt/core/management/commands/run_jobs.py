@@ -0,0 +1,28 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core import jobs
+
+
+class Command(BaseCommand):
+    help = "Выполняет фоновые задачи из очереди (core.jobs)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--loop", type=float, default=0, metavar="SECONDS",
+                            help="Работать постоянно, опрашивая очередь каждые SECONDS секунд")
+        parser.add_argument("--batch-size", type=int, default=20,
+                            help="Сколько задач забирать за один проход")
+
+    def handle(self, *args, **options):
+        worker = jobs.worker_id()
+        while True:
+            done, failed = jobs.run_pending(batch_size=options["batch_size"], worker=worker)
+            if done or failed:
+                self.stdout.write(f"Выполнено: {done}, ошибок: {failed}")
+
+            if not options["loop"]:
+                break
+            # пока очередь не пуста - следующий проход сразу
+            if done + failed < options["batch_size"]:
+                time.sleep(options["loop"])
@@ -0,0 +1,114 @@
+# Единый полнотекстовый индекс (игры, обзоры, прохождения, читы):
+# FTS5 для SQLite, tsvector + GIN для PostgreSQL
+
+from django.db import migrations
+from django.utils.html import strip_tags
+
+# Код типа для rowid в FTS5: rowid = object_id * 8 + код (см. core.search.KIND_CODES)
+KIND_CODES = {"game": 1, "review": 2, "walkthrough": 3, "cheat": 4}
+
+
+def _join(*parts):
+    return " ".join(p for p in parts if p)
+
+
+def _documents(apps):
+    Game = apps.get_model("games", "Game")
+    genres = {}
+    for game_id, name in Game.genres.through.objects.values_list("game_id", "genre__name"):
+        genres.setdefault(game_id, []).append(name)
+
+    games = Game.objects.values_list(
+        "pk", "title", "description", "is_adult_only", "developer__name", "publisher__name",
+    )
+    for pk, title, description, is_adult, developer, publisher in games.iterator(chunk_size=500):
+        names = _join(*genres.get(pk, []), developer, publisher)
+        yield "game", pk, title, names, strip_tags(description or ""), True, is_adult
+
+    for kind, app_label, model_name, body_field in (
+        ("review", "reviews", "Review", "summary"),
+        ("walkthrough", "walkthroughs", "Walkthrough", "summary"),
+        ("cheat", "cheats", "Cheat", "functionality"),
+    ):
+        model = apps.get_model(app_label, model_name)
+        rows = model.objects.values_list(
+            "pk", "title", body_field, "is_published",
+            "game__title", "game__slug", "game__is_adult_only",
+            "author__username", "author__profile__nickname",
+        )
+        for pk, title, body, is_published, game_title, game_slug, is_adult, username, nickname in rows.iterator(
+                chunk_size=500):
+            names = _join(game_title, game_slug, username, nickname)
+            yield kind, pk, title, names, strip_tags(body or ""), is_published, is_adult
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "sqlite":
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS core_search_fts USING fts5("
+            "title, names, body, "
+            "is_published UNINDEXED, is_adult UNINDEXED, kind UNINDEXED, object_id UNINDEXED, "
+            "tokenize = 'unicode61')"
+        )
+    elif vendor == "postgresql":
+        schema_editor.execute(
+            "CREATE TABLE IF NOT EXISTS core_search_document ("
+            "kind varchar(20) NOT NULL, "
+            "object_id bigint NOT NULL, "
+            "is_published boolean NOT NULL, "
+            "is_adult boolean NOT NULL, "
+            "document tsvector NOT NULL, "
+            "PRIMARY KEY (kind, object_id))"
+        )
+        schema_editor.execute(
+            "CREATE INDEX IF NOT EXISTS core_search_document_gin ON core_search_document USING GIN (document)"
+        )
+    else:
+        return
+
+    # Первичное наполнение индекса существующим контентом
+    for kind, pk, title, names, body, is_published, is_adult in _documents(apps):
+        if vendor == "sqlite":
+            schema_editor.execute(
+                "INSERT INTO core_search_fts "
+                "(rowid, title, names, body, is_published, is_adult, kind, object_id) "
+                "VALUES (%s, %s, %s, %s, %s, %s, %s, %s)",
+                [pk * 8 + KIND_CODES[kind], title or "", names, body,
+                 int(bool(is_published)), int(bool(is_adult)), kind, pk],
+            )
+        else:
+            schema_editor.execute(
+                "INSERT INTO core_search_document (kind, object_id, is_published, is_adult, document) VALUES ("
+                "%s, %s, %s, %s, "
+                "setweight(to_tsvector('simple', %s), 'A') || "
+                "setweight(to_tsvector('simple', %s), 'B') || "
+                "setweight(to_tsvector('simple', %s), 'C')) "
+                "ON CONFLICT (kind, object_id) DO NOTHING",
+                [kind, pk, bool(is_published), bool(is_adult), title or "", names, body],
+            )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "sqlite":
+        schema_editor.execute("DROP TABLE IF EXISTS core_search_fts")
+    elif vendor == "postgresql":
+        schema_editor.execute("DROP TABLE IF EXISTS core_search_document")
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('games', '0016_delete_game_search_index'),
+        ('reviews', '0008_alter_reviewcomment_is_edited_alter_reviewvote_value'),
+        ('walkthroughs', '0004_alter_walkthrough_video_url'),
+        ('cheats', '0002_alter_cheat_options_remove_cheat_code_and_more'),
+        ('users', '0011_adminmessages_is_published_adminmessages_status_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
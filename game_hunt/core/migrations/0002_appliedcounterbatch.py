@@ -0,0 +1,25 @@
+# Generated by Django 5.2.8 on 2026-10-18 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AppliedCounterBatch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True, verbose_name='Файл пачки')),
+                ('applied_at', models.DateTimeField(auto_now_add=True, verbose_name='Применена')),
+            ],
+            options={
+                'verbose_name': 'пачка счётчиков',
+                'verbose_name_plural': 'пачки счётчиков',
+            },
+        ),
+    ]
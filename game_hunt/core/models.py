@@ -1,3 +1,53 @@
 from django.db import models
 
-# Create your models here.
+
+class AppliedCounterBatch(models.Model):
+    # Пачки приращений счётчиков (core.counters), уже применённые к БД: защита от двойного учёта
+    name = models.CharField(max_length=255, unique=True, verbose_name='Файл пачки')
+    applied_at = models.DateTimeField(auto_now_add=True, verbose_name='Применена')
+
+    class Meta:
+        verbose_name = 'пачка счётчиков'
+        verbose_name_plural = 'пачки счётчиков'
+
+    def __str__(self):
+        return self.name
+
+
+class Job(models.Model):
+    # Фоновая задача (core.jobs): пишется в той же транзакции, что и данные, выполняется командой run_jobs
+    name = models.CharField(max_length=100, verbose_name='Задача')
+    payload = models.JSONField(default=dict, blank=True, verbose_name='Параметры')
+    attempts = models.PositiveSmallIntegerField(default=0, verbose_name='Попыток')
+    run_at = models.DateTimeField(verbose_name='Выполнить после')
+    locked_at = models.DateTimeField(null=True, blank=True, verbose_name='Взята в работу')
+    locked_by = models.CharField(max_length=100, blank=True, verbose_name='Воркер')
+    last_error = models.TextField(blank=True, verbose_name='Последняя ошибка')
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='Создана')
+
+    class Meta:
+        verbose_name = 'фоновая задача'
+        verbose_name_plural = 'фоновые задачи'
+        ordering = ['run_at', 'id']
+        indexes = [models.Index(fields=['run_at', 'id'], name='core_job_run_at_idx')]
+
+    def __str__(self):
+        return f'{self.name} #{self.pk}'
+
+
+class DeadJob(models.Model):
+    # Задачи, исчерпавшие попытки: лежат до разбора, из админки можно вернуть в очередь
+    name = models.CharField(max_length=100, verbose_name='Задача')
+    payload = models.JSONField(default=dict, blank=True, verbose_name='Параметры')
+    attempts = models.PositiveSmallIntegerField(default=0, verbose_name='Попыток')
+    last_error = models.TextField(blank=True, verbose_name='Последняя ошибка')
+    created_at = models.DateTimeField(verbose_name='Создана')
+    failed_at = models.DateTimeField(auto_now_add=True, verbose_name='Отклонена')
+
+    class Meta:
+        verbose_name = 'неудачная задача'
+        verbose_name_plural = 'неудачные задачи'
+        ordering = ['-failed_at']
+
+    def __str__(self):
+        return f'{self.name} #{self.pk}'
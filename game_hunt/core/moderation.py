@@ -0,0 +1,150 @@
+"""
+Очередь модерации: неопубликованные обзоры, прохождения и читы одной лентой.
+
+Лента склеивается из трёх запросов (по одному на тип), каждый идёт по индексу
+(is_published, -updated_at) и берёт не больше count+1 строк после курсора; слияние - в Python.
+Порядок: сначала недавно изменённые, при равном updated_at - по типу и id (курсор однозначен).
+
+Одобрение/отклонение выбранных - одна UPDATE на тип. update() не вызывает сигналы,
+поэтому поисковый индекс, счётчики списков и кеш страниц обновляются здесь же.
+"""
+import base64
+import json
+from datetime import datetime
+
+from django.db.models import Q
+from django.urls import reverse
+
+from cheats.models import Cheat
+from games.utils import bump_list_counts
+from reviews.models import Review
+from walkthroughs.models import Walkthrough
+from . import pagecache
+from .search import reindex
+
+PAGE_SIZE = 30
+
+# тип -> (модель, пространство счётчиков списка, подпись)
+KINDS = {
+    "cheat": (Cheat, "cheats", "Чит"),
+    "review": (Review, "reviews", "Обзор"),
+    "walkthrough": (Walkthrough, "walkthroughs", "Прохождение"),
+}
+
+COLUMNS = ("id", "title", "slug", "updated_at", "game__title",
+           "author__username", "author__profile__id", "author__profile__nickname")
+
+
+class QueueItem:
+    def __init__(self, kind, obj):
+        self.kind = kind
+        self.obj = obj
+        self.label = KINDS[kind][2]
+
+    @property
+    def key(self):
+        return f"{self.kind}:{self.obj.pk}"
+
+    def sort_key(self):
+        return -self.obj.updated_at.timestamp(), self.kind, -self.obj.pk
+
+    def detail_url(self):
+        if self.kind == "review":
+            return reverse("review_detail", args=[self.obj.pk])
+        return reverse(f"{self.kind}_detail", args=[self.obj.slug])
+
+    def edit_url(self):
+        if self.kind == "review":
+            return reverse("admin_review_edit", args=[self.obj.pk])
+        if self.kind == "walkthrough":
+            return reverse("admin_walkthrough_edit", args=[self.obj.slug])
+        return reverse("cheat_edit", args=[self.obj.slug])
+
+
+def pending(kind):
+    model = KINDS[kind][0]
+    columns = COLUMNS if kind != "review" else tuple(c for c in COLUMNS if c != "slug")
+    return (model.objects
+            .filter(is_published=False, is_rejected=False)
+            .select_related("game", "author", "author__profile")
+            .only(*columns))
+
+
+def pending_count():
+    return sum(pending(kind).count() for kind in KINDS)
+
+
+def _encode_cursor(item):
+    payload = {"t": item.obj.updated_at.isoformat(), "k": item.kind, "i": item.obj.pk}
+    return base64.urlsafe_b64encode(json.dumps(payload, separators=(",", ":")).encode()).decode().rstrip("=")
+
+
+def _decode_cursor(token):
+    # битый курсор - просто начало очереди
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+        return datetime.fromisoformat(payload["t"]), payload["k"], int(payload["i"])
+    except (ValueError, KeyError, TypeError):
+        return None
+
+
+def _after(kind, cursor):
+    # строки этого типа, идущие в ленте после курсора (-updated_at, тип, -id)
+    updated_at, cursor_kind, cursor_id = cursor
+    condition = Q(updated_at__lt=updated_at)
+    if kind > cursor_kind:
+        condition |= Q(updated_at=updated_at)
+    elif kind == cursor_kind:
+        condition |= Q(updated_at=updated_at, id__lt=cursor_id)
+    return condition
+
+
+def queue_page(cursor_token=None, kinds=None, count=PAGE_SIZE):
+    """Страница очереди: (элементы, курсор следующей страницы или None)."""
+    cursor = _decode_cursor(cursor_token) if cursor_token else None
+
+    items = []
+    for kind in kinds or KINDS:
+        qs = pending(kind)
+        if cursor is not None:
+            qs = qs.filter(_after(kind, cursor))
+        items.extend(QueueItem(kind, obj) for obj in qs.order_by("-updated_at", "-id")[:count + 1])
+
+    items.sort(key=QueueItem.sort_key)
+    has_more = len(items) > count
+    items = items[:count]
+    return items, (_encode_cursor(items[-1]) if has_more else None)
+
+
+def parse_keys(keys):
+    """["review:12", "cheat:3", ...] -> {"review": [12], "cheat": [3]}; чужие значения отбрасываются."""
+    by_kind = {}
+    for key in keys:
+        kind, _, pk = key.partition(":")
+        if kind in KINDS and pk.isdigit():
+            by_kind.setdefault(kind, []).append(int(pk))
+    return by_kind
+
+
+def _apply(by_kind, publish, **values):
+    changed = 0
+    for kind, ids in by_kind.items():
+        model, namespace, _ = KINDS[kind]
+        # только то, что ещё ждёт модерации: повторная отправка формы ничего не ломает
+        updated = model.objects.filter(pk__in=ids, is_published=False, is_rejected=False).update(**values)
+        if updated and publish:
+            # опубликованное появляется в поиске, в счётчиках списков и в страницах для гостей
+            reindex(kind, ids)
+            bump_list_counts(namespace)
+            pagecache.bump(namespace)
+        changed += updated
+    return changed
+
+
+def approve(by_kind):
+    return _apply(by_kind, True, is_published=True)
+
+
+def reject(by_kind):
+    # отклонённое остаётся неопубликованным и уходит из очереди до правки автором
+    return _apply(by_kind, False, is_rejected=True)
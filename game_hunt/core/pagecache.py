@@ -0,0 +1,115 @@
+"""
+Кеш готовых страниц для гостей: списки и карточки игр, обзоров, прохождений, читов.
+
+    @pagecache.cache_anonymous("reviews", "games", on_hit=count_review_view)
+    def review_detail(request, pk): ...
+
+Ключ: view + путь + GET-параметры (отсортированы, без пустых и меток utm_*) + флаг 16+
++ поколения пространств. Сигналы (core.signals) на изменение игр, контента и комментариев
+увеличивают поколение пространства (bump) - старые страницы просто перестают читаться.
+Счётчики просмотров и голосов двигаются update() без сигналов: в кешированной странице
+они отстают не больше чем на PAGE_CACHE_TTL секунд.
+
+Не кешируются: вошедшие пользователи, не-GET, ответы кроме 200, страница с ожидающими
+flash-сообщениями, ответ, выдавший CSRF-токен или cookie, страница с картинкой без готовых копий.
+
+Побочные эффекты view (просмотр за сессию) на попадании в кеш выполняет on_hit:
+view сохраняет нужные ему данные через remember(request, pk=...), они лежат рядом со страницей.
+"""
+import hashlib
+import json
+from functools import wraps
+
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.core.cache import cache
+from django.http import HttpResponse
+
+from users.utils import user_is_adult
+
+# параметры, которые не меняют страницу
+IGNORED_PARAMS = ("fbclid", "gclid", "yclid")
+IGNORED_PREFIXES = ("utm_",)
+
+
+def _ttl():
+    return getattr(settings, "PAGE_CACHE_TTL", 300)
+
+
+def _generation_key(namespace):
+    return f"page_gen:{namespace}"
+
+
+def bump(*namespaces):
+    # Вызывается сигналами при изменении контента
+    for namespace in namespaces:
+        try:
+            cache.incr(_generation_key(namespace))
+        except ValueError:
+            cache.set(_generation_key(namespace), 1, None)
+
+
+def _generations(namespaces):
+    values = cache.get_many([_generation_key(n) for n in namespaces])
+    return [values.get(_generation_key(n), 0) for n in namespaces]
+
+
+def _signature(request):
+    params = sorted(
+        (key, value.strip())
+        for key, values in request.GET.lists()
+        if key not in IGNORED_PARAMS and not key.startswith(IGNORED_PREFIXES)
+        for value in values if value.strip()
+    )
+    raw = json.dumps([request.path, params], ensure_ascii=False)
+    return hashlib.md5(raw.encode()).hexdigest()
+
+
+def remember(request, **payload):
+    """Данные для on_hit: передаются ему при выдаче страницы из кеша."""
+    request._page_cache_payload = payload
+
+
+def _cacheable_request(request):
+    if request.method != "GET" or request.user.is_authenticated:
+        return False
+    # flash-сообщение выводится в шаблоне один раз - такую страницу отдаём свежей
+    return not len(get_messages(request))
+
+
+def _cacheable_response(request, response):
+    if response.status_code != 200 or response.streaming or response.cookies:
+        return False
+    # на странице картинка, чьи копии ещё строятся (core.images.mark_pending)
+    if getattr(request, "_images_pending", 0):
+        return False
+    # в странице чужой CSRF-токен оказаться не должен
+    return not (request.META.get("CSRF_COOKIE_NEEDS_UPDATE") or request.META.get("CSRF_COOKIE_USED"))
+
+
+def cache_anonymous(*namespaces, on_hit=None):
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            ttl = _ttl()
+            if not ttl or not _cacheable_request(request):
+                return view(request, *args, **kwargs)
+
+            adult = "a" if user_is_adult(request.user) else "n"
+            generations = "-".join(map(str, _generations(namespaces)))
+            key = f"page:{view.__module__}.{view.__name__}:{generations}:{adult}:{_signature(request)}"
+
+            cached = cache.get(key)
+            if cached is not None:
+                content, content_type, payload = cached
+                if on_hit is not None and payload is not None:
+                    on_hit(request, **payload)
+                return HttpResponse(content, content_type=content_type)
+
+            response = view(request, *args, **kwargs)
+            if _cacheable_response(request, response):
+                payload = getattr(request, "_page_cache_payload", None)
+                cache.set(key, (response.content, response["Content-Type"], payload), ttl)
+            return response
+        return wrapper
+    return decorator
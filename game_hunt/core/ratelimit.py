@@ -0,0 +1,83 @@
+"""
+Ограничение частоты действий в кеше (token bucket): комментарии, голоса, скачивания, письма администрации.
+
+Политика RATE_LIMITS[имя] = (ёмкость, период в секундах): подряд можно сделать "ёмкость" действий,
+дальше жетоны восстанавливаются равномерно - ёмкость за период. (1, 60) - раз в минуту,
+(20, 60) - пачка из 20 и дальше по одному каждые 3 секунды.
+
+    retry_after = ratelimit.check(request, "comment", scope="games")   # 0 - можно, иначе сколько секунд ждать
+    @ratelimit.limit("vote")                             # 429 + Retry-After без вызова view
+
+Ведро - пользователь (гость - по IP), политика и, если задана, область scope
+(у каждого раздела свой счёт комментариев); БД не трогается.
+Чтение и запись ведра не атомарны: при одновременных запросах одного клиента
+может пройти лишний запрос - для защиты от флуда этого достаточно.
+"""
+import math
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse, JsonResponse
+
+DEFAULT_POLICIES = {
+    "comment": (1, 60),
+    "vote": (20, 60),
+    "download": (30, 60 * 60),
+    "contact_admin": (3, 60 * 60),
+}
+
+
+def policy(name):
+    return getattr(settings, "RATE_LIMITS", {}).get(name) or DEFAULT_POLICIES[name]
+
+
+def client_key(request):
+    user = getattr(request, "user", None)
+    if user is not None and user.is_authenticated:
+        return f"u{user.pk}"
+    return f"ip{request.META.get('REMOTE_ADDR', '')}"
+
+
+def check(request, name, cost=1, scope=None):
+    """Списывает cost жетонов. 0 - действие разрешено, иначе через сколько секунд повторить."""
+    capacity, period = policy(name)
+    rate = capacity / period
+    key = f"rl:{name}:{client_key(request)}"
+    if scope:
+        key = f"{key}:{scope}"
+    now = time.time()
+
+    tokens, updated = cache.get(key, (capacity, now))
+    tokens = min(capacity, tokens + (now - updated) * rate)
+    if tokens < cost:
+        return max(1, math.ceil((cost - tokens) / rate))
+
+    # ведро живёт, пока не наполнилось бы снова целиком
+    cache.set(key, (tokens - cost, now), math.ceil(period))
+    return 0
+
+
+def limited_response(request, retry_after, message=None):
+    message = message or f"Слишком много запросов. Повторите через {retry_after} сек."
+    if request.headers.get("x-requested-with") == "XMLHttpRequest":
+        response = JsonResponse({"error": message, "retry_after": retry_after}, status=429)
+    else:
+        response = HttpResponse(message, status=429, content_type="text/plain; charset=utf-8")
+    response["Retry-After"] = str(retry_after)
+    return response
+
+
+def limit(name, methods=None):
+    """Декоратор view: сверх политики name - 429 с Retry-After. methods - ограничивать только эти методы."""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if methods is None or request.method in methods:
+                retry_after = check(request, name)
+                if retry_after:
+                    return limited_response(request, retry_after)
+            return view(request, *args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,301 @@
+"""
+Единый полнотекстовый поиск по играм, обзорам, прохождениям и читам.
+
+Все четыре типа контента лежат в одном индексе:
+SQLite     -> виртуальная таблица FTS5 core_search_fts, ранжирование bm25.
+              rowid = object_id * 8 + код типа, поэтому запись обновляется/удаляется по rowid без сканирования.
+PostgreSQL -> таблица core_search_document (kind, object_id) с tsvector и GIN-индексом, ранжирование ts_rank.
+
+В документ попадают: название (title), "имена" (игра, слаг игры, логин и ник автора,
+жанры/разработчик/издатель для игр) и основной текст (описание игры, summary обзора/прохождения,
+функционал чита). Вес: title > names > body.
+
+Таблицы создаёт миграция core.0001_search_index, актуальность поддерживают сигналы из core.signals.
+На других СУБД индекс не поддерживается: search()/search_ids() возвращают None,
+вызывающий код откатывается к поиску подстрокой.
+"""
+import re
+from dataclasses import dataclass, field
+
+from django.db import connection
+from django.utils.html import strip_tags
+
+from cheats.models import Cheat
+from games.models import Game
+from reviews.models import Review
+from walkthroughs.models import Walkthrough
+
+FTS_TABLE = "core_search_fts"
+PG_TABLE = "core_search_document"
+
+# Код типа для rowid в FTS5 (не менять: на нём построены уже сохранённые rowid)
+KIND_CODES = {"game": 1, "review": 2, "walkthrough": 3, "cheat": 4}
+KIND_MODELS = {"game": Game, "review": Review, "walkthrough": Walkthrough, "cheat": Cheat}
+KINDS = tuple(KIND_CODES)
+
+# Веса колонок для bm25 (SQLite). В PostgreSQL те же приоритеты задаются метками A/B/C в setweight.
+TITLE_WEIGHT = 10.0
+NAMES_WEIGHT = 4.0
+BODY_WEIGHT = 1.0
+
+# Сколько лучших совпадений одного типа отдаём в выборку списка (дальше пагинация всё равно не уходит)
+MAX_RESULTS = 1000
+MAX_TOKENS = 10
+BATCH_SIZE = 500
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+@dataclass
+class SearchHit:
+    kind: str
+    object_id: int
+    rank: float
+
+
+@dataclass
+class SearchResults:
+    hits: list = field(default_factory=list)
+    # количество совпадений по каждому типу контента (без учёта limit)
+    facets: dict = field(default_factory=dict)
+
+
+def is_supported():
+    return connection.vendor in ("sqlite", "postgresql")
+
+
+def kind_of(obj):
+    for kind, model in KIND_MODELS.items():
+        if isinstance(obj, model):
+            return kind
+    return None
+
+
+def _tokens(query):
+    # Оставляем только "слова": кавычки, звёздочки и операторы FTS из пользовательского ввода не попадают в запрос
+    return TOKEN_RE.findall((query or "").lower())[:MAX_TOKENS]
+
+
+def _join(*parts):
+    return " ".join(p for p in parts if p)
+
+
+# ---- Построение документов ----
+
+def _game_rows(ids):
+    genres = {}
+    for game_id, name in Game.genres.through.objects.filter(game_id__in=ids).values_list("game_id", "genre__name"):
+        genres.setdefault(game_id, []).append(name)
+
+    rows = Game.objects.filter(pk__in=ids).values_list(
+        "pk", "title", "description", "is_adult_only", "developer__name", "publisher__name",
+    )
+    for pk, title, description, is_adult, developer, publisher in rows:
+        names = _join(*genres.get(pk, []), developer, publisher)
+        yield pk, title, names, strip_tags(description or ""), True, is_adult
+
+
+def _content_rows(model, body_field, ids):
+    # Обзоры, прохождения и читы устроены одинаково: своё название + игра + автор
+    rows = model.objects.filter(pk__in=ids).values_list(
+        "pk", "title", body_field, "is_published",
+        "game__title", "game__slug", "game__is_adult_only",
+        "author__username", "author__profile__nickname",
+    )
+    for pk, title, body, is_published, game_title, game_slug, is_adult, username, nickname in rows:
+        names = _join(game_title, game_slug, username, nickname)
+        yield pk, title, names, strip_tags(body or ""), is_published, is_adult
+
+
+def _rows(kind, ids):
+    if kind == "game":
+        return _game_rows(ids)
+    if kind == "review":
+        return _content_rows(Review, "summary", ids)
+    if kind == "walkthrough":
+        return _content_rows(Walkthrough, "summary", ids)
+    return _content_rows(Cheat, "functionality", ids)
+
+
+def _rowid(kind, object_id):
+    return object_id * 8 + KIND_CODES[kind]
+
+
+# ---- Обновление индекса ----
+
+def reindex(kind, ids):
+    """
+    Переиндексирует объекты одного типа по списку id.
+    Удалённые (не найденные) объекты из индекса убираются.
+    """
+    ids = list(ids)
+    if not is_supported() or not ids:
+        return
+
+    # большие наборы (например, все обзоры переименованной игры) индексируем пачками
+    for start in range(0, len(ids), BATCH_SIZE):
+        _reindex_batch(kind, ids[start:start + BATCH_SIZE])
+
+
+def _reindex_batch(kind, ids):
+    found = set()
+    with connection.cursor() as cursor:
+        for pk, title, names, body, is_published, is_adult in _rows(kind, ids):
+            found.add(pk)
+            params = [title or "", names, body, int(bool(is_published)), int(bool(is_adult))]
+            if connection.vendor == "sqlite":
+                rowid = _rowid(kind, pk)
+                cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [rowid])
+                cursor.execute(
+                    f"INSERT INTO {FTS_TABLE} (rowid, title, names, body, is_published, is_adult, kind, object_id) "
+                    f"VALUES (%s, %s, %s, %s, %s, %s, %s, %s)",
+                    [rowid, *params, kind, pk],
+                )
+            else:
+                title, names, body, is_published, is_adult = params
+                cursor.execute(
+                    f"""
+                    INSERT INTO {PG_TABLE} (kind, object_id, is_published, is_adult, document)
+                    VALUES (
+                        %s, %s, %s, %s,
+                        setweight(to_tsvector('simple', %s), 'A') ||
+                        setweight(to_tsvector('simple', %s), 'B') ||
+                        setweight(to_tsvector('simple', %s), 'C')
+                    )
+                    ON CONFLICT (kind, object_id) DO UPDATE SET
+                        is_published = EXCLUDED.is_published,
+                        is_adult = EXCLUDED.is_adult,
+                        document = EXCLUDED.document
+                    """,
+                    [kind, pk, bool(is_published), bool(is_adult), title, names, body],
+                )
+
+    missing = [pk for pk in ids if pk not in found]
+    if missing:
+        unindex(kind, missing)
+
+
+def unindex(kind, ids):
+    if not is_supported():
+        return
+    with connection.cursor() as cursor:
+        for pk in ids:
+            if connection.vendor == "sqlite":
+                cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [_rowid(kind, pk)])
+            else:
+                cursor.execute(f"DELETE FROM {PG_TABLE} WHERE kind = %s AND object_id = %s", [kind, pk])
+
+
+def index_object(obj):
+    kind = kind_of(obj)
+    if kind and obj.pk:
+        reindex(kind, [obj.pk])
+
+
+def prune_index():
+    # Удаляет из индекса записи объектов, которых уже нет в БД
+    if not is_supported():
+        return
+    with connection.cursor() as cursor:
+        for kind, model in KIND_MODELS.items():
+            table = model._meta.db_table
+            if connection.vendor == "sqlite":
+                cursor.execute(
+                    f"DELETE FROM {FTS_TABLE} WHERE kind = %s AND object_id NOT IN (SELECT id FROM {table})",
+                    [kind],
+                )
+            else:
+                cursor.execute(
+                    f"DELETE FROM {PG_TABLE} WHERE kind = %s AND object_id NOT IN (SELECT id FROM {table})",
+                    [kind],
+                )
+
+
+# ---- Поиск ----
+
+def _filters(kinds, adult_allowed, published_only):
+    sql = []
+    params = []
+    if kinds:
+        sql.append(f"kind IN ({', '.join(['%s'] * len(kinds))})")
+        params.extend(kinds)
+    if published_only:
+        sql.append("is_published = %s")
+        params.append(1 if connection.vendor == "sqlite" else True)
+    if not adult_allowed:
+        sql.append("is_adult = %s")
+        params.append(0 if connection.vendor == "sqlite" else False)
+    return "".join(f" AND {s}" for s in sql), params
+
+
+def search(query, kinds=None, adult_allowed=True, published_only=True, limit=MAX_RESULTS):
+    """
+    Ищет по всем (или только указанным в kinds) типам контента одним запросом к индексу.
+    Возвращает SearchResults: hits - типизированные совпадения по убыванию релевантности,
+    facets - количество совпадений по каждому типу.
+    None - если СУБД не поддерживает индекс.
+    """
+    if not is_supported():
+        return None
+
+    tokens = _tokens(query)
+    if not tokens:
+        return SearchResults(facets={kind: 0 for kind in (kinds or KINDS)})
+
+    where, params = _filters(kinds, adult_allowed, published_only)
+
+    with connection.cursor() as cursor:
+        if connection.vendor == "sqlite":
+            # "слово"* - поиск по префиксу каждого слова, все слова обязательны
+            match = " ".join(f'"{token}"*' for token in tokens)
+            cursor.execute(
+                f"""
+                SELECT kind, object_id, -bm25({FTS_TABLE}, %s, %s, %s) AS score
+                FROM {FTS_TABLE}
+                WHERE {FTS_TABLE} MATCH %s{where}
+                ORDER BY score DESC
+                LIMIT %s
+                """,
+                [TITLE_WEIGHT, NAMES_WEIGHT, BODY_WEIGHT, match, *params, limit],
+            )
+            hits = [SearchHit(kind, object_id, rank) for kind, object_id, rank in cursor.fetchall()]
+
+            cursor.execute(
+                f"SELECT kind, COUNT(*) FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s{where} GROUP BY kind",
+                [match, *params],
+            )
+        else:
+            tsquery = " & ".join(f"{token}:*" for token in tokens)
+            cursor.execute(
+                f"""
+                SELECT kind, object_id, ts_rank(document, to_tsquery('simple', %s)) AS score
+                FROM {PG_TABLE}
+                WHERE document @@ to_tsquery('simple', %s){where}
+                ORDER BY score DESC, object_id DESC
+                LIMIT %s
+                """,
+                [tsquery, tsquery, *params, limit],
+            )
+            hits = [SearchHit(kind, object_id, rank) for kind, object_id, rank in cursor.fetchall()]
+
+            cursor.execute(
+                f"SELECT kind, COUNT(*) FROM {PG_TABLE} WHERE document @@ to_tsquery('simple', %s){where} "
+                f"GROUP BY kind",
+                [tsquery, *params],
+            )
+
+        facets = {kind: 0 for kind in (kinds or KINDS)}
+        facets.update(dict(cursor.fetchall()))
+
+    return SearchResults(hits=hits, facets=facets)
+
+
+def search_ids(kind, query, **kwargs):
+    """
+    id объектов одного типа по убыванию релевантности - для фильтрации списков (pk__in=...).
+    None - если СУБД не поддерживает индекс.
+    """
+    results = search(query, kinds=[kind], **kwargs)
+    if results is None:
+        return None
+    return [hit.object_id for hit in results.hits]
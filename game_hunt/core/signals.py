@@ -0,0 +1,360 @@
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete, pre_save, pre_delete, m2m_changed
+from django.dispatch import receiver
+
+from cheats.models import Cheat, CheatComment
+from games.models import Game, GameComment, GameImage, Genre, Developer, Platform, Publisher
+from games.utils import bump_list_counts
+from reviews.models import Review, ReviewComment, ReviewImage
+from users.models import Profile
+from walkthroughs.models import Walkthrough, WalkthroughComment, WalkthroughImage
+from . import autocomplete, fragments, images, pagecache, search
+
+
+# ---- Единый поисковый индекс (core.search) ----
+
+# Контент, в документ которого входят название игры и автор
+AUTHORED_KINDS = {"review": Review, "walkthrough": Walkthrough, "cheat": Cheat}
+
+
+def _reindex_game_content(game_ids):
+    # Обзоры, прохождения и читы игр: в их документах лежит название/слаг игры и флаг 16+
+    for kind, model in AUTHORED_KINDS.items():
+        search.reindex(kind, model.objects.filter(game_id__in=game_ids).values_list("pk", flat=True))
+
+
+def _reindex_author_content(user_id):
+    for kind, model in AUTHORED_KINDS.items():
+        search.reindex(kind, model.objects.filter(author_id=user_id).values_list("pk", flat=True))
+
+
+@receiver(post_save, sender=Game)
+@receiver(post_save, sender=Review)
+@receiver(post_save, sender=Walkthrough)
+@receiver(post_save, sender=Cheat)
+def index_on_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    search.index_object(instance)
+
+
+@receiver(post_delete, sender=Game)
+@receiver(post_delete, sender=Review)
+@receiver(post_delete, sender=Walkthrough)
+@receiver(post_delete, sender=Cheat)
+def unindex_on_delete(sender, instance, **kwargs):
+    search.unindex(search.kind_of(instance), [instance.pk])
+
+
+# Поля игры, которые попадают в документы обзоров/прохождений/читов
+GAME_SHARED_FIELDS = ("title", "slug", "is_adult_only")
+
+
+@receiver(pre_save, sender=Game)
+def remember_game_shared_fields(sender, instance, **kwargs):
+    if not instance.pk:
+        instance._search_shared = None
+        return
+    instance._search_shared = Game.objects.filter(pk=instance.pk).values_list(*GAME_SHARED_FIELDS).first()
+
+
+@receiver(post_save, sender=Game)
+def reindex_game_content_on_change(sender, instance, created, raw=False, **kwargs):
+    if created or raw:
+        return
+    current = tuple(getattr(instance, name) for name in GAME_SHARED_FIELDS)
+    if getattr(instance, "_search_shared", None) != current:
+        _reindex_game_content([instance.pk])
+
+
+@receiver(m2m_changed, sender=Game.genres.through)
+def index_game_on_genres_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if reverse and action == "pre_clear":
+        # genre.games.clear() - pk_set не передаётся, запоминаем игры заранее
+        instance._indexed_game_ids = list(instance.games.values_list("pk", flat=True))
+        return
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if not reverse:
+        search.reindex("game", [instance.pk])
+        return
+    # genre.games.add(...) - instance это жанр, а изменились игры из pk_set
+    game_ids = pk_set if action != "post_clear" else getattr(instance, "_indexed_game_ids", None)
+    if game_ids:
+        search.reindex("game", game_ids)
+
+
+# Поле Game, через которое жанр/разработчик/издатель связан с игрой
+RELATED_GAME_FIELDS = {Genre: "genres", Developer: "developer", Publisher: "publisher"}
+
+
+def _game_ids_of(instance):
+    return list(
+        Game.objects.filter(**{RELATED_GAME_FIELDS[type(instance)]: instance}).values_list("pk", flat=True)
+    )
+
+
+# Переименовали жанр/разработчика/издателя -> обновляем документы связанных игр
+@receiver(post_save, sender=Genre)
+@receiver(post_save, sender=Developer)
+@receiver(post_save, sender=Publisher)
+def reindex_games_on_name_change(sender, instance, created, raw=False, **kwargs):
+    if created or raw:
+        return
+    search.reindex("game", _game_ids_of(instance))
+
+
+# При удалении связи у игр снимаются без сигналов (SET_NULL / каскад в m2m),
+# поэтому запоминаем игры до удаления и переиндексируем их после
+@receiver(pre_delete, sender=Genre)
+@receiver(pre_delete, sender=Developer)
+@receiver(pre_delete, sender=Publisher)
+def remember_games_before_delete(sender, instance, **kwargs):
+    instance._indexed_game_ids = _game_ids_of(instance)
+
+
+@receiver(post_delete, sender=Genre)
+@receiver(post_delete, sender=Developer)
+@receiver(post_delete, sender=Publisher)
+def reindex_games_after_delete(sender, instance, **kwargs):
+    game_ids = getattr(instance, "_indexed_game_ids", None)
+    if game_ids:
+        search.reindex("game", game_ids)
+
+
+# Ник и логин автора входят в документы его контента.
+# Сохранения с update_fields без этих полей (last_login и т.п.) не трогаем.
+@receiver(pre_save, sender=Profile)
+def remember_prev_nickname(sender, instance, update_fields=None, **kwargs):
+    if not instance.pk or (update_fields is not None and "nickname" not in update_fields):
+        instance._prev_nickname = instance.nickname
+        return
+    instance._prev_nickname = Profile.objects.filter(pk=instance.pk).values_list("nickname", flat=True).first()
+
+
+@receiver(post_save, sender=Profile)
+def reindex_content_on_nickname_change(sender, instance, created, raw=False, **kwargs):
+    if created or raw:
+        return
+    if getattr(instance, "_prev_nickname", instance.nickname) != instance.nickname:
+        _reindex_author_content(instance.user_id)
+
+
+@receiver(pre_save, sender=User)
+def remember_prev_username(sender, instance, update_fields=None, **kwargs):
+    if not instance.pk or (update_fields is not None and "username" not in update_fields):
+        instance._prev_username = instance.username
+        return
+    instance._prev_username = User.objects.filter(pk=instance.pk).values_list("username", flat=True).first()
+
+
+@receiver(post_save, sender=User)
+def reindex_content_on_username_change(sender, instance, created, raw=False, **kwargs):
+    if created or raw:
+        return
+    if getattr(instance, "_prev_username", instance.username) != instance.username:
+        _reindex_author_content(instance.pk)
+
+
+# ---- Индекс подсказок (core.autocomplete) ----
+# Правим индекс после коммита, чтобы другие процессы не перестроились по ещё не записанным данным.
+# Игру и профиль трогаем только при смене названия/ника/флага 16+: профиль сохраняется часто.
+
+@receiver(post_save, sender=Game)
+def autocomplete_game_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    current = tuple(getattr(instance, name) for name in GAME_SHARED_FIELDS)
+    if created or getattr(instance, "_search_shared", None) != current:
+        transaction.on_commit(lambda: autocomplete.update(instance))
+
+
+@receiver(post_save, sender=Developer)
+@receiver(post_save, sender=Publisher)
+def autocomplete_company_saved(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    transaction.on_commit(lambda: autocomplete.update(instance))
+
+
+@receiver(post_save, sender=Profile)
+def autocomplete_profile_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created or getattr(instance, "_prev_nickname", instance.nickname) != instance.nickname:
+        transaction.on_commit(lambda: autocomplete.update(instance))
+
+
+@receiver(post_delete, sender=Game)
+@receiver(post_delete, sender=Developer)
+@receiver(post_delete, sender=Publisher)
+@receiver(post_delete, sender=Profile)
+def autocomplete_deleted(sender, instance, **kwargs):
+    transaction.on_commit(lambda: autocomplete.remove(instance))
+
+
+# ---- Кеш счётчиков списков (games.utils.adult_counts) ----
+# Игра влияет и на списки обзоров/прохождений: в них считается флаг 16+ игры
+
+@receiver(post_save, sender=Game)
+@receiver(post_delete, sender=Game)
+def bump_counts_on_game_change(sender, raw=False, **kwargs):
+    if not raw:
+        bump_list_counts("games", "reviews", "walkthroughs")
+
+
+@receiver(m2m_changed, sender=Game.genres.through)
+@receiver(m2m_changed, sender=Game.platforms.through)
+def bump_counts_on_game_relations(sender, action, **kwargs):
+    if action in ("post_add", "post_remove", "post_clear"):
+        bump_list_counts("games")
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def bump_counts_on_review_change(sender, raw=False, **kwargs):
+    if not raw:
+        bump_list_counts("reviews")
+
+
+@receiver(post_save, sender=Walkthrough)
+@receiver(post_delete, sender=Walkthrough)
+def bump_counts_on_walkthrough_change(sender, raw=False, **kwargs):
+    if not raw:
+        bump_list_counts("walkthroughs")
+
+
+# ---- Кеш страниц для гостей (core.pagecache) ----
+# Игра видна и в списках обзоров/прохождений/читов (обложка, название), поэтому страницы
+# этих разделов зависят и от пространства "games" - см. декораторы во views
+
+PAGE_NAMESPACES = {
+    Game: "games", GameImage: "games", GameComment: "games",
+    Genre: "games", Platform: "games", Developer: "games", Publisher: "games",
+    Review: "reviews", ReviewImage: "reviews", ReviewComment: "reviews",
+    Walkthrough: "walkthroughs", WalkthroughImage: "walkthroughs", WalkthroughComment: "walkthroughs",
+    Cheat: "cheats", CheatComment: "cheats",
+}
+
+
+def bump_page_cache(sender, raw=False, **kwargs):
+    if not raw:
+        pagecache.bump(PAGE_NAMESPACES[sender])
+
+
+for _model in PAGE_NAMESPACES:
+    post_save.connect(bump_page_cache, sender=_model, dispatch_uid=f"page_cache_save_{_model._meta.label_lower}")
+    post_delete.connect(bump_page_cache, sender=_model, dispatch_uid=f"page_cache_delete_{_model._meta.label_lower}")
+
+
+@receiver(m2m_changed, sender=Game.genres.through)
+@receiver(m2m_changed, sender=Game.platforms.through)
+def bump_page_cache_on_game_relations(sender, action, **kwargs):
+    if action in ("post_add", "post_remove", "post_clear"):
+        pagecache.bump("games")
+
+
+# ---- Кеш фрагментов карточек (core.fragments, тег {% cache_for %}) ----
+# Картинка/комментарий -> версия связи родителя; платформы игры -> версия "platforms"
+
+# модель -> (поле родителя, связь)
+FRAGMENT_RELATIONS = {
+    GameImage: ("game", "gallery"),
+    GameComment: ("game", "comments"),
+    ReviewImage: ("review", "images"),
+    ReviewComment: ("review", "comments"),
+    WalkthroughImage: ("walkthrough", "images"),
+    WalkthroughComment: ("walkthrough", "comments"),
+    CheatComment: ("cheat", "comments"),
+}
+
+
+def bump_parent_fragment(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    parent, relation = FRAGMENT_RELATIONS[sender]
+    parent_field = sender._meta.get_field(parent)
+    fragments.bump(parent_field.related_model, getattr(instance, parent_field.attname), relation)
+
+
+for _model in FRAGMENT_RELATIONS:
+    post_save.connect(bump_parent_fragment, sender=_model, dispatch_uid=f"fragment_save_{_model._meta.label_lower}")
+    post_delete.connect(bump_parent_fragment, sender=_model, dispatch_uid=f"fragment_delete_{_model._meta.label_lower}")
+
+
+@receiver(m2m_changed, sender=Game.platforms.through)
+def bump_platforms_fragment(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == "pre_clear" and reverse:
+        instance._fragment_game_ids = list(instance.games.values_list("pk", flat=True))
+        return
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if not reverse:
+        fragments.bump(Game, instance.pk, "platforms")
+        return
+    game_ids = pk_set if action != "post_clear" else getattr(instance, "_fragment_game_ids", ())
+    for game_id in game_ids or ():
+        fragments.bump(Game, game_id, "platforms")
+
+
+@receiver(post_save, sender=Platform)
+def bump_platforms_fragment_on_rename(sender, instance, created, raw=False, **kwargs):
+    if created or raw:
+        return
+    for game_id in Game.objects.filter(platforms=instance).values_list("pk", flat=True):
+        fragments.bump(Game, game_id, "platforms")
+
+
+# Ник и аватар автора видны в комментариях на любых карточках - сбрасываем все фрагменты
+@receiver(pre_save, sender=Profile)
+def remember_prev_profile_image(sender, instance, update_fields=None, **kwargs):
+    if not instance.pk or (update_fields is not None and "profile_image" not in update_fields):
+        instance._prev_profile_image = instance.profile_image.name
+        return
+    instance._prev_profile_image = (
+        Profile.objects.filter(pk=instance.pk).values_list("profile_image", flat=True).first()
+    )
+
+
+@receiver(post_save, sender=Profile)
+def bump_fragments_on_author_change(sender, instance, created, raw=False, **kwargs):
+    if created or raw:
+        return
+    if (getattr(instance, "_prev_nickname", instance.nickname) != instance.nickname
+            or getattr(instance, "_prev_profile_image", instance.profile_image.name) != instance.profile_image.name):
+        fragments.bump_global()
+
+
+# ---- Загруженные картинки (core.images) ----
+# Галереи и аватары сначала нормализуются в фоне, копии для srcset строятся уже по итоговому файлу.
+# Остальное - копии сразу после загрузки, чтобы первый показ уже шёл с уменьшенными копиями.
+# Уже обработанные файлы повторно в очередь не попадают - частые сохранения профиля дёшевы.
+
+IMAGE_FIELDS = {
+    Game: ("cover_image",),
+    GameImage: ("image",),
+    Review: ("cover_image",),
+    ReviewImage: ("image",),
+    Walkthrough: ("cover_image",),
+    WalkthroughImage: ("image",),
+    Cheat: ("cover_image",),
+    Profile: ("profile_image",),
+}
+
+
+def process_uploaded_images(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    for field in IMAGE_FIELDS[sender]:
+        image = getattr(instance, field)
+        if not image:
+            continue
+        if images.needs_normalizing(instance, field):
+            images.schedule_normalize(instance, field)
+        else:
+            images.variants(image)
+
+
+for _model in IMAGE_FIELDS:
+    post_save.connect(process_uploaded_images, sender=_model, dispatch_uid=f"image_variants_{_model._meta.label_lower}")
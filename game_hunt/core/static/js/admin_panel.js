@@ -16,46 +16,88 @@ function getCookie(name) {
 document.addEventListener("DOMContentLoaded", () => {
   const csrftoken = getCookie("csrftoken");
 
-  document.querySelectorAll(".js-toggle-ban").forEach((btn) => {
-    btn.addEventListener("click", async () => {
-      const userId = btn.dataset.userId;
-      if (!userId) return;
-
-      try {
-        const res = await fetch(`/admin-panel/users/${userId}/toggle-ban-ajax/`, {
-          method: "POST",
-          headers: {
-            "Content-Type": "application/json",
-            "X-CSRFToken": csrftoken,
-          },
-          body: "{}",
-        });
-
-        const data = await res.json();
-        if (!data.ok) return;
-
-        const row = document.querySelector(`[data-user-row="${userId}"]`);
-        if (!row) return;
-
-        const label = row.querySelector("[data-ban-label]");
-          if (data.is_active) {
-            btn.textContent = "Забанить";
-            btn.classList.add("is-ban");
-            btn.classList.remove("is-unban");
-
-          if (label) { label.textContent = "активен"; label.className = "st-ok"; }
-        } else {
-            btn.textContent = "Разбанить";
-            btn.classList.add("is-unban");
-            btn.classList.remove("is-ban");
-
-          if (label) { label.textContent = "забанен"; label.className = "st-warn"; }
+  // делегирование: строки пользователей догружаются кнопкой "Показать ещё"
+  document.addEventListener("click", async (e) => {
+    const btn = e.target.closest(".js-toggle-ban");
+    if (!btn) return;
+
+    const userId = btn.dataset.userId;
+    if (!userId) return;
+
+    try {
+      const res = await fetch(`/admin-panel/users/${userId}/toggle-ban-ajax/`, {
+        method: "POST",
+        headers: {
+          "Content-Type": "application/json",
+          "X-CSRFToken": csrftoken,
+        },
+        body: "{}",
+      });
+
+      const data = await res.json();
+      if (!data.ok) return;
+
+      const row = document.querySelector(`[data-user-row="${userId}"]`);
+      if (!row) return;
+
+      const label = row.querySelector("[data-ban-label]");
+        if (data.is_active) {
+          btn.textContent = "Забанить";
+          btn.classList.add("is-ban");
+          btn.classList.remove("is-unban");
+
+        if (label) { label.textContent = "активен"; label.className = "st-ok"; }
+      } else {
+          btn.textContent = "Разбанить";
+          btn.classList.add("is-unban");
+          btn.classList.remove("is-ban");
+
+        if (label) { label.textContent = "забанен"; label.className = "st-warn"; }
 }
-      } catch (e) {
-        console.error(e);
+    } catch (err) {
+      console.error(err);
+    }
+  });
+
+  // ====== Dashboard: "Показать ещё" - следующая страница секции (JSON со строками таблицы) ======
+  document.addEventListener("click", async (e) => {
+    const btn = e.target.closest(".js-admin-more");
+    if (!btn || btn.disabled) return;
+
+    const tbody = btn.closest(".admin-scroll")?.querySelector(".js-admin-rows");
+    if (!tbody) return;
+
+    btn.disabled = true;
+    try {
+      const sep = btn.dataset.url.includes("?") ? "&" : "?";
+      const res = await fetch(`${btn.dataset.url}${sep}cursor=${encodeURIComponent(btn.dataset.cursor)}`, {
+        headers: { "X-Requested-With": "XMLHttpRequest" },
+      });
+      const data = await res.json();
+      if (!data.ok) return;
+
+      tbody.insertAdjacentHTML("beforeend", data.html);
+      if (data.next_cursor) {
+        btn.dataset.cursor = data.next_cursor;
+      } else {
+        btn.closest(".admin-more").remove();
       }
-    });
+    } catch (err) {
+      console.error(err);
+    } finally {
+      btn.disabled = false;
+    }
   });
+// ====== Moderation: "выбрать все" ======
+  const selectAll = document.querySelector(".js-moderation-all");
+  if (selectAll) {
+    selectAll.addEventListener("change", () => {
+      document.querySelectorAll(".js-moderation-item").forEach((box) => {
+        box.checked = selectAll.checked;
+      });
+    });
+  }
+
 // ====== Comments page: auto-submit radios ======
   const filtersForm = document.querySelector(".js-comments-filters");
   if (filtersForm) {
@@ -0,0 +1,27 @@
+// Прогресс рассылки уведомлений (users/admin-broadcasts/<id>/progress/)
+document.addEventListener('DOMContentLoaded', () => {
+  const box = document.getElementById('broadcast-progress');
+  if (!box || box.dataset.status === 'done') return;
+
+  const url = box.dataset.progressUrl;
+  const bar = box.querySelector('.js-broadcast-bar');
+  const status = box.querySelector('.js-broadcast-status');
+  const sent = box.querySelector('.js-broadcast-sent');
+  const total = box.querySelector('.js-broadcast-total');
+
+  function poll() {
+    fetch(url, { headers: { 'X-Requested-With': 'XMLHttpRequest' } })
+      .then((r) => r.json())
+      .then((data) => {
+        if (!data.ok) return;
+        bar.value = data.progress;
+        status.textContent = data.status_display;
+        sent.textContent = data.sent;
+        total.textContent = data.total;
+        if (data.status !== 'done') setTimeout(poll, 2000);
+      })
+      .catch(() => setTimeout(poll, 5000));
+  }
+
+  setTimeout(poll, 1000);
+});
@@ -0,0 +1,101 @@
+// Подсказки в строке поиска игр (games/autocomplete/)
+document.addEventListener('DOMContentLoaded', () => {
+  const wrap = document.querySelector('.ac-wrap[data-autocomplete-url]');
+  if (!wrap) return;
+
+  const input = wrap.querySelector('input[name="search"]');
+  const list = wrap.querySelector('.ac-list');
+  const url = wrap.dataset.autocompleteUrl;
+
+  const TYPE_LABELS = {
+    game: 'игра',
+    developer: 'разработчик',
+    publisher: 'издатель',
+    user: 'пользователь'
+  };
+
+  let timer = null;
+  let controller = null;
+  let active = -1;
+
+  function hide() {
+    list.hidden = true;
+    list.innerHTML = '';
+    active = -1;
+  }
+
+  function render(results) {
+    list.innerHTML = '';
+    active = -1;
+    if (!results.length) {
+      hide();
+      return;
+    }
+    results.forEach((item) => {
+      const li = document.createElement('li');
+      li.className = 'ac-item';
+      const a = document.createElement('a');
+      a.href = item.url;
+      const label = document.createElement('span');
+      label.textContent = item.label;
+      const type = document.createElement('span');
+      type.className = 'ac-type';
+      type.textContent = TYPE_LABELS[item.type] || '';
+      a.append(label, type);
+      li.append(a);
+      list.append(li);
+    });
+    list.hidden = false;
+  }
+
+  function load(query) {
+    // Предыдущий запрос больше не нужен - отменяем, чтобы старый ответ не перетёр новый
+    if (controller) controller.abort();
+    controller = new AbortController();
+
+    fetch(`${url}?q=${encodeURIComponent(query)}`, { signal: controller.signal })
+      .then((r) => r.json())
+      .then((data) => {
+        if (data.ok && input.value.trim() === query) render(data.results);
+      })
+      .catch(() => {});
+  }
+
+  function setActive(index) {
+    const items = list.querySelectorAll('.ac-item');
+    if (!items.length) return;
+    active = (index + items.length) % items.length;
+    items.forEach((el, i) => el.classList.toggle('is-active', i === active));
+  }
+
+  input.addEventListener('input', () => {
+    clearTimeout(timer);
+    const query = input.value.trim();
+    if (query.length < 2) {
+      hide();
+      return;
+    }
+    timer = setTimeout(() => load(query), 150);
+  });
+
+  input.addEventListener('keydown', (e) => {
+    if (list.hidden) return;
+    if (e.key === 'ArrowDown') {
+      e.preventDefault();
+      setActive(active + 1);
+    } else if (e.key === 'ArrowUp') {
+      e.preventDefault();
+      setActive(active - 1);
+    } else if (e.key === 'Enter' && active >= 0) {
+      // Enter по выбранной подсказке - переход к ней, без выбора - обычная отправка формы
+      e.preventDefault();
+      window.location.href = list.querySelectorAll('.ac-item a')[active].href;
+    } else if (e.key === 'Escape') {
+      hide();
+    }
+  });
+
+  document.addEventListener('click', (e) => {
+    if (!wrap.contains(e.target)) hide();
+  });
+});
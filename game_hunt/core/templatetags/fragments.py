@@ -0,0 +1,54 @@
+from django import template
+from django.core.cache import cache
+
+from core import fragments, images
+
+register = template.Library()
+
+
+class CacheForNode(template.Node):
+    def __init__(self, nodelist, obj, relations, per_user):
+        self.nodelist = nodelist
+        self.obj = obj
+        self.relations = relations
+        self.per_user = per_user
+
+    def render(self, context):
+        obj = self.obj.resolve(context)
+        relations = [str(r.resolve(context)) for r in self.relations]
+        viewer = fragments.viewer_signature(context.get("request")) if self.per_user else None
+
+        key = fragments.fragment_key(obj, relations, viewer)
+        content = cache.get(key)
+        if content is None:
+            request = context.get("request")
+            pending = images.pending_count(request)
+            content = self.nodelist.render(context)
+            # внутри картинка без копий (core.images) - такой фрагмент не кешируем
+            if images.pending_count(request) == pending:
+                cache.set(key, content, fragments.ttl())
+        return content
+
+
+@register.tag
+def cache_for(parser, token):
+    """
+    {% cache_for game "gallery" %} ... {% endcache_for %}
+    {% cache_for review "comments" per_user %} ... {% endcache_for %}
+
+    Фрагмент живёт, пока не изменились объект (updated_at) и версии связей (core.fragments).
+    """
+    bits = token.split_contents()
+    if len(bits) < 3:
+        raise template.TemplateSyntaxError(f"'{bits[0]}' ожидает объект и хотя бы одну связь")
+    per_user = bits[-1] == "per_user"
+    if per_user:
+        bits = bits[:-1]
+    nodelist = parser.parse(("endcache_for",))
+    parser.delete_first_token()
+    return CacheForNode(
+        nodelist,
+        parser.compile_filter(bits[1]),
+        [parser.compile_filter(bit) for bit in bits[2:]],
+        per_user,
+    )
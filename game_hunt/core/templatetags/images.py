@@ -0,0 +1,27 @@
+from django import template
+from django.forms.utils import flatatt
+from django.utils.html import format_html, format_html_join
+
+from core import images
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def picture(context, image, sizes="100vw", **attrs):
+    """
+    {% picture game.cover_image sizes="(max-width: 600px) 45vw, 220px" class="game-cover" alt=game.title %}
+
+    <picture> с AVIF/WebP-копиями разной ширины (core.images); атрибуты уходят в <img>.
+    Пока копии не построены - обычный <img> с оригиналом, и страница с ним не кешируется.
+    """
+    img = format_html("<img src=\"{}\"{}>", image.url, flatatt(attrs))
+    sources = images.sources(image, context.get("request"))
+    if not sources:
+        return img
+    return format_html(
+        "<picture>{}{}</picture>",
+        format_html_join("", "<source type=\"{}\" srcset=\"{}\" sizes=\"{}\">",
+                         ((mime, srcset, sizes) for mime, srcset in sources)),
+        img,
+    )
@@ -1,3 +1,17 @@
+from django.contrib.auth.models import User
+from django.db.models import Value
 from django.test import TestCase
 
-# Create your tests here.
+from core.votes import liked_percent_expression, liked_percent_value
+
+
+class LikedPercentTests(TestCase):
+    def test_sql_and_python_agree_on_ties(self):
+        # 1 из 8 = 12.5%, 1 из 40 = 2.5%: оба пути округляют половину вверх
+        user = User.objects.create(username="voter")
+        for likes, dislikes, expected in ((1, 7, 13), (1, 39, 3), (1, 1, 50), (2, 1, 67), (0, 0, 0)):
+            sql = (User.objects.filter(pk=user.pk)
+                   .annotate(p=liked_percent_expression(Value(likes), Value(dislikes)))
+                   .values_list("p", flat=True).get())
+            self.assertEqual(sql, expected, (likes, dislikes))
+            self.assertEqual(liked_percent_value(likes, dislikes), expected, (likes, dislikes))
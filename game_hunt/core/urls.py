@@ -8,8 +8,12 @@ urlpatterns = [
     path('contacts/', views.contacts, name='contacts'),
     path('privacy_policy/', views.privacy_policy, name='privacy_policy'),
     path("rules/", TemplateView.as_view(template_name="core/rules.html"), name="rules"),
+    path("search/", views.site_search, name="site_search"),
 
     path('admin-panel/', views.admin_dashboard, name='admin_dashboard'),
+    path('admin-panel/sections/<str:section>/', views.admin_dashboard_section, name='admin_dashboard_section'),
+    path('admin-panel/moderation/', views.admin_moderation, name='admin_moderation'),
+    path('admin-panel/moderation/action/', views.admin_moderation_action, name='admin_moderation_action'),
 
 
     path('admin-panel/games/add/', views.admin_game_create, name='admin_game_create'),
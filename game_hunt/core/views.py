@@ -1,4 +1,5 @@
 from django.shortcuts import render, redirect, get_object_or_404
+from django.template.loader import render_to_string
 from django.contrib.auth.models import User
 from django.contrib import messages
 from django.contrib.auth.decorators import user_passes_test
@@ -8,6 +9,7 @@ from django.views.decorators.http import require_POST
 from django.db import transaction
 from games.models import Game, GameComment
 from games.forms import GameAdminForm, GameImageFormSet, GameAdminPanelForm
+from games.utils import paginate_cursor
 from .utils import staff_check
 from django.urls import reverse
 from reviews.forms import AdminReviewCreateForm, ReviewImageFormSet, ReviewAdminForm
@@ -21,6 +23,8 @@ from games.models import GameComment
 from reviews.models import ReviewComment
 from walkthroughs.models import WalkthroughComment
 from cheats.models import CheatComment
+from reviews.utils import can_view_adult
+from . import search, moderation
 
 
 def homepage(request):
@@ -39,81 +43,217 @@ def privacy_policy(request):
     return render(request, 'core/privacy_policy.html')
 
 
+# Сколько совпадений максимум отдаёт site_search за один запрос
+SITE_SEARCH_LIMIT = 50
+
+# kind -> (url name, поле для reverse)
+SEARCH_URLS = {
+    "game": ("game_detail", "slug"),
+    "review": ("review_detail", "pk"),
+    "walkthrough": ("walkthrough_detail", "slug"),
+    "cheat": ("cheat_detail", "slug"),
+}
+
+
+def site_search(request):
+    """
+    Поиск по всему сайту (игры, обзоры, прохождения, читы) одним запросом к индексу.
+    ?q=... [&type=game&type=review] [&limit=20]
+    """
+    query = request.GET.get("q", "").strip()
+    kinds = [k for k in request.GET.getlist("type") if k in search.KINDS] or None
+    try:
+        limit = min(max(int(request.GET.get("limit", 20)), 1), SITE_SEARCH_LIMIT)
+    except ValueError:
+        limit = 20
+
+    results = search.search(query, kinds=kinds, adult_allowed=can_view_adult(request), limit=limit)
+    if results is None:
+        return JsonResponse({"ok": False, "error": "Поиск недоступен"}, status=503)
+
+    # подтягиваем объекты пачкой на каждый тип и ещё раз проверяем публикацию:
+    # индекс мог не успеть обновиться (например, после bulk update)
+    ids_by_kind = {}
+    for hit in results.hits:
+        ids_by_kind.setdefault(hit.kind, []).append(hit.object_id)
+
+    objects = {}
+    for kind, ids in ids_by_kind.items():
+        qs = search.KIND_MODELS[kind].objects.filter(pk__in=ids)
+        if kind != "game":
+            qs = qs.filter(is_published=True).select_related("game")
+        objects[kind] = qs.in_bulk()
+
+    items = []
+    for hit in results.hits:
+        obj = objects[hit.kind].get(hit.object_id)
+        if obj is None:
+            continue
+        url_name, url_field = SEARCH_URLS[hit.kind]
+        game = obj if hit.kind == "game" else obj.game
+        items.append({
+            "type": hit.kind,
+            "id": obj.pk,
+            "title": obj.title,
+            "url": reverse(url_name, args=[getattr(obj, url_field)]),
+            "game": game.title,
+            "rank": round(hit.rank, 4),
+        })
+
+    return JsonResponse({"ok": True, "query": query, "results": items, "facets": results.facets})
+
+
+# ---- Секции админ-панели ----
+# Каждая секция - страница курсорной пагинации (games.utils.paginate_cursor) по DASHBOARD_PAGE_SIZE строк;
+# only() грузит лишь выводимые в таблице колонки (шифруемые поля профиля не читаются вовсе).
+# Следующие страницы догружаются через admin_dashboard_section (JSON с готовыми строками таблицы).
+
+DASHBOARD_PAGE_SIZE = 50
+DASHBOARD_SECTIONS = ("games", "reviews", "walkthroughs", "cheats", "users")
+# Колонки автора в таблицах обзоров/прохождений/читов
+AUTHOR_COLUMNS = ("game__title", "author__username", "author__profile__id", "author__profile__nickname")
+
+
+def _content_section(model, q, published, author, *columns):
+    qs = (model.objects
+          .select_related("game", "author", "author__profile")
+          .only("id", "title", "is_published", "updated_at", *columns, *AUTHOR_COLUMNS)
+          .order_by("is_published", "-updated_at", "-id"))
+    # фильтры по индексам (is_published, updated_at) и (author, updated_at)
+    if published in ("0", "1"):
+        qs = qs.filter(is_published=published == "1")
+    if author.isdigit():
+        qs = qs.filter(author_id=int(author))
+    if q:
+        qs = qs.filter(
+            Q(title__icontains=q) |
+            Q(game__title__icontains=q) |
+            Q(author__username__icontains=q) |
+            Q(author__profile__nickname__icontains=q)
+        )
+    return qs
+
+
+def _dashboard_queryset(request, section):
+    q = (request.GET.get("q") or "").strip()
+    published = request.GET.get("published", "")
+    author = request.GET.get("author", "")
+
+    if section == "games":
+        qs = Game.objects.only("id", "title", "slug", "created_at").order_by("-created_at", "-id")
+        if q:
+            qs = qs.filter(title__icontains=q)
+        return qs
+    if section == "reviews":
+        return _content_section(Review, q, published, author)
+    if section == "walkthroughs":
+        return _content_section(Walkthrough, q, published, author, "slug")
+    if section == "cheats":
+        return _content_section(Cheat, q, published, author, "slug")
+
+    qs = (
+        User.objects.select_related("profile")
+        .only("id", "username", "is_active", "is_staff", "is_superuser",
+              "profile__id", "profile__user_id", "profile__nickname", "profile__last_seen")
+        .order_by("username")
+    )
+    if q:
+        qs = qs.filter(
+            Q(username__icontains=q) |
+            Q(profile__nickname__icontains=q)
+        )
+    return qs
+
+
+def _dashboard_page(request, section):
+    return paginate_cursor(request, _dashboard_queryset(request, section), DASHBOARD_PAGE_SIZE)
+
+
 # Главная страница админ-панели
 @user_passes_test(staff_check, login_url="account_login")  # CHANGED: login_url
 def admin_dashboard(request):
     """
     CHANGED:
     - секции через ?section=games|reviews|walkthroughs|cheats|users
-    - поиск через ?q=
-    - сортировки: новые сверху
+    - поиск через ?q=, фильтры ?published=0|1 и ?author=<id> (обзоры, прохождения, читы)
+    - сортировки: новые сверху, постранично по курсору
     """
     section = request.GET.get("section", "games")
-    q = (request.GET.get("q") or "").strip()
+    if section not in DASHBOARD_SECTIONS:
+        section = "games"
+
+    page = _dashboard_page(request, section)
+    filters = request.GET.copy()
+    filters.pop("cursor", None)
 
     context = {
         "section": section,
-        "q": q,
+        "q": (request.GET.get("q") or "").strip(),
+        "published": request.GET.get("published", ""),
+        "author": request.GET.get("author", ""),
+        section: page,
+        "page": page,
+        "filters_query": filters.urlencode(),
     }
+    return render(request, "core/admin_dashboard.html", context)
 
-    if section == "games":
-        qs = Game.objects.all().order_by("-created_at", "-id")
-        if q:
-            qs = qs.filter(title__icontains=q)
-        context["games"] = qs
 
-    elif section == "reviews":
-        from reviews.models import Review
-        qs = (Review.objects
-              .select_related("game", "author", "author__profile")
-              .order_by('is_published', "-updated_at", "-id"))
-        if q:
-            qs = qs.filter(
-                Q(title__icontains=q) |
-                Q(game__title__icontains=q) |
-                Q(author__username__icontains=q) |
-                Q(author__profile__nickname__icontains=q)
-            )
-        context["reviews"] = qs
-
-    elif section == "walkthroughs":
-        from walkthroughs.models import Walkthrough
-        qs = (Walkthrough.objects
-              .select_related("game", "author", "author__profile")
-              .order_by('is_published',"-updated_at", "-id"))
-        if q:
-            qs = qs.filter(
-                Q(title__icontains=q) |
-                Q(game__title__icontains=q) |
-                Q(author__username__icontains=q) |
-                Q(author__profile__nickname__icontains=q)
-            )
-        context["walkthroughs"] = qs
-
-    elif section == "cheats":
-        from cheats.models import Cheat
-        qs = (Cheat.objects
-              .select_related("game", "author", "author__profile")
-              .order_by('is_published',"-updated_at", "-id"))
-        if q:
-            qs = qs.filter(
-                Q(title__icontains=q) |
-                Q(game__title__icontains=q) |
-                Q(author__username__icontains=q) |
-                Q(author__profile__nickname__icontains=q)
-            )
-        context["cheats"] = qs
-
-    elif section == "users":
-        qs = User.objects.select_related("profile").order_by("username")
-        if q:
-            qs = qs.filter(
-                Q(username__icontains=q) |
-                Q(profile__nickname__icontains=q)
-            )
-        context["users"] = qs
+@user_passes_test(staff_check, login_url="account_login")
+def admin_dashboard_section(request, section):
+    # Следующая страница секции для "Показать ещё": готовые строки таблицы + курсор дальше
+    if section not in DASHBOARD_SECTIONS:
+        return JsonResponse({"ok": False, "error": "Неизвестная секция"}, status=404)
+
+    page = _dashboard_page(request, section)
+    filters = request.GET.copy()
+    filters.pop("cursor", None)
+    filters["section"] = section
+    # ссылки "?next=" в строках ведут обратно в панель, а не на этот JSON
+    return_path = f"{reverse('admin_dashboard')}?{filters.urlencode()}"
+    html = render_to_string(
+        f"core/admin_sections/{section}_rows.html",
+        {section: page, "return_path": return_path},
+        request=request,
+    )
+    return JsonResponse({"ok": True, "html": html, "next_cursor": page.next_cursor})
+
+
+# ---- Очередь модерации (core.moderation) ----
 
-    return render(request, "core/admin_dashboard.html", context)
+@user_passes_test(staff_check, login_url="account_login")
+def admin_moderation(request):
+    kind = request.GET.get("kind", "")
+    kinds = [kind] if kind in moderation.KINDS else None
+    items, next_cursor = moderation.queue_page(request.GET.get("cursor"), kinds=kinds)
+
+    return render(request, "core/admin_moderation.html", {
+        "section": "moderation",
+        "items": items,
+        "kind": kind if kinds else "",
+        "kinds": [(key, label) for key, (_, _, label) in moderation.KINDS.items()],
+        "next_cursor": next_cursor,
+        "is_first_page": not request.GET.get("cursor"),
+    })
+
+
+@user_passes_test(staff_check, login_url="account_login")
+@require_POST
+def admin_moderation_action(request):
+    by_kind = moderation.parse_keys(request.POST.getlist("items"))
+    action = request.POST.get("action")
+    next_url = request.POST.get("next")
+    if not next_url or not url_has_allowed_host_and_scheme(next_url, allowed_hosts={request.get_host()}):
+        next_url = reverse("admin_moderation")
+
+    if not by_kind:
+        messages.error(request, "Ничего не выбрано.")
+    elif action == "approve":
+        messages.success(request, f"Опубликовано: {moderation.approve(by_kind)}")
+    elif action == "reject":
+        messages.success(request, f"Отклонено: {moderation.reject(by_kind)}")
+    else:
+        messages.error(request, "Неизвестное действие.")
+    return redirect(next_url)
 
 
 @user_passes_test(staff_check, login_url="account_login")
@@ -0,0 +1,73 @@
+"""
+Денормализованные счётчики голосов: likes / dislikes / liked_percent у игр, обзоров, прохождений и читов.
+
+Голос меняет счётчики родителя одной UPDATE с F()-дельтами (без пересчёта всех голосов):
+    новый лайк        -> likes + 1
+    лайк -> дизлайк   -> likes - 1, dislikes + 1
+    удалён дизлайк    -> dislikes - 1
+liked_percent считается в той же UPDATE из новых значений счётчиков.
+Предыдущее значение голоса запоминают pre_save-сигналы приложений (remember_prev_vote).
+Расхождения (ручные правки в БД, update() в обход сигналов) чинит команда reconcile_votes.
+
+Свойства likes_count / dislikes_count (VoteCountsMixin) читают поля likes / dislikes - без запроса COUNT
+на каждый объект; списки и так выводят готовый liked_percent, отдельная аннотация голосов им не нужна.
+"""
+from django.db.models import F, Value, IntegerField
+from django.db.models.functions import Cast, Coalesce, Floor, NullIf
+
+LIKE = 1
+DISLIKE = -1
+
+
+def liked_percent_expression(likes, dislikes):
+    # FLOOR((likes * 200 + total) / NULLIF(total * 2, 0)), без голосов - 0.
+    # Округление половины вверх в целых числах: ROUND по float в PostgreSQL округляет половину к чётному
+    total = likes + dislikes
+    half_up = Floor((likes * Value(200) + total) / NullIf(total * Value(2), Value(0)))
+    return Coalesce(Cast(half_up, IntegerField()), Value(0))
+
+
+def liked_percent_value(likes, dislikes):
+    # то же в Python (recalc_liked_percent) - совпадает с liked_percent_expression и на половинах (12.5 -> 13)
+    total = likes + dislikes
+    if not total:
+        return 0
+    return (likes * 200 + total) // (total * 2)
+
+
+class VoteCountsMixin:
+    """likes_count / dislikes_count для моделей с денормализованными полями likes / dislikes."""
+
+    @property
+    def likes_count(self):
+        return self.likes
+
+    @property
+    def dislikes_count(self):
+        return self.dislikes
+
+
+def remember_prev_vote(instance):
+    # Значение голоса до сохранения (None - голос новый)
+    if not instance.pk:
+        instance._prev_vote_value = None
+        return
+    instance._prev_vote_value = (
+        type(instance).objects.filter(pk=instance.pk).values_list("value", flat=True).first()
+    )
+
+
+def apply_vote_change(parent_model, parent_id, old_value, new_value):
+    """Сдвигает счётчики родителя с old_value на new_value (None - голоса нет)."""
+    likes_delta = (new_value == LIKE) - (old_value == LIKE)
+    dislikes_delta = (new_value == DISLIKE) - (old_value == DISLIKE)
+    if not likes_delta and not dislikes_delta:
+        return
+
+    likes = F("likes") + likes_delta
+    dislikes = F("dislikes") + dislikes_delta
+    parent_model.objects.filter(pk=parent_id).update(
+        likes=likes,
+        dislikes=dislikes,
+        liked_percent=liked_percent_expression(likes, dislikes),
+    )
@@ -12,6 +12,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 
 from pathlib import Path
 import os
+import hashlib
 from dotenv import load_dotenv
 import django
 from cryptography.fernet import Fernet
@@ -114,6 +115,25 @@ DATABASES = {
     }
 }
 
+# Кеш. Через него процессы сайта согласуют версии индексов в памяти (core.autocomplete и др.),
+# поэтому при нескольких воркерах нужен общий кеш: задайте REDIS_URL в .env.
+# Без него - локальный кеш процесса (достаточно для runserver).
+REDIS_URL = os.getenv('REDIS_URL')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'game-hunt',
+        }
+    }
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -179,6 +199,64 @@ STATIC_ROOT = BASE_DIR / 'static'
 MEDIA_URL = 'media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Ширины уменьшенных копий картинок для srcset (core.images); копии лежат в MEDIA_ROOT/variants
+IMAGE_VARIANT_WIDTHS = (160, 320, 640, 1280)
+
+# Загрузки галерей и аватаров пересохраняются в фоне (core.normalize_image): без EXIF,
+# не больше IMAGE_MAX_DIMENSION по большей стороне, JPEG/WebP с качеством IMAGE_QUALITY.
+IMAGE_MAX_DIMENSION = 2560
+IMAGE_QUALITY = 85
+# Загрузки больше мегабайта пишутся во временный файл, а не держатся в памяти процесса
+FILE_UPLOAD_MAX_MEMORY_SIZE = 1024 * 1024
+
+# Кто передаёт файлы читов (cheats.utils.serve_file): "" - Django, "x-accel" - nginx, "x-sendfile" - Apache/lighttpd.
+# Для nginx: location /protected/ { internal; alias <MEDIA_ROOT>/; }
+CHEATS_SENDFILE = os.getenv("CHEATS_SENDFILE", "")
+CHEATS_SENDFILE_PREFIX = "/protected/"
+
+# Курсорная пагинация списков (games.utils.paginate_games) вместо номеров страниц.
+# Без флага курсорный режим включается только параметром ?cursor= в адресе.
+CURSOR_PAGINATION = False
+
+# Сколько секунд кешировать счётчики списков (всего найдено / из них 16+) для одного набора фильтров
+LIST_COUNTS_TTL = 60
+
+# Кеш готовых страниц списков и карточек для гостей (core.pagecache); 0 - выключен.
+# Сбрасывается сигналами при изменении контента; счётчики просмотров/лайков в нём отстают до PAGE_CACHE_TTL секунд
+PAGE_CACHE_TTL = 300
+
+# Фрагменты карточек {% cache_for %} (галерея, платформы, комментарии; core.fragments):
+# сбрасываются версиями связей, TTL только ограничивает жизнь неиспользуемых ключей
+FRAGMENT_CACHE_TTL = 24 * 60 * 60
+
+# Ограничение частоты действий (core.ratelimit): имя -> (сколько подряд, за сколько секунд восстанавливается)
+RATE_LIMITS = {
+    "comment": (1, 60),               # комментарий раз в минуту
+    "vote": (20, 60),
+    "download": (30, 60 * 60),
+    "contact_admin": (3, 60 * 60),
+}
+
+# Буферизованные счётчики просмотров/скачиваний (core.counters): приращения копятся в журналах
+# COUNTERS_SPOOL_DIR и применяются пачками командой `manage.py flush_counters --loop 10`.
+# Включайте только вместе с запущенной командой, иначе счётчики не будут расти.
+COUNTERS_BUFFERED = os.getenv('COUNTERS_BUFFERED', '') == '1'
+COUNTERS_SPOOL_DIR = BASE_DIR / 'var' / 'counters'
+
+# Последняя активность (users.presence): в БД не чаще раза в LAST_SEEN_WRITE_INTERVAL секунд на пользователя,
+# очередь процесса сбрасывается раз в LAST_SEEN_FLUSH_INTERVAL секунд или по LAST_SEEN_BATCH_SIZE записей
+LAST_SEEN_WRITE_INTERVAL = 60
+LAST_SEEN_FLUSH_INTERVAL = 60
+LAST_SEEN_BATCH_SIZE = 100
+
+# Фоновые задачи (core.jobs): письма и уведомления выполняет `manage.py run_jobs --loop 2`.
+# JOBS_EAGER=1 - выполнять сразу после коммита в процессе запроса (разработка без воркера)
+JOBS_EAGER = os.getenv('JOBS_EAGER', '') == '1'
+JOBS_MAX_ATTEMPTS = 5
+JOBS_RETRY_DELAY = 30        # сек, удваивается с каждой попыткой
+JOBS_RETRY_MAX_DELAY = 3600
+JOBS_LOCK_TIMEOUT = 600      # задача упавшего воркера снова доступна через столько секунд
+
 CKEDITOR_UPLOAD_PATH = 'uploads'
 CKEDITOR_IMAGE_BACKEND = 'pillow'
 
@@ -226,6 +304,14 @@ if not ENCRYPTION_KEY:
     raise ValueError('ENCRYPTION_KEY is not set in .env')
 # Симметричный алгоритм шифрования с секретным ключом, который обеспечивает аутентифицированную криптографию
 FERNET = Fernet(ENCRYPTION_KEY.encode())
+# Ключ HMAC для слепых индексов шифруемых полей (Profile.phone_hash / email_hash).
+# Если отдельный ключ не задан в .env, выводим его из ключа шифрования (но не используем тот же самый).
+# При смене ключа индексы нужно пересчитать: manage.py backfill_blind_index --all
+BLIND_INDEX_KEY = (os.getenv('BLIND_INDEX_KEY') or '').encode() or hashlib.sha256(
+    b'blind-index:' + ENCRYPTION_KEY.encode()
+).digest()
+# Сколько расшифрованных значений держать в LRU-кеше процесса (users.utils.decrypt_text)
+DECRYPT_CACHE_SIZE = 4096
 
 # Настройки корректной работы фрейма для видео
 SECURE_REFERRER_POLICY = "strict-origin-when-cross-origin"
@@ -320,4 +406,6 @@ CKEDITOR_CONFIGS = {
 
 # Телеграм бот+ Чат id
 TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN", "")
-TELEGRAM_ADMIN_CHAT_ID = os.getenv("TELEGRAM_ADMIN_CHAT_ID", "")
\ No newline at end of file
+TELEGRAM_ADMIN_CHAT_ID = os.getenv("TELEGRAM_ADMIN_CHAT_ID", "")
+# "api" - Bot API, "console" - вывод в консоль, "locmem" - users.telegram_notify.outbox (тесты, без сети)
+TELEGRAM_TRANSPORT = os.getenv("TELEGRAM_TRANSPORT", "api")
@@ -0,0 +1,69 @@
+# Полнотекстовый индекс игр: FTS5 для SQLite, tsvector + GIN для PostgreSQL
+
+from django.db import migrations
+from django.utils.html import strip_tags
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "sqlite":
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS games_game_fts "
+            "USING fts5(title, names, description, tokenize = 'unicode61')"
+        )
+    elif vendor == "postgresql":
+        schema_editor.execute(
+            "CREATE TABLE IF NOT EXISTS games_game_search ("
+            "game_id bigint PRIMARY KEY REFERENCES games_game (id) ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED, "
+            "document tsvector NOT NULL)"
+        )
+        schema_editor.execute(
+            "CREATE INDEX IF NOT EXISTS games_game_search_document_gin ON games_game_search USING GIN (document)"
+        )
+    else:
+        return
+
+    # Первичное наполнение индекса существующими играми
+    Game = apps.get_model("games", "Game")
+    games = Game.objects.select_related("developer", "publisher").prefetch_related("genres")
+    for game in games.iterator(chunk_size=500):
+        names = [genre.name for genre in game.genres.all()]
+        if game.developer_id:
+            names.append(game.developer.name)
+        if game.publisher_id:
+            names.append(game.publisher.name)
+        params = [game.pk, game.title or "", " ".join(names), strip_tags(game.description or "")]
+
+        if vendor == "sqlite":
+            schema_editor.execute(
+                "INSERT INTO games_game_fts (rowid, title, names, description) VALUES (%s, %s, %s, %s)",
+                params,
+            )
+        else:
+            schema_editor.execute(
+                "INSERT INTO games_game_search (game_id, document) VALUES ("
+                "%s, setweight(to_tsvector('simple', %s), 'A') || "
+                "setweight(to_tsvector('simple', %s), 'B') || "
+                "setweight(to_tsvector('simple', %s), 'C')) "
+                "ON CONFLICT (game_id) DO NOTHING",
+                params,
+            )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "sqlite":
+        schema_editor.execute("DROP TABLE IF EXISTS games_game_fts")
+    elif vendor == "postgresql":
+        schema_editor.execute("DROP TABLE IF EXISTS games_game_search")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('games', '0014_alter_developer_slug_alter_game_slug_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,29 @@
+# Индекс игр переехал в единый поисковый индекс core.search (миграция core.0001_search_index):
+# удаляем таблицы, созданные 0015. Откат создаёт и наполняет их заново той же функцией из 0015.
+
+from importlib import import_module
+
+from django.db import migrations
+
+create_game_search_index = import_module("games.migrations.0015_game_search_index").create_search_index
+
+
+def drop_game_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "sqlite":
+        # вместе с виртуальной таблицей FTS5 удаляются и её служебные таблицы
+        schema_editor.execute("DROP TABLE IF EXISTS games_game_fts")
+    elif vendor == "postgresql":
+        # GIN-индекс удаляется вместе с таблицей
+        schema_editor.execute("DROP TABLE IF EXISTS games_game_search")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('games', '0015_game_search_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_game_search_index, create_game_search_index),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.8 on 2026-10-18 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('games', '0017_game_likes_dislikes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='game',
+            index=models.Index(fields=['-created_at', '-id'], name='game_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='game',
+            index=models.Index(fields=['-views_count', '-id'], name='game_popular_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='game',
+            index=models.Index(fields=['-avg_rating', '-views_count', '-id'], name='game_top_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='game',
+            index=models.Index(fields=['-release_date', '-id'], name='game_release_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='gamecomment',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['game', '-created_at'], name='gamecomment_live_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='gamecomment',
+            index=models.Index(fields=['user', '-created_at'], name='gamecomment_user_idx'),
+        ),
+    ]
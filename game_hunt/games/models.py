@@ -3,6 +3,8 @@ from django.db.models import Avg, Count, Q
 from django.contrib.auth.models import User
 from django.utils.text import slugify
 
+from core.votes import VoteCountsMixin, liked_percent_value
+
 
 # Модель для Разработчика
 class Developer(models.Model):
@@ -61,7 +63,7 @@ class Platform(models.Model):
 
 
 # Модель для игр
-class Game(models.Model):
+class Game(VoteCountsMixin, models.Model):
     title = models.CharField(max_length=200, verbose_name='Название игры')
     slug = models.SlugField(max_length=220, unique=True, verbose_name='Слаг')
     description = models.TextField(verbose_name='Описание')
@@ -91,6 +93,9 @@ class Game(models.Model):
     avg_rating = models.DecimalField(blank=True, max_digits=3, decimal_places=1, default=0,
                                      verbose_name="Средний рейтинг")
     liked_percent = models.PositiveSmallIntegerField(blank=True, default=0, verbose_name="Понравилось")
+    # Денормализованные счётчики голосов, двигаются сигналами голосов (core.votes)
+    likes = models.PositiveIntegerField(default=0, editable=False, verbose_name="Лайки")
+    dislikes = models.PositiveIntegerField(default=0, editable=False, verbose_name="Дизлайки")
     trailer_url = models.URLField(
         blank=True,
         null=True,
@@ -101,6 +106,13 @@ class Game(models.Model):
         verbose_name = 'игра'
         verbose_name_plural = 'игры'
         ordering = ['-created_at']
+        indexes = [
+            # сортировки каталога: новые / популярные / лучшие / по дате выхода
+            models.Index(fields=["-created_at", "-id"], name="game_created_idx"),
+            models.Index(fields=["-views_count", "-id"], name="game_popular_idx"),
+            models.Index(fields=["-avg_rating", "-views_count", "-id"], name="game_top_idx"),
+            models.Index(fields=["-release_date", "-id"], name="game_release_idx"),
+        ]
 
     def __str__(self):
         return self.title
@@ -133,23 +145,19 @@ class Game(models.Model):
 
     def recalc_liked_percent(self):
         """
-        liked_percent = процент лайков среди всех голосов
+        Полный пересчёт likes / dislikes / liked_percent по всем голосам.
+        Обычно счётчики двигаются на дельту голоса (core.votes) - это сверка на случай расхождений.
         """
-        votes = self.votes.all()
-
-        agg = votes.aggregate(
-            total=Count('id'),
+        agg = self.votes.aggregate(
             likes=Count('id', filter=Q(value=GameVote.LIKE)),
+            dislikes=Count('id', filter=Q(value=GameVote.DISLIKE)),
         )
 
-        total = agg['total'] or 0
+        self.likes = agg['likes']
+        self.dislikes = agg['dislikes']
+        self.liked_percent = liked_percent_value(self.likes, self.dislikes)
 
-        if total > 0:
-            self.liked_percent = round((agg['likes'] / total) * 100)
-        else:
-            self.liked_percent = 0
-
-        self.save(update_fields=['liked_percent'])
+        self.save(update_fields=['likes', 'dislikes', 'liked_percent'])
 
     def avg_rating_display(self):
         return f"{self.avg_rating}/10"
@@ -157,16 +165,6 @@ class Game(models.Model):
     def liked_percent_display(self):
         return f"{self.liked_percent}%"
 
-    # получаем виртуальное поле по связанной модели GameVote через related_name - счетчик лайков для игры
-    @property
-    def likes_count(self):
-        return self.votes.filter(value=1).count()  # получили количество полей value где, было выбрано(LIKE, 'Лайк')
-
-    # получаем виртуальное поле по связанной модели GameVote через related_name- счетчик дизлайков для игры
-    @property
-    def dislikes_count(self):
-        return self.votes.filter(value=-1).count()
-        # получили количество полей value где, было выбрано(DISLIKE, 'Дизлайк')
 
 
 class GameImage(models.Model):
@@ -235,6 +233,13 @@ class GameComment(models.Model):
         verbose_name = 'комментарий к игре'
         verbose_name_plural = 'комментарии к играм'
         ordering = ['-created_at']
+        indexes = [
+            # лента комментариев на странице: только неудалённые (частичный индекс)
+            models.Index(fields=["game", "-created_at"], condition=models.Q(is_deleted=False),
+                         name="gamecomment_live_idx"),
+            # ограничение "1 комментарий в минуту": последний комментарий пользователя
+            models.Index(fields=["user", "-created_at"], name="gamecomment_user_idx"),
+        ]
 
     def __str__(self):
         return f'Комментарий от {self.user} к {self.game}'
\ No newline at end of file
@@ -1,13 +1,21 @@
-from django.db.models.signals import post_save, post_delete
+from django.db.models.signals import post_save, post_delete, pre_save
 from django.dispatch import receiver
-from .models import GameVote
+from core import votes
+from .models import Game, GameVote
+
+
+# Счётчики лайков игры двигаются на дельту голоса (core.votes), без пересчёта всех голосов
+
+@receiver(pre_save, sender=GameVote)
+def remember_prev_game_vote(sender, instance, **kwargs):
+    votes.remember_prev_vote(instance)
 
 
 @receiver(post_save, sender=GameVote)
 def update_game_likes_on_save(sender, instance, **kwargs):
-    instance.game.recalc_liked_percent()
+    votes.apply_vote_change(Game, instance.game_id, getattr(instance, "_prev_vote_value", None), instance.value)
 
 
 @receiver(post_delete, sender=GameVote)
 def update_game_likes_on_delete(sender, instance, **kwargs):
-    instance.game.recalc_liked_percent()
+    votes.apply_vote_change(Game, instance.game_id, instance.value, None)
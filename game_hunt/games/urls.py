@@ -4,6 +4,8 @@ from . import views
 
 urlpatterns = [
     path('', views.game_list, name='game_list'),
+    # до '<slug:slug>/', иначе "autocomplete" уйдёт в game_detail
+    path('autocomplete/', views.game_autocomplete, name='game_autocomplete'),
     path('<slug:slug>/', views.game_detail, name='game_detail'),
     path('<slug:slug>/vote/', views.game_vote, name='game_vote'),
     path('<slug:slug>/comment/add/', views.game_add_comment, name='game_add_comment'),
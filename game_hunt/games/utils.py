@@ -1,7 +1,17 @@
 from .models import Game, Genre, Platform
-from django.db.models import Q
+from core.search import search_ids
+from users.utils import user_is_adult
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q, F, Case, When, IntegerField, Count
 from django.core.paginator import Paginator, PageNotAnInteger, EmptyPage
+import base64
+import hashlib
+import json
 import re
+from functools import reduce
+from operator import or_
 from urllib.parse import urlparse, parse_qs
 
 
@@ -32,18 +42,27 @@ def search_games(request, ignore_adult=False):
     # В результат поиска кладем value из name 'search', если ничего не пришло кладем пустую строку.
     # Удаляем все лишние пробелы
     search_query = request.GET.get('search', '').strip()
+    ranked_ids = None
     if search_query:
-        # Производим поиск и ранее полученных игр
-        games = games.filter(
-            # поиск по названию игры(регистронезависимый поиск подстроки в полях title модели Game)
-            Q(title__icontains=search_query) |
-            # или поиск по описанию игры(регистронезависимый поиск подстроки в полях description модели Game)
-            Q(description__icontains=search_query) |
-            # или поиск по названию жанров по прямой связи в модели Genre
-            Q(genres__name__icontains=search_query) |
-            Q(developer__name__icontains=search_query) |
-            Q(publisher__name__icontains=search_query)
-        )
+        # Поиск по единому полнотекстовому индексу (core.search): id игр уже отсортированы по релевантности.
+        # Ограничение 16+ здесь не передаём - его накладывает выборка выше (или сама вьюха при ignore_adult)
+        ranked_ids = search_ids('game', search_query)
+        if ranked_ids is not None:
+            games = games.filter(id__in=ranked_ids)
+        else:
+            # СУБД без полнотекстового индекса - поиск подстрокой, как раньше
+            games = games.filter(
+                # поиск по названию игры(регистронезависимый поиск подстроки в полях title модели Game)
+                Q(title__icontains=search_query) |
+                # или поиск по описанию игры(регистронезависимый поиск подстроки в полях description модели Game)
+                Q(description__icontains=search_query) |
+                # или поиск по названию жанров по прямой связи в модели Genre
+                Q(genres__name__icontains=search_query) |
+                Q(developer__name__icontains=search_query) |
+                Q(publisher__name__icontains=search_query)
+            )
+            # Избавляемся от дублирования из-за JOIN по жанрам - distinct.
+            games = games.distinct()
 
     # Дополнительный фильтр поиска по жанрам: value из name 'genre', если ничего не выбрано поиск по всем жанрам.
     genre_id = request.GET.get('genre')
@@ -67,20 +86,25 @@ def search_games(request, ignore_adult=False):
     # СОРТИРОВКА
     # Дополнительная настройка определяет порядок выведения игр если по умолчанию ничего не выбрано в name 'sort':
     # идет сортировка по дате добавления игры, если в name пришло 'popular'- сортируем по количеству просмотров,
-    #  аналогично по среднему рейтингу
-    sort = request.GET.get('sort', 'new')
+    #  аналогично по среднему рейтингу. При поиске по умолчанию сортируем по релевантности.
+    sort = request.GET.get('sort') or ('relevance' if search_query else 'new')
 
     # Сортировка
-    sort = request.GET.get('sort', 'new')
-    if sort == 'popular':
+    if sort == 'relevance' and ranked_ids:
+        # порядок id из индекса -> номер позиции в выдаче
+        games = games.order_by(Case(
+            *[When(id=game_id, then=position) for position, game_id in enumerate(ranked_ids)],
+            output_field=IntegerField(),
+        ))
+    elif sort == 'popular':
         games = games.order_by('-views_count', '-id')
     elif sort == 'top':
         games = games.order_by('-avg_rating', '-views_count', '-id')
     else:
         games = games.order_by('-release_date', '-id')
 
-    # Избавляемся от дублирования из-за JOIN по жанрам/платформам -distinct.
-    games = games.distinct()
+    # Фильтры по жанру/платформе выбирают одну связь на игру, поэтому distinct по всей выборке не нужен:
+    # дубли давал только поиск через JOIN по жанрам.
 
     # Возвращаем найденный список игр
     return games, search_query, genres, platforms,  sort, genre_id, platform_id, min_rating
@@ -88,27 +112,76 @@ def search_games(request, ignore_adult=False):
 
 # Получаем флаг 16+
 def get_adult(request):
-    # получаем текущего пользователя
-    user = request.user
-    # по умолчанию ставим присвоим флагу False
-    is_adult = False
-    # проверим авторизирован ли пользователь, есть ли у него связанный profile по OneToOneField
-    # или это суперпользователь
-    if user.is_superuser:
-        is_adult = True
-        return is_adult
-    if user.is_authenticated and hasattr(user, 'profile'):
-        # забираем значение флага непосредственно из профиля нашего пользователя
-        is_adult = user.profile.is_adult
-    # вернем значение флага
-    return is_adult
+    # Та же проверка, что и reviews.utils.can_view_adult: гость - нет, staff/superuser - да,
+    # остальные по возрасту. Флаг кешируется на пользователя, birth_date на каждом запросе не расшифровывается
+    return user_is_adult(request.user)
+
+
+# ---- Счётчики для списков ----
+# Списку нужны два числа: сколько найдено всего и сколько из них 16+ (для подсказок
+# adult_blocked_only / has_more_adult). Оба считаем одним агрегатом и кешируем по набору фильтров.
+# Числа не зависят от пользователя, поэтому кеш общий; видимое количество = всего - 16+.
+
+# Параметры, которые не меняют состав выборки
+COUNTS_IGNORED_PARAMS = ('page', 'cursor', 'sort')
+
+
+def _counts_generation(namespace):
+    return cache.get_or_set(f'list_counts_gen:{namespace}', 1, None)
+
+
+def bump_list_counts(*namespaces):
+    # Вызывается сигналами при изменении контента: старые ключи просто перестают читаться
+    for namespace in namespaces:
+        try:
+            cache.incr(f'list_counts_gen:{namespace}')
+        except ValueError:
+            cache.set(f'list_counts_gen:{namespace}', 1, None)
+
+
+def filter_signature(request, extra=()):
+    params = sorted(
+        (key, value.strip())
+        for key, values in request.GET.lists() if key not in COUNTS_IGNORED_PARAMS
+        for value in values if value.strip()
+    )
+    raw = json.dumps([params, list(extra)], ensure_ascii=False)
+    return hashlib.md5(raw.encode()).hexdigest()
+
+
+def adult_counts(queryset, adult_field, namespace, signature):
+    """
+    (всего, из них 16+) для выборки одним запросом:
+    SELECT COUNT(*), COUNT(*) FILTER (WHERE <adult_field>) ...
+    Результат кешируется на LIST_COUNTS_TTL секунд по namespace + signature.
+    """
+    key = f'list_counts:{namespace}:{_counts_generation(namespace)}:{signature}'
+    counts = cache.get(key)
+    if counts is None:
+        data = queryset.order_by().aggregate(
+            total=Count('pk'),
+            adult=Count('pk', filter=Q(**{adult_field: True})),
+        )
+        counts = (data['total'], data['adult'])
+        cache.set(key, counts, getattr(settings, 'LIST_COUNTS_TTL', 60))
+    return counts
 
 
 # Пагинация игр
-def paginate_games(request, games, count):
+def paginate_games(request, games, count, total=None):
+    # total - уже известное количество записей в games (например, из adult_counts): Paginator не делает COUNT.
+    # Курсорный режим: ?cursor=... в адресе или CURSOR_PAGINATION = True в settings.
+    # Если сортировку нельзя выразить ключом (релевантность поиска), остаёмся на обычных страницах.
+    if use_cursor_pagination(request):
+        cursor_page = paginate_cursor(request, games, count)
+        if cursor_page is not None:
+            return cursor_page, None
+
     page = request.GET.get('page')
     # Создаем экземпляр класса Paginator в него передаем найденные ранее игры и желаемое количество игр на странице
     paginator = Paginator(games, count)
+    if total is not None:
+        paginator.count = total
     try:
         # Формируем выводимые на страницу игры исходя из номера страницы
         view_games = paginator.page(page)
@@ -135,6 +208,153 @@ def paginate_games(request, games, count):
     return view_games, custom_range
 
 
+# ---- Курсорная (keyset) пагинация ----
+# Вместо COUNT(*) + OFFSET берём строки "после" ключа последней показанной записи:
+# WHERE (ключ сортировки) < (значения курсора) ORDER BY ... LIMIT n+1.
+# Страница любой глубины стоит одинаково, а вставка новых записей не сдвигает выдачу.
+
+def use_cursor_pagination(request):
+    return 'cursor' in request.GET or getattr(settings, 'CURSOR_PAGINATION', False)
+
+
+class CursorPage:
+    """Страница курсорной пагинации: итерируется как Page, но без номеров и общего количества."""
+    is_cursor = True
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+def _cursor_keys(queryset):
+    """
+    Ключ сортировки выборки: [(поле модели, по убыванию?), ...] с уникальным id в конце.
+    None - если порядок задан выражением (например, релевантностью) или полем не этой модели.
+    """
+    ordering = queryset.query.order_by or queryset.model._meta.ordering
+    keys = []
+    for item in ordering:
+        if not isinstance(item, str):
+            return None
+        name = item.lstrip('-')
+        if name == 'pk':
+            name = 'id'
+        try:
+            field = queryset.model._meta.get_field(name)
+        except FieldDoesNotExist:
+            return None
+        if field.is_relation:
+            return None
+        keys.append((field, item.startswith('-')))
+        if field.primary_key:
+            break
+    # без уникального хвоста записи с одинаковым ключом терялись бы на границе страниц
+    if not keys or not keys[-1][0].primary_key:
+        keys.append((queryset.model._meta.pk, True))
+    return keys
+
+
+def _encode_cursor(keys, obj, direction):
+    values = [field.value_to_string(obj) if getattr(obj, field.attname) is not None else None for field, _ in keys]
+    payload = {'k': [field.name for field, _ in keys], 'v': values, 'd': direction}
+    return base64.urlsafe_b64encode(json.dumps(payload, separators=(',', ':')).encode()).decode().rstrip('=')
+
+
+def _decode_cursor(keys, token):
+    # Битый или чужой (от другой сортировки) курсор - просто первая страница
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)))
+        if payload['k'] != [field.name for field, _ in keys] or payload['d'] not in ('n', 'p'):
+            return None, 'n'
+        values = [None if v is None else field.to_python(v) for (field, _), v in zip(keys, payload['v'])]
+    except (ValueError, KeyError, TypeError, ValidationError):
+        return None, 'n'
+    if len(values) != len(keys):
+        return None, 'n'
+    return values, payload['d']
+
+
+def _after(keys, values, forward):
+    """
+    Условие "строка идёт после курсора" (forward) или "до курсора" для порядка с NULL в конце:
+    (k1 < v1) OR (k1 = v1 AND k2 < v2) OR ...
+    """
+    parts = []
+    equal = Q()
+    for (field, desc), value in zip(keys, values):
+        name = field.name
+        if value is None:
+            # NULL стоят в конце: до курсора с NULL идёт любое непустое значение
+            if not forward:
+                parts.append(equal & Q(**{f'{name}__isnull': False}))
+            equal &= Q(**{f'{name}__isnull': True})
+            continue
+        lookup = 'lt' if desc == forward else 'gt'
+        step = Q(**{f'{name}__{lookup}': value})
+        if forward and field.null:
+            # после непустого значения идут все NULL
+            step |= Q(**{f'{name}__isnull': True})
+        parts.append(equal & step)
+        equal &= Q(**{name: value})
+    return reduce(or_, parts)
+
+
+def _cursor_ordering(keys, forward):
+    # Явно задаём место NULL: в SQLite и PostgreSQL оно по умолчанию разное
+    nulls = {'nulls_last': True} if forward else {'nulls_first': True}
+    ordering = []
+    for field, desc in keys:
+        expr = F(field.name)
+        ordering.append(expr.desc(**nulls) if desc == forward else expr.asc(**nulls))
+    return ordering
+
+
+def paginate_cursor(request, queryset, count):
+    keys = _cursor_keys(queryset)
+    if keys is None:
+        return None
+
+    values, direction = _decode_cursor(keys, request.GET.get('cursor') or '')
+    forward = direction == 'n'
+
+    qs = queryset
+    if values is not None:
+        qs = qs.filter(_after(keys, values, forward))
+    # одна выборка на count+1 строк: лишняя строка говорит, есть ли следующая страница
+    rows = list(qs.order_by(*_cursor_ordering(keys, forward))[:count + 1])
+    has_more = len(rows) > count
+    rows = rows[:count]
+    if not forward:
+        rows.reverse()
+
+    if not rows:
+        return CursorPage([])
+
+    if forward:
+        next_cursor = _encode_cursor(keys, rows[-1], 'n') if has_more else None
+        previous_cursor = _encode_cursor(keys, rows[0], 'p') if values is not None else None
+    else:
+        next_cursor = _encode_cursor(keys, rows[-1], 'n')
+        previous_cursor = _encode_cursor(keys, rows[0], 'p') if has_more else None
+    return CursorPage(rows, next_cursor, previous_cursor)
+
+
 def trailer_embed_url(url: str) -> str | None:
     if not url:
         return None
@@ -1,20 +1,35 @@
 from django.shortcuts import render, get_object_or_404, redirect
-from django.db.models import F, Q
+from django.db.models import Q
 from django.contrib.auth.decorators import login_required
 from django.views.decorators.http import require_POST
 from django.contrib import messages
 from .models import Game, Genre, Platform, GameVote, GameComment
 from .forms import GameCommentForm
-from . utils import get_adult, search_games, paginate_games
+from . utils import get_adult, search_games, paginate_games, adult_counts, filter_signature
 import time
-from django.utils import timezone
-from datetime import timedelta
 from .utils import trailer_embed_url
 from django.http import JsonResponse
 from django.template.loader import render_to_string
 from reviews.utils import can_view_adult
+from core import autocomplete, counters, pagecache, ratelimit
 
 
+def game_autocomplete(request):
+    # Подсказки для строки поиска: игры, разработчики, издатели, ники. БД не трогаем - индекс в памяти
+    query = request.GET.get("q", "").strip()
+    # ники - только вошедшим: профили гостям закрыты (profile_view требует входа)
+    allowed = [k for k in autocomplete.KINDS if k != "user" or request.user.is_authenticated]
+    kinds = [k for k in request.GET.getlist("type") if k in allowed] or allowed
+    try:
+        limit = min(max(int(request.GET.get("limit", autocomplete.DEFAULT_LIMIT)), 1), autocomplete.MAX_LIMIT)
+    except ValueError:
+        limit = autocomplete.DEFAULT_LIMIT
+
+    results = autocomplete.suggest(query, limit=limit, kinds=kinds, adult_allowed=get_adult(request))
+    return JsonResponse({"ok": True, "query": query, "results": results})
+
+
+@pagecache.cache_anonymous("games")
 def game_list(request):
     # 1) Получаем все результаты по фильтрам, но БЕЗ среза 16+
     all_games, search_query, genres, platforms, sort, genre_id, platform_id, min_rating = search_games(
@@ -22,7 +37,8 @@ def game_list(request):
         ignore_adult=True
     )
 
-    total_found = all_games.count()
+    # всего найдено и сколько из них 16+ - одним запросом (с кешем по набору фильтров)
+    total_found, adult_found = adult_counts(all_games, 'is_adult_only', 'games', filter_signature(request))
 
     # 2) Теперь формируем то, что реально можно показать
     adult_allowed = get_adult(request)
@@ -31,7 +47,7 @@ def game_list(request):
     if not adult_allowed:
         games = games.exclude(is_adult_only=True)
 
-    visible_total = games.count()
+    visible_total = total_found if adult_allowed else total_found - adult_found
 
     adult_blocked_only = (not adult_allowed) and (total_found > 0) and (visible_total == 0)
     has_more_adult = (not adult_allowed) and (total_found > visible_total)
@@ -41,11 +57,13 @@ def game_list(request):
     platform = int(platform_id) if platform_id else None
 
     count = 3
-    games, custom_range = paginate_games(request, games, count)
+    games, custom_range = paginate_games(request, games, count, total=visible_total)
 
     params = request.GET.copy()
     if 'page' in params:
         del params['page']
+    # курсор страницы тоже не переносим: при смене фильтров выдача начинается сначала
+    params.pop('cursor', None)
     extra_query = params.urlencode()
 
     rating_choices = list(range(1, 11))
@@ -68,6 +86,11 @@ def game_list(request):
     return render(request, 'games/game_list.html', context)
 
 
+def _count_game_view(request, pk):
+    counters.count_view(request, Game, pk, 'viewed_games')
+
+
+@pagecache.cache_anonymous("games", on_hit=_count_game_view)
 def game_detail(request, slug):
     game = get_object_or_404(Game, slug=slug)
 
@@ -79,13 +102,9 @@ def game_detail(request, slug):
         return redirect('game_list')
 
 
-    # +1 просмотр за сессию
-    viewed_games = request.session.get('viewed_games', [])
-    if game.id not in viewed_games:
-        Game.objects.filter(pk=game.id).update(views_count=F('views_count') + 1)
-        viewed_games.append(game.id)
-        request.session['viewed_games'] = viewed_games
-        request.session.modified = True
+    # +1 просмотр за сессию (и при выдаче страницы из кеша - через on_hit)
+    _count_game_view(request, game.id)
+    pagecache.remember(request, pk=game.id)
 
     # комментарии (у тебя comment.user, значит related_name вероятно 'comments' и поле user)
     comments = game.comments.filter(is_deleted=False).select_related('user')
@@ -111,6 +130,7 @@ def game_detail(request, slug):
 
 
 @login_required
+@ratelimit.limit("vote", methods=("POST",))
 def game_vote(request, slug):
     game = get_object_or_404(Game, slug=slug)
 
@@ -156,21 +176,10 @@ def game_add_comment(request, slug):
     if not text:
         return JsonResponse({"error": "Комментарий пустой"}, status=400)
 
-    # 🔴 ОГРАНИЧЕНИЕ: 1 комментарий в минуту
-    last_comment = (
-        GameComment.objects
-        .filter(user=request.user)
-        .order_by("-created_at")
-        .first()
-    )
-
-    if last_comment:
-        delta = timezone.now() - last_comment.created_at
-        if delta < timedelta(minutes=1):
-            seconds_left = 60 - int(delta.total_seconds())
-            return JsonResponse({
-                "error": f"Можно комментировать раз в минуту. Подождите {seconds_left} сек."
-            }, status=429)
+    # ограничение частоты (RATE_LIMITS["comment"]) - в кеше, без запроса к комментариям; счёт свой у раздела
+    retry_after = ratelimit.check(request, "comment", scope="games")
+    if retry_after:
+        return ratelimit.limited_response(request, retry_after, f"Можно комментировать не так часто. Подождите {retry_after} сек.")
 
     comment = GameComment.objects.create(
         game=game,
@@ -7,6 +7,10 @@ from django.conf import settings
 from django import forms
 from django.contrib.auth import get_user_model
 
+from core import pagecache
+from core.search import reindex
+from games.utils import bump_list_counts
+
 
 User = get_user_model()
 
@@ -88,6 +92,23 @@ class ReviewAdmin(admin.ModelAdmin):
 
     get_small_img.short_description = "Миниатюра обложки"
 
+    # update() без сигналов: поиск, счётчики списка и кеш страниц для гостей обновляем сами
+    def publish_selected(self, request, queryset):
+        ids = list(queryset.values_list("pk", flat=True))
+        queryset.update(is_published=True)
+        reindex("review", ids)
+        bump_list_counts("reviews")
+        pagecache.bump("reviews")
+    publish_selected.short_description = "Опубликовать выбранные"
+
+    def unpublish_selected(self, request, queryset):
+        ids = list(queryset.values_list("pk", flat=True))
+        queryset.update(is_published=False)
+        reindex("review", ids)
+        bump_list_counts("reviews")
+        pagecache.bump("reviews")
+    unpublish_selected.short_description = "Снять с публикации"
+
     def get_small_cover(self, obj):
         if obj.cover_image:
             return mark_safe(f'<img src="{obj.cover_image.url}" width="200">')
@@ -2,9 +2,10 @@ from django.db import models
 from django.contrib.auth.models import User
 from games.models import Game
 from django.db.models import Avg, Count, Q
+from core.votes import VoteCountsMixin, liked_percent_value
 
 
-class Review(models.Model):
+class Review(VoteCountsMixin, models.Model):
     RATING_CHOICES = [(i, str(i)) for i in range(1, 11)]
 
     game = models.ForeignKey(
@@ -45,8 +46,13 @@ class Review(models.Model):
 
     # Для модерации
     is_published = models.BooleanField(default=False, verbose_name="Опубликован")
+    # отклонён модератором: не публикуется и не висит в очереди, пока автор не исправит
+    is_rejected = models.BooleanField(default=False, editable=False, verbose_name="Отклонён")
     views_count = models.PositiveIntegerField(default=0, verbose_name='Просмотры')
     liked_percent = models.PositiveSmallIntegerField(blank=True, default=0, verbose_name="Понравилось")
+    # Денормализованные счётчики голосов, двигаются сигналами голосов (core.votes)
+    likes = models.PositiveIntegerField(default=0, editable=False, verbose_name="Лайки")
+    dislikes = models.PositiveIntegerField(default=0, editable=False, verbose_name="Дизлайки")
 
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Создан")
     updated_at = models.DateTimeField(auto_now=True, verbose_name="Обновлён")
@@ -56,29 +62,36 @@ class Review(models.Model):
         verbose_name = "обзор"
         verbose_name_plural = "обзоры"
         ordering = ["-created_at"]
+        # админ-панель и очередь модерации: фильтр по статусу/автору + сортировка по updated_at
+        indexes = [
+            models.Index(fields=["is_published", "-updated_at"], name="review_pub_updated_idx"),
+            models.Index(fields=["author", "-updated_at"], name="review_author_updated_idx"),
+            # публичный список: только опубликованные (частичные индексы), три сортировки
+            models.Index(fields=["-created_at"], condition=models.Q(is_published=True), name="review_pub_new_idx"),
+            models.Index(fields=["-views_count", "-created_at"], condition=models.Q(is_published=True),
+                         name="review_pub_popular_idx"),
+            models.Index(fields=["-rating", "-created_at"], condition=models.Q(is_published=True),
+                         name="review_pub_rating_idx"),
+        ]
 
     def __str__(self):
         return f"{self.title} — {self.game}"
 
     def recalc_liked_percent(self):
         """
-        liked_percent = процент лайков среди всех голосов
+        Полный пересчёт likes / dislikes / liked_percent по всем голосам.
+        Обычно счётчики двигаются на дельту голоса (core.votes) - это сверка на случай расхождений.
         """
-        votes = self.votes.all()
-
-        agg = votes.aggregate(
-            total=Count('id'),
+        agg = self.votes.aggregate(
             likes=Count('id', filter=Q(value=ReviewVote.LIKE)),
+            dislikes=Count('id', filter=Q(value=ReviewVote.DISLIKE)),
         )
 
-        total = agg['total'] or 0
-
-        if total > 0:
-            self.liked_percent = round((agg['likes'] / total) * 100)
-        else:
-            self.liked_percent = 0
+        self.likes = agg['likes']
+        self.dislikes = agg['dislikes']
+        self.liked_percent = liked_percent_value(self.likes, self.dislikes)
 
-        self.save(update_fields=['liked_percent'])
+        self.save(update_fields=['likes', 'dislikes', 'liked_percent'])
 
     def liked_percent_display(self):
         return f"{self.liked_percent}%"
@@ -127,6 +140,13 @@ class ReviewComment(models.Model):
         verbose_name = 'комментарий к игре'
         verbose_name_plural = 'комментарии к обзорам'
         ordering = ['-created_at']
+        indexes = [
+            # лента комментариев на странице: только неудалённые (частичный индекс)
+            models.Index(fields=["review", "-created_at"], condition=models.Q(is_deleted=False),
+                         name="reviewcomment_live_idx"),
+            # ограничение "1 комментарий в минуту": последний комментарий пользователя
+            models.Index(fields=["user", "-created_at"], name="reviewcomment_user_idx"),
+        ]
 
     def __str__(self):
         return f'Комментарий от {self.user} к {self.review.game}'
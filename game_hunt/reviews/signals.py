@@ -1,13 +1,21 @@
-from django.db.models.signals import post_save, post_delete
+from django.db.models.signals import post_save, post_delete, pre_save
 from django.dispatch import receiver
-from .models import ReviewVote
+from core import votes
+from .models import Review, ReviewVote
+
+
+# Счётчики лайков обзора двигаются на дельту голоса (core.votes), без пересчёта всех голосов
+
+@receiver(pre_save, sender=ReviewVote)
+def remember_prev_review_vote(sender, instance, **kwargs):
+    votes.remember_prev_vote(instance)
 
 
 @receiver(post_save, sender=ReviewVote)
 def review_vote_saved(sender, instance, **kwargs):
-    instance.review.recalc_liked_percent()
+    votes.apply_vote_change(Review, instance.review_id, getattr(instance, "_prev_vote_value", None), instance.value)
 
 
 @receiver(post_delete, sender=ReviewVote)
 def review_vote_deleted(sender, instance, **kwargs):
-    instance.review.recalc_liked_percent()
\ No newline at end of file
+    votes.apply_vote_change(Review, instance.review_id, instance.value, None)
@@ -1,5 +1,5 @@
-from datetime import date
 from urllib.parse import urlparse, parse_qs
+from users.utils import user_is_adult
 
 
 def can_view_adult(request) -> bool:
@@ -7,22 +7,9 @@ def can_view_adult(request) -> bool:
     True если можно видеть контент 16+.
     Логика: гость / нет birth_date / возраст < 16 -> нельзя.
     staff/superuser -> можно всегда.
+    Решение кешируется на пользователя (users.utils.user_is_adult).
     """
-    user = getattr(request, "user", None)
-    if not user or not user.is_authenticated:
-        return False
-
-    if user.is_staff or user.is_superuser:
-        return True
-
-    profile = getattr(user, "profile", None)
-    bd = getattr(profile, "birth_date", None)
-    if not bd:
-        return False
-
-    today = date.today()
-    age = today.year - bd.year - ((today.month, today.day) < (bd.month, bd.day))
-    return age >= 16
+    return user_is_adult(getattr(request, "user", None))
 
 
 def _youtube_to_embed(url: str) -> str | None:
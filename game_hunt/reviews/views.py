@@ -1,60 +1,64 @@
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.db.models import F, Q
+from django.db.models import Q
 from django.http import HttpResponseForbidden
-from django.utils import timezone
 from django.utils.http import url_has_allowed_host_and_scheme
-from games.utils import paginate_games
+from games.utils import paginate_games, adult_counts, bump_list_counts
 from games.models import Game
 from .models import Review, ReviewVote, ReviewComment
 from .forms import ReviewForm, ReviewImageFormSet, ReviewCommentForm
 from urllib.parse import urlparse, parse_qs
 from django.contrib.auth.decorators import login_required
-from django.db.models import F, Count, Q
+from django.db.models import Count, Q
 from django.http import JsonResponse, HttpResponseForbidden
 from django.shortcuts import get_object_or_404, render
 from django.template.loader import render_to_string
-from django.utils import timezone
 from django.views.decorators.http import require_POST
 from .forms import ReviewCommentForm, ReviewAdminForm
 from .models import Review, ReviewVote, ReviewComment
 from .utils import can_view_adult, _youtube_to_embed
-from datetime import timedelta
+from core.search import search_ids, reindex
+from core import counters, pagecache, ratelimit
 
 
+@pagecache.cache_anonymous("reviews", "games")
 def review_list(request):
     qs = Review.objects.select_related("game", "author", "author__profile")
 
     # показываем только опубликованные
     qs = qs.filter(is_published=True)
 
-    # всего опубликованных (включая 16+)
-    total_published = qs.count()
+    # всего опубликованных (включая 16+) и сколько из них 16+ - одним запросом, без фильтров поиска
+    total_published, adult_published = adult_counts(qs, "game__is_adult_only", "reviews", "published")
 
     adult_allowed = can_view_adult(request)
     if not adult_allowed:
         qs = qs.exclude(game__is_adult_only=True)
 
     # сколько опубликованных доступно пользователю после фильтра 16+
-    visible_total = qs.count()
+    visible_total = total_published if adult_allowed else total_published - adult_published
 
     adult_blocked_only = (not adult_allowed) and (total_published > 0) and (visible_total == 0)
     has_more_adult = (not adult_allowed) and (total_published > visible_total)
 
-    # ✅ поиск по названию игры
+    # ✅ поиск по названию игры, названию обзора и автору - через единый индекс core.search
     game_search = request.GET.get("game_search", "").strip()
     if game_search:
-        q = game_search.casefold()
-        qs = qs.filter(
-            Q(game__title__icontains=game_search) |
-            Q(game__slug__icontains=game_search) |
-            Q(title__icontains=game_search) |
-            Q(author__username__icontains=game_search) |
-            Q(author__profile__nickname__icontains=game_search) |
-            Q(game__title__contains=q) |
-            Q(author__username__contains=q)
-        )
+        found_ids = search_ids("review", game_search)
+        if found_ids is not None:
+            qs = qs.filter(pk__in=found_ids)
+        else:
+            q = game_search.casefold()
+            qs = qs.filter(
+                Q(game__title__icontains=game_search) |
+                Q(game__slug__icontains=game_search) |
+                Q(title__icontains=game_search) |
+                Q(author__username__icontains=game_search) |
+                Q(author__profile__nickname__icontains=game_search) |
+                Q(game__title__contains=q) |
+                Q(author__username__contains=q)
+            )
 
     # (оставим поддержку фильтра из game_detail: ?game=slug)
     game_slug = request.GET.get("game")
@@ -69,9 +73,12 @@ def review_list(request):
     else:
         qs = qs.order_by("-created_at")
 
-    reviews, custom_range = paginate_games(request, qs, 3)  # пагинацию не трогаю логически
+    # без поиска и фильтра по игре в выборке ровно visible_total обзоров - COUNT для пагинатора не нужен
+    total = visible_total if not (game_search or game_slug) else None
+    reviews, custom_range = paginate_games(request, qs, 3, total=total)
     params = request.GET.copy()
     params.pop("page", None)
+    params.pop("cursor", None)
     extra_query = params.urlencode()
 
     return render(request, "reviews/review_list.html", {
@@ -86,10 +93,15 @@ def review_list(request):
     })
 
 
+def _count_review_view(request, pk):
+    counters.count_view(request, Review, pk, "viewed_reviews")
+
+
+@pagecache.cache_anonymous("reviews", "games", on_hit=_count_review_view)
 def review_detail(request, pk):
     review = get_object_or_404(
-        Review.objects.select_related("game", "author")
-        .prefetch_related("images"),
+        # картинки не подгружаем заранее: галерея - кешируемый фрагмент ({% cache_for %})
+        Review.objects.select_related("game", "author"),
         pk=pk
     )
     adult_allowed = can_view_adult(request)
@@ -102,12 +114,9 @@ def review_detail(request, pk):
         if not request.user.is_authenticated or (request.user != review.author and not request.user.is_staff):
             return HttpResponseForbidden("Обзор на модерации.")
 
-    # просмотры: как games (1 раз за сессию)
-    viewed = request.session.get("viewed_reviews", [])
-    if review.id not in viewed:
-        Review.objects.filter(pk=review.id).update(views_count=F("views_count") + 1)
-        viewed.append(review.id)
-        request.session["viewed_reviews"] = viewed
+    # просмотры: как games (1 раз за сессию, из кеша - через on_hit)
+    _count_review_view(request, review.id)
+    pagecache.remember(request, pk=review.id)
 
     comments = (
         review.comments.filter(is_deleted=False)
@@ -189,7 +198,12 @@ def review_edit(request, pk):
 
             # ✅ только обычный пользователь отправляет повторно на модерацию
             if not request.user.is_staff:
-                Review.objects.filter(pk=review.pk).update(is_published=False)
+                Review.objects.filter(pk=review.pk).update(is_published=False, is_rejected=False)
+                # update() не вызывает сигналы - обновляем поисковый индекс, счётчики списка и кеш страниц вручную
+                bump_list_counts("reviews")
+                reindex("review", [review.pk])
+                # сигнал form.save() сбросил кеш ещё опубликованной версии - сбрасываем снова
+                pagecache.bump("reviews")
 
             messages.success(request, "Обзор обновлён.")
 
@@ -237,6 +251,7 @@ def review_delete(request, pk):
 
 
 @login_required
+@ratelimit.limit("vote", methods=("POST",))
 def review_vote(request, pk):
     review = get_object_or_404(Review, pk=pk)
 
@@ -272,20 +287,10 @@ def review_add_comment(request, pk):
     if not text:
         return JsonResponse({"error": "Комментарий пустой"}, status=400)
 
-    # 🔴 ОГРАНИЧЕНИЕ: 1 комментарий в минуту (как в games)
-    last_comment = (
-        ReviewComment.objects
-        .filter(user=request.user, review=review)
-        .order_by("-created_at")
-        .first()
-    )
-    if last_comment:
-        delta = timezone.now() - last_comment.created_at
-        if delta < timedelta(minutes=1):
-            seconds_left = 60 - int(delta.total_seconds())
-            return JsonResponse({
-                "error": f"Можно комментировать раз в минуту. Подождите {seconds_left} сек."
-            }, status=429)
+    # ограничение частоты (как в games)
+    retry_after = ratelimit.check(request, "comment", scope="reviews")
+    if retry_after:
+        return ratelimit.limited_response(request, retry_after, f"Можно комментировать не так часто. Подождите {retry_after} сек.")
 
     comment = ReviewComment.objects.create(
         review=review,
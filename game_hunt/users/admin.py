@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Profile, AdminMessages, UserMessages
+from .models import Profile, AdminMessages, UserMessages, Broadcast
 from .forms import ProfileAdminForm
 from django.contrib.auth.models import User
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
@@ -122,6 +122,16 @@ class ProfileAdmin(admin.ModelAdmin):
     readonly_fields = ('created', 'last_seen',)
     # какие поля не видны и не редактируются из админки
     exclude = ('phone', 'first_name', 'last_name', 'email', 'bio', 'profile_image')
+    list_select_related = ('user',)
+
+    # В списке не загружаем колонки, которые он не показывает (имя, фамилия, о себе);
+    # показанные шифруемые поля расшифровываются лениво, только при обращении
+    def get_queryset(self, request):
+        qs = super().get_queryset(request)
+        match = request.resolver_match
+        if match and match.url_name and match.url_name.endswith('_changelist'):
+            qs = qs.defer('first_name', 'last_name', 'bio')
+        return qs
 
     def masked_phone(self, obj):
         return mask_phone(obj.phone)
@@ -307,3 +317,10 @@ admin.site.unregister(EmailAddress)
 admin.site.register(User, SafeUserAdmin)
 # зарегистрировать безопасный SafeEmailAddressAdmin
 admin.site.register(EmailAddress, SafeEmailAddressAdmin)
+
+
+@admin.register(Broadcast)
+class BroadcastAdmin(admin.ModelAdmin):
+    list_display = ("id", "topic", "title", "send_to", "status", "sent", "total", "created_at", "finished_at")
+    list_filter = ("status", "topic")
+    readonly_fields = ("created_by", "status", "total", "sent", "last_user_id", "created_at", "finished_at")
@@ -0,0 +1,48 @@
+"""
+Счётчики непрочитанных для колокольчика (users.context_processors.bell_counts).
+
+Хранятся в кеше: bell:user:<id> - непрочитанные уведомления пользователя,
+bell:admin - непрочитанные обращения к администрации (общий для всего стаффа).
+Сигналы (users.signals) сдвигают их на +-1 при создании/прочтении/удалении сообщений.
+Если ключа нет, счётчик один раз пересчитывается из БД (COUNT) и снова живёт в кеше.
+TTL ограничивает возможный дрейф при гонках между пересчётом и сдвигом.
+"""
+from django.core.cache import cache
+
+CACHE_TTL = 10 * 60
+ADMIN_KEY = "bell:admin"
+
+
+def user_key(user_id):
+    return f"bell:user:{user_id}"
+
+
+def _get_or_count(key, count):
+    value = cache.get(key)
+    if value is None:
+        value = count()
+        # add, а не set: не перетираем значение, которое успел выставить параллельный запрос
+        cache.add(key, value, CACHE_TTL)
+    return max(value, 0)
+
+
+def user_unread(user_id):
+    from .models import UserMessages
+    return _get_or_count(user_key(user_id), lambda: UserMessages.objects.filter(user_id=user_id, is_read=False).count())
+
+
+def admin_unread():
+    from .models import AdminMessages
+    return _get_or_count(ADMIN_KEY, lambda: AdminMessages.objects.filter(is_read=False).count())
+
+
+def adjust(key, delta):
+    # Ключа нет - ничего не делаем: при следующем показе счётчик пересчитается целиком
+    try:
+        cache.incr(key, delta)
+    except ValueError:
+        pass
+
+
+def reset(*keys):
+    cache.delete_many(keys)
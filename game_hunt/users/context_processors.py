@@ -1,4 +1,4 @@
-from .models import AdminMessages, UserMessages
+from . import bell
 
 
 def bell_counts(request):
@@ -6,14 +6,15 @@ def bell_counts(request):
     user_unread = 0
 
     if request.user.is_authenticated:
+        # счётчики берутся из кеша (users.bell), в БД идём только при холодном кеше
         if request.user.is_staff or request.user.is_superuser:
-            admin_unread = AdminMessages.objects.filter(is_read=False).count()
+            admin_unread = bell.admin_unread()
 
         # ✅ считаем для любого пользователя, включая админов
-        user_unread = UserMessages.objects.filter(user=request.user, is_read=False).count()
+        user_unread = bell.user_unread(request.user.pk)
 
     return {
         "admin_unread_count": admin_unread,
         "user_unread_count": user_unread,
         "bell_total": admin_unread + user_unread,
-    }
\ No newline at end of file
+    }
@@ -1,24 +1,92 @@
 from django.conf import settings
 from django.db import models
+from django.db.models.query_utils import DeferredAttribute
 from cryptography.fernet import InvalidToken
 # Забираем из нашего utils методы шифрования и расшифровки
-from .utils import encrypt_text, decrypt_text
+from .utils import encrypt_text, decrypt_text, blind_hash
 from datetime import datetime, date
 
 
-class EncryptedCharField(models.CharField):
+# Ленивая расшифровка.
+# from_db_value не расшифровывает, а помечает значение из БД как Ciphertext. Расшифровка происходит
+# при первом обращении к атрибуту модели (DecryptedAttribute), результат остаётся в экземпляре.
+# Колонки, которые страница не показывает, не стоят ни одной операции Fernet.
+# Нетронутый Ciphertext при сохранении пишется в БД как есть, без повторного шифрования.
+# values()/values_list() атрибутов не используют - там приходит Ciphertext, расшифровка: field.decrypt(value).
+class Ciphertext(str):
+    pass
+
+
+class DecryptedAttribute(DeferredAttribute):
+    # Дескриптор поля: как обычный (поддерживает only()/defer()), но расшифровывает Ciphertext при чтении
+
+    def __get__(self, instance, cls=None):
+        if instance is None:
+            return self
+        value = super().__get__(instance, cls)
+        if isinstance(value, Ciphertext):
+            value = self.field.decrypt(value)
+            instance.__dict__[self.field.attname] = value
+        return value
+
+    # data-дескриптор: иначе значение из instance.__dict__ читалось бы в обход __get__
+    def __set__(self, instance, value):
+        instance.__dict__[self.field.attname] = value
+
+
+class LazyDecryptMixin:
+    descriptor_class = DecryptedAttribute
+
+    def from_db_value(self, value, expression, connection):
+        if value is None or value == '':
+            return value
+        return Ciphertext(value)
+
+    def raw_value(self, model_instance):
+        # Значение без расшифровки (Ciphertext, если атрибут ещё не читали)
+        return model_instance.__dict__.get(self.attname)
+
+
+class EncryptedCharField(LazyDecryptMixin, models.CharField):
     # EncryptedCharField- поле, перед записью в БД шифрует данные, когда считывает - расшифровывает,
     # защита от утечки данных.
+    # blind_index - имя соседнего поля, куда при сохранении пишется HMAC значения (users.utils.blind_hash):
+    # по нему работают поиск (filter(phone_hash=...)) и уникальность. blind_index_normalizer - приведение
+    # значения к единому виду перед хешированием.
+
+    def __init__(self, *args, blind_index=None, blind_index_normalizer=None, **kwargs):
+        self.blind_index = blind_index
+        self.blind_index_normalizer = blind_index_normalizer
+        super().__init__(*args, **kwargs)
+
+    # blind_index не влияет на схему БД, поэтому в миграции не попадает
+
+    def hash_value(self, value):
+        if value is None or value == '':
+            return None
+        if self.blind_index_normalizer:
+            value = self.blind_index_normalizer(value)
+        return blind_hash(value)
+
+    def pre_save(self, model_instance, add):
+        raw = self.raw_value(model_instance)
+        if self.blind_index:
+            # поле хеша объявлено в модели после шифруемого - Django прочитает уже обновлённое значение
+            setattr(model_instance, self.blind_index, self.hash_value(getattr(model_instance, self.attname)))
+        # значение не меняли - отдаём исходный шифротекст, без повторного шифрования
+        if isinstance(raw, Ciphertext):
+            return raw
+        return super().pre_save(model_instance, add)
 
     def get_prep_value(self, value):
+        if isinstance(value, Ciphertext):
+            return str(value)
         value = super().get_prep_value(value)
         if value is None or value == '':
             return value
         return encrypt_text(value)
 
-    def from_db_value(self, value, expression, connection):
-        if value is None or value == '':
-            return value
+    def decrypt(self, value):
         return decrypt_text(value)
 
     # Преобразование к "питоновскому" виду.
@@ -28,10 +96,10 @@ class EncryptedCharField(models.CharField):
 
 
 # Шифруемое поле даты рождения
-class EncryptedDateField(models.TextField):
+class EncryptedDateField(LazyDecryptMixin, models.TextField):
 
-    def from_db_value(self, value, expression, connection):
-        # Расшифровывает дату из БД при чтении
+    def decrypt(self, value):
+        # Расшифровывает дату из БД при первом обращении к атрибуту
         if value is None:
             return value
 
@@ -41,6 +109,13 @@ class EncryptedDateField(models.TextField):
         except Exception:
             return None  # или оставить value
 
+    def pre_save(self, model_instance, add):
+        # как у EncryptedCharField: значение не меняли - сохраняем исходный шифротекст, не расшифровывая
+        raw = self.raw_value(model_instance)
+        if isinstance(raw, Ciphertext):
+            return raw
+        return super().pre_save(model_instance, add)
+
     def to_python(self, value):
         # Преобразует значение к date , если приходит строка или дата.
         if value is None or isinstance(value, date):
@@ -51,6 +126,9 @@ class EncryptedDateField(models.TextField):
             return value
 
     def get_prep_value(self, value):
+        # Нетронутый шифротекст из БД сохраняем как есть
+        if isinstance(value, Ciphertext):
+            return str(value)
         # Перед сохранением в БД преобразуется в вид dd-mm-YYYY
         if value is None:
             return value
@@ -59,3 +137,14 @@ class EncryptedDateField(models.TextField):
             value = value.strftime("%d-%m-%Y")
 
         return encrypt_text(value)
+
+
+def blind_index_update_fields(instance, update_fields):
+    # save(update_fields=["phone"]) должен сохранить и phone_hash, иначе индекс разойдётся со значением
+    if update_fields is None:
+        return None
+    update_fields = set(update_fields)
+    for field in instance._meta.concrete_fields:
+        if getattr(field, "blind_index", None) and field.name in update_fields:
+            update_fields.add(field.blind_index)
+    return update_fields
@@ -362,7 +362,11 @@ class GameHuntSignupForm(SignupForm):
         phone = self.cleaned_data.get('phone')
         if not phone:
             return phone
-        return normalize_phone(phone, raise_on_error=True)
+        phone = normalize_phone(phone, raise_on_error=True)
+        # уникальность телефона - по слепому индексу (шифротексты одинаковых номеров различаются)
+        if Profile.objects.filter(**Profile.blind_lookup('phone', phone)).exists():
+            raise ValidationError('Этот номер телефона уже используется.')
+        return phone
 
     def save(self, request):
         # создаём User через allauth
@@ -413,13 +417,15 @@ class GameHuntLoginForm(LoginForm):
         # Пробуем найти в поле логин номер телефона, но не выбрасываем исключение в случае если телефон не найден
         normalized = normalize_phone(login, raise_on_error=False)
         if normalized:
-            # ИЩЕМ ПО РАССШИФРОВАННЫМ ТЕЛЕФОНАМ
-            for profile in Profile.objects.exclude(phone__isnull=True):
-                # profile.phone здесь уже РАСШИФРОВАНО EncryptedCharField'ом
-                if profile.phone == normalized:
-                    user = profile.user
-                    # возвращаем логин этого пользователя
-                    return user.get_username()
+            # Ищем по слепому индексу phone_hash (HMAC номера) - один запрос по индексу вместо расшифровки всех телефонов
+            profile = (
+                Profile.objects.filter(**Profile.blind_lookup('phone', normalized))
+                .select_related('user')
+                .first()
+            )
+            if profile:
+                # возвращаем логин этого пользователя
+                return profile.user.get_username()
 
             # если никого не нашли по телефону — идём дальше как обычный логин
 
@@ -502,7 +508,12 @@ class ProfileEditForm(forms.ModelForm):
         phone = self.cleaned_data.get("phone")
         if not phone:
             return phone
-        return normalize_phone(phone, raise_on_error=True)
+        phone = normalize_phone(phone, raise_on_error=True)
+        # уникальность телефона - по слепому индексу (шифротексты одинаковых номеров различаются)
+        taken = Profile.objects.filter(**Profile.blind_lookup("phone", phone)).exclude(pk=self.instance.pk)
+        if taken.exists():
+            raise ValidationError("Этот номер телефона уже используется.")
+        return phone
 
     def clean_nickname(self):
         nick = (self.cleaned_data.get("nickname") or "").strip()
@@ -0,0 +1,82 @@
+# Фоновые задачи пользователей (core.jobs): выполняются командой run_jobs, не в запросе
+from django.conf import settings
+from django.core.mail import send_mail
+from django.db import transaction
+from django.utils import timezone
+
+from core import jobs
+from . import bell
+from .models import Broadcast, UserMessages
+from .telegram_notify import tg_deliver_admin
+
+BROADCAST_CHUNK = 1000
+
+
+@jobs.register("users.send_mail")
+def send_mail_job(subject, message, recipient_list, from_email=None):
+    send_mail(
+        subject=subject,
+        message=message,
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        recipient_list=recipient_list,
+        fail_silently=False,
+    )
+
+
+@jobs.register("users.tg_admin")
+def tg_admin_job(text):
+    tg_deliver_admin(text)
+
+
+@jobs.register("users.broadcast")
+def broadcast_job(broadcast_id):
+    """
+    Создаёт уведомления рассылки пачками bulk_create. Прогресс (sent, last_user_id) фиксируется
+    в той же транзакции, что и пачка, - повтор после сбоя продолжает с места остановки без дублей.
+    """
+    broadcast = Broadcast.objects.filter(pk=broadcast_id).first()
+    if broadcast is None or broadcast.status == Broadcast.STATUS_DONE:
+        return
+
+    recipients = broadcast.recipients()
+    if broadcast.status == Broadcast.STATUS_PENDING:
+        broadcast.total = recipients.count()
+        broadcast.status = Broadcast.STATUS_RUNNING
+        broadcast.save(update_fields=["total", "status"])
+
+    # картинка уже лежит в хранилище - строки ссылаются на тот же файл
+    image = broadcast.image.name or None
+    while True:
+        ids = list(
+            recipients.filter(pk__gt=broadcast.last_user_id)
+            .order_by("pk").values_list("pk", flat=True)[:BROADCAST_CHUNK]
+        )
+        if not ids:
+            break
+
+        with transaction.atomic():
+            UserMessages.objects.bulk_create([
+                UserMessages(
+                    user_id=user_id,
+                    broadcast=broadcast,
+                    sender=broadcast.sender,
+                    topic=broadcast.topic,
+                    title=broadcast.title,
+                    text=broadcast.text,
+                    link=broadcast.link,
+                    image=image,
+                )
+                for user_id in ids
+            ])
+            broadcast.sent += len(ids)
+            broadcast.last_user_id = ids[-1]
+            broadcast.save(update_fields=["sent", "last_user_id"])
+
+        # bulk_create не шлёт сигналы - счётчики колокольчика получателей пересчитаются из БД
+        bell.reset(*[bell.user_key(user_id) for user_id in ids])
+        # рассылка по всем пользователям может идти дольше JOBS_LOCK_TIMEOUT
+        jobs.heartbeat()
+
+    broadcast.status = Broadcast.STATUS_DONE
+    broadcast.finished_at = timezone.now()
+    broadcast.save(update_fields=["status", "finished_at"])
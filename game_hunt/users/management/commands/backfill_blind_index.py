@@ -0,0 +1,62 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+
+from users.models import Profile
+
+
+class Command(BaseCommand):
+    help = "Заполняет слепые индексы Profile.phone_hash / email_hash пачками"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500, help="Сколько профилей обрабатывать за транзакцию")
+        parser.add_argument("--all", action="store_true",
+                            help="Пересчитать все профили (например, после смены BLIND_INDEX_KEY), а не только пустые")
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        phone_field = Profile._meta.get_field("phone")
+        email_field = Profile._meta.get_field("email")
+
+        qs = Profile.objects.order_by("pk").only("pk", "phone", "email", "phone_hash", "email_hash")
+        if not options["all"]:
+            qs = qs.filter(
+                Q(phone__isnull=False, phone_hash__isnull=True) | Q(email__isnull=False, email_hash__isnull=True)
+            )
+
+        last_pk = 0
+        updated = duplicates = 0
+        while True:
+            # keyset по pk: обновлённые строки выпадают из фильтра, OFFSET пропускал бы профили
+            batch = list(qs.filter(pk__gt=last_pk)[:batch_size])
+            if not batch:
+                break
+            last_pk = batch[-1].pk
+
+            for profile in batch:
+                profile.phone_hash = phone_field.hash_value(profile.phone)
+                profile.email_hash = email_field.hash_value(profile.email)
+
+            # один телефон у двух профилей: хеш остаётся только у того, у кого он уже был (или у первого)
+            hashes = [p.phone_hash for p in batch if p.phone_hash]
+            taken = set(
+                Profile.objects.filter(phone_hash__in=hashes)
+                .exclude(pk__in=[p.pk for p in batch])
+                .values_list("phone_hash", flat=True)
+            )
+            for profile in batch:
+                if profile.phone_hash in taken:
+                    self.stderr.write(f"Профиль {profile.pk}: телефон уже занят другим профилем, хеш не записан")
+                    profile.phone_hash = None
+                    duplicates += 1
+                elif profile.phone_hash:
+                    taken.add(profile.phone_hash)
+
+            with transaction.atomic():
+                # сначала снимаем старые хеши пачки, чтобы перестановка значений не упёрлась в unique
+                if options["all"]:
+                    Profile.objects.filter(pk__in=[p.pk for p in batch]).update(phone_hash=None)
+                Profile.objects.bulk_update(batch, ["phone_hash", "email_hash"])
+            updated += len(batch)
+
+        self.stdout.write(self.style.SUCCESS(f"Обновлено профилей: {updated}, конфликтов телефонов: {duplicates}"))
@@ -1,17 +1,20 @@
+from django.conf import settings
 from django.utils import timezone
-from .models import Profile
+from . import presence
 
 
 # при запуске сервера создается экземпляр класса LastSeenMiddleware
 class LastSeenMiddleware:
     def __init__(self, get_responce):
         self.get_responce = get_responce
+        # статика и медиа (при раздаче через Django) активностью не считаются
+        self.skip_prefixes = tuple(p for p in (settings.STATIC_URL, settings.MEDIA_URL) if p)
 
     # отрабатывает при каждом запросе пользователя, т.к он включён в MIDDLEWARE settings.py
     def __call__(self, request):
         response = self.get_responce(request)
-        # для авторизированного пользователя находим экземпляр Profile через filter(быстрее, не выдаст ошибку),
-        # затем обновляем last_seen экземпляра Profile через update
-        if request.user.is_authenticated:
-            Profile.objects.filter(user=request.user).update(last_seen=timezone.now())
+        # для авторизированного пользователя время активности пишем в кеш,
+        # в БД (Profile.last_seen) оно уходит пачками и не чаще LAST_SEEN_WRITE_INTERVAL (см. users.presence)
+        if request.user.is_authenticated and not request.path.startswith(self.skip_prefixes):
+            presence.touch(request.user.pk, timezone.now())
         return response
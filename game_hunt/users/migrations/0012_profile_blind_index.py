@@ -0,0 +1,47 @@
+# Слепые индексы (HMAC) для шифруемых телефона и почты профиля
+
+from django.db import migrations, models
+
+import users.encryption
+from users.utils import blind_hash, normalize_email_index, normalize_phone_index
+
+
+def fill_blind_index(apps, schema_editor):
+    # Историческая модель расшифровывает значения (from_db_value), но слепых индексов не знает - считаем здесь.
+    # Повторяющиеся телефоны (unique на шифротексте их не ловил) оставляем без хеша у более новых профилей.
+    Profile = apps.get_model('users', 'Profile')
+    seen_phones = set()
+    for profile in Profile.objects.order_by('pk').only('pk', 'phone', 'email').iterator(chunk_size=500):
+        phone_hash = blind_hash(normalize_phone_index(profile.phone)) if profile.phone else None
+        if phone_hash in seen_phones:
+            phone_hash = None
+        if phone_hash:
+            seen_phones.add(phone_hash)
+        email_hash = blind_hash(normalize_email_index(profile.email)) if profile.email else None
+        Profile.objects.filter(pk=profile.pk).update(phone_hash=phone_hash, email_hash=email_hash)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0011_adminmessages_is_published_adminmessages_status_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='email_hash',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=64, null=True, verbose_name='Хеш почты'),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='phone_hash',
+            field=models.CharField(blank=True, editable=False, max_length=64, null=True, unique=True, verbose_name='Хеш телефона'),
+        ),
+        migrations.AlterField(
+            model_name='profile',
+            name='phone',
+            field=users.encryption.EncryptedCharField(blank=True, max_length=25, null=True, verbose_name='Телефон'),
+        ),
+        migrations.RunPython(fill_blind_index, migrations.RunPython.noop),
+    ]
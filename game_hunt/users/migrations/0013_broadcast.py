@@ -0,0 +1,47 @@
+# Generated by Django 5.2.8 on 2026-10-18 12:00
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0012_profile_blind_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Broadcast',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('send_to', models.CharField(default='all', max_length=10, verbose_name='Кому')),
+                ('recipient_ids', models.JSONField(blank=True, default=list, verbose_name='Получатели')),
+                ('sender', models.CharField(default='Администрация сайта', max_length=120, verbose_name='Отправитель')),
+                ('topic', models.CharField(choices=[('warning', 'Предупреждение'), ('moderation_result', 'Результаты модерации'), ('profile_block', 'Блокировка профиля'), ('sanctions', 'Санкции'), ('other', 'Другое')], default='other', max_length=40, verbose_name='Тема сообщения')),
+                ('title', models.CharField(blank=True, max_length=140, verbose_name='Своя тема обращения')),
+                ('text', models.TextField(verbose_name='Текст сообщения')),
+                ('link', models.CharField(blank=True, max_length=255, verbose_name='Ссылка')),
+                ('image', models.ImageField(blank=True, null=True, upload_to='user_messages/', verbose_name='Изображение')),
+                ('status', models.CharField(choices=[('pending', 'В очереди'), ('running', 'Отправляется'), ('done', 'Отправлена')], default='pending', max_length=10, verbose_name='Статус')),
+                ('total', models.PositiveIntegerField(default=0, verbose_name='Всего получателей')),
+                ('sent', models.PositiveIntegerField(default=0, verbose_name='Отправлено')),
+                ('last_user_id', models.PositiveBigIntegerField(default=0, verbose_name='Последний получатель')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Создана')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Завершена')),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='broadcasts', to=settings.AUTH_USER_MODEL, verbose_name='Автор')),
+            ],
+            options={
+                'verbose_name': 'Рассылка уведомлений',
+                'verbose_name_plural': 'Рассылки уведомлений',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.AddField(
+            model_name='usermessages',
+            name='broadcast',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='messages', to='users.broadcast', verbose_name='Рассылка'),
+        ),
+    ]
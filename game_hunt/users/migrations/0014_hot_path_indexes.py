@@ -0,0 +1,21 @@
+# Generated by Django 5.2.8 on 2026-10-18 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0013_broadcast'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='adminmessages',
+            index=models.Index(fields=['is_read', '-created_at'], name='adminmsg_read_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='usermessages',
+            index=models.Index(fields=['user', 'is_read', '-created_at'], name='usermsg_user_read_idx'),
+        ),
+    ]
@@ -4,7 +4,9 @@ from django.db.models import OneToOneField
 from datetime import date, timedelta
 from django.utils import timezone
 # Забираем из нашего encryption шифрующее поле.
-from . encryption import EncryptedCharField, EncryptedDateField
+from . encryption import EncryptedCharField, EncryptedDateField, blind_index_update_fields
+from . utils import normalize_email_index, normalize_phone_index, cached_is_adult
+from . import presence
 # Импортировали нашу модель с жанрами
 from games.models import Genre
 from django.conf import settings
@@ -18,9 +20,17 @@ class Profile(models.Model):
     # Далее шифруемые поля Profile.
     first_name = EncryptedCharField(blank=True, null=True, max_length=150, verbose_name='Имя')
     last_name = EncryptedCharField(blank=True, null=True, max_length=150, verbose_name='Фамилия')
-    email = EncryptedCharField(blank=True, null=True, max_length=250, verbose_name='Почта')
+    email = EncryptedCharField(blank=True, null=True, max_length=250, verbose_name='Почта',
+                               blind_index='email_hash', blind_index_normalizer=normalize_email_index)
     birth_date = EncryptedDateField(blank=True, null=True, verbose_name='Дата рождения')
-    phone = EncryptedCharField(blank=True, null=True, max_length=25, unique=True, verbose_name='Телефон')
+    # Уникальность телефона проверяется по phone_hash: шифротекст Fernet каждый раз разный
+    phone = EncryptedCharField(blank=True, null=True, max_length=25, verbose_name='Телефон',
+                               blind_index='phone_hash', blind_index_normalizer=normalize_phone_index)
+    # Слепые индексы (HMAC) шифруемых полей: заполняются полями email/phone при сохранении
+    email_hash = models.CharField(max_length=64, blank=True, null=True, db_index=True, editable=False,
+                                  verbose_name='Хеш почты')
+    phone_hash = models.CharField(max_length=64, blank=True, null=True, unique=True, editable=False,
+                                  verbose_name='Хеш телефона')
     # Далее не шифруемые поля Profile.
     # Добавить стандартную картинку профиля
     profile_image = models.ImageField(null=True, default='default.png', upload_to='profile_images/',
@@ -37,6 +47,18 @@ class Profile(models.Model):
 
         return self.nickname
 
+    # Условие поиска по шифруемому полю через слепой индекс:
+    # Profile.objects.filter(**Profile.blind_lookup('phone', '79991234567'))
+    @classmethod
+    def blind_lookup(cls, field_name, value):
+        field = cls._meta.get_field(field_name)
+        return {field.blind_index: field.hash_value(value)}
+
+    def save(self, *args, **kwargs):
+        if kwargs.get('update_fields') is not None:
+            kwargs['update_fields'] = blind_index_update_fields(self, kwargs['update_fields'])
+        super().save(*args, **kwargs)
+
     # Геттер для установления возраста пользователя
     @property
     def age(self):
@@ -48,11 +70,10 @@ class Profile(models.Model):
             years -= 1
         return years
 
-    # Геттер для проверки 16+
+    # Геттер для проверки 16+ (кешируется на пользователя, см. users.utils.cached_is_adult)
     @property
     def is_adult(self):
-        age = self.age
-        return age is not None and age >= 16
+        return cached_is_adult(self.user_id, lambda: self.birth_date)
 
     class Meta:
         verbose_name = 'профиль'
@@ -60,11 +81,13 @@ class Profile(models.Model):
         ordering = ['created',]
 
     # Геттер для получения флага онлайн/оффлайн(пользователь онлайн если был активен в течение 5 минут)
+    # Свежее время активности лежит в кеше (users.presence), поле в БД обновляется с задержкой
     @property
     def is_online(self):
-        if not self.last_seen:
+        last_seen = presence.get_last_seen(self.user_id) or self.last_seen
+        if not last_seen:
             return False
-        return timezone.now() - self.last_seen < timedelta(minutes=5)
+        return timezone.now() - last_seen < timedelta(minutes=5)
 
 
 ADMIN_MESSAGE_CHOICES_GUEST = [
@@ -147,6 +170,10 @@ class AdminMessages(models.Model):
         ordering = ["is_read", "-created_at"]  # непрочитанные сверху
         verbose_name = 'Сообщение для администрации'
         verbose_name_plural = 'Сообщения для администрации'
+        indexes = [
+            # колокольчик стаффа: COUNT непрочитанных + входящие "непрочитанные сверху"
+            models.Index(fields=["is_read", "-created_at"], name="adminmsg_read_idx"),
+        ]
 
     def __str__(self):
         who = self.user.username if self.user_id else (self.guest_name or self.guest_email or "guest")
@@ -175,11 +202,82 @@ class UserMessages(models.Model):
         verbose_name="Изображение"
     )
     is_published = models.BooleanField(default=True, verbose_name="Показывать")
+    # Из какой рассылки (у массовых уведомлений картинка общая - хранится один раз в Broadcast)
+    broadcast = models.ForeignKey(
+        "Broadcast",
+        null=True, blank=True,
+        on_delete=models.SET_NULL,
+        editable=False,
+        related_name="messages", verbose_name="Рассылка"
+    )
 
     class Meta:
         ordering = ["is_read", "-created_at"]
         verbose_name = 'Уведомление для пользователя'
         verbose_name_plural = 'Уведомления для пользователей'
+        indexes = [
+            # уведомления пользователя и счётчик непрочитанных (user, is_read)
+            models.Index(fields=["user", "is_read", "-created_at"], name="usermsg_user_read_idx"),
+        ]
 
     def __str__(self):
-        return f"{self.user.username}: {self.title}"
\ No newline at end of file
+        return f"{self.user.username}: {self.title}"
+
+
+class Broadcast(models.Model):
+    # Рассылка уведомления многим пользователям: содержимое хранится один раз,
+    # строки UserMessages создаёт фоновая задача users.broadcast пачками
+    STATUS_PENDING = "pending"
+    STATUS_RUNNING = "running"
+    STATUS_DONE = "done"
+    STATUS_CHOICES = [
+        (STATUS_PENDING, "В очереди"),
+        (STATUS_RUNNING, "Отправляется"),
+        (STATUS_DONE, "Отправлена"),
+    ]
+
+    SEND_TO_ALL = "all"
+    SEND_TO_MANY = "many"
+
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        null=True, blank=True,
+        on_delete=models.SET_NULL,
+        related_name="broadcasts", verbose_name="Автор"
+    )
+    send_to = models.CharField(max_length=10, default=SEND_TO_ALL, verbose_name="Кому")
+    recipient_ids = models.JSONField(default=list, blank=True, verbose_name="Получатели")
+
+    sender = models.CharField(max_length=120, default="Администрация сайта", verbose_name='Отправитель')
+    topic = models.CharField(max_length=40, choices=USER_MESSAGE_CHOICES, default="other", verbose_name='Тема сообщения')
+    title = models.CharField(max_length=140, verbose_name='Своя тема обращения', blank=True)
+    text = models.TextField(verbose_name='Текст сообщения')
+    link = models.CharField(max_length=255, blank=True, verbose_name='Ссылка')
+    image = models.ImageField(upload_to="user_messages/", blank=True, null=True, verbose_name="Изображение")
+
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING, verbose_name="Статус")
+    total = models.PositiveIntegerField(default=0, verbose_name="Всего получателей")
+    sent = models.PositiveIntegerField(default=0, verbose_name="Отправлено")
+    # id последнего обработанного пользователя: после сбоя задача продолжает с него без дублей
+    last_user_id = models.PositiveBigIntegerField(default=0, verbose_name="Последний получатель")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='Создана')
+    finished_at = models.DateTimeField(null=True, blank=True, verbose_name='Завершена')
+
+    class Meta:
+        ordering = ["-created_at"]
+        verbose_name = 'Рассылка уведомлений'
+        verbose_name_plural = 'Рассылки уведомлений'
+
+    def __str__(self):
+        return f"{self.get_topic_display()}: {self.sent}/{self.total}"
+
+    def recipients(self):
+        if self.send_to == self.SEND_TO_ALL:
+            return User.objects.filter(is_active=True)
+        return User.objects.filter(pk__in=self.recipient_ids)
+
+    @property
+    def progress(self):
+        if self.status == self.STATUS_DONE:
+            return 100
+        return int(self.sent * 100 / self.total) if self.total else 0
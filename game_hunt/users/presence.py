@@ -0,0 +1,83 @@
+"""
+Последняя активность пользователя (Profile.last_seen) без записи в БД на каждый запрос.
+
+- Точное время активности лежит в кеше (last_seen:<user_id>), Profile.is_online читает сначала его.
+- В БД время попадает не чаще раза в LAST_SEEN_WRITE_INTERVAL секунд на пользователя:
+  пользователь ставится в очередь процесса, очередь сбрасывается одним UPDATE ... CASE
+  раз в LAST_SEEN_FLUSH_INTERVAL секунд или при накоплении LAST_SEEN_BATCH_SIZE записей.
+"""
+import atexit
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError
+from django.db.models import Case, When, Value, DateTimeField
+
+# Кеш живёт дольше окна "онлайн": после истечения is_online откатывается к полю в БД
+CACHE_TTL = 24 * 60 * 60
+
+_pending = {}
+_pending_lock = threading.Lock()
+_flushed_at = time.monotonic()
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def cache_key(user_id):
+    return f"last_seen:{user_id}"
+
+
+def get_last_seen(user_id):
+    return cache.get(cache_key(user_id))
+
+
+def touch(user_id, now):
+    cache.set(cache_key(user_id), now, CACHE_TTL)
+
+    # cache.add удаётся только первому запросу в интервале - остальные в БД не пишут;
+    # пока пользователь ждёт в очереди, просто освежаем его время
+    if user_id in _pending or cache.add(f"last_seen_written:{user_id}", 1, _setting("LAST_SEEN_WRITE_INTERVAL", 60)):
+        with _pending_lock:
+            _pending[user_id] = now
+
+    if _flush_due():
+        flush()
+
+
+def _flush_due():
+    if not _pending:
+        return False
+    if len(_pending) >= _setting("LAST_SEEN_BATCH_SIZE", 100):
+        return True
+    return time.monotonic() - _flushed_at >= _setting("LAST_SEEN_FLUSH_INTERVAL", 60)
+
+
+def flush():
+    """Записывает очередь процесса в Profile.last_seen одним UPDATE."""
+    from .models import Profile
+
+    global _pending, _flushed_at
+    with _pending_lock:
+        batch, _pending = _pending, {}
+        _flushed_at = time.monotonic()
+    if not batch:
+        return 0
+
+    Profile.objects.filter(user_id__in=batch).update(last_seen=Case(
+        *[When(user_id=user_id, then=Value(seen)) for user_id, seen in batch.items()],
+        output_field=DateTimeField(),
+    ))
+    return len(batch)
+
+
+@atexit.register
+def _flush_on_exit():
+    # при штатной остановке воркера не теряем очередь
+    try:
+        flush()
+    except DatabaseError:
+        pass
@@ -2,9 +2,12 @@ from django.contrib.auth.models import User
 from django.db.models.signals import post_save, post_delete, post_migrate
 from django.contrib.auth.models import Group
 from django.dispatch import receiver
-from .models import Profile
+from .models import Profile, AdminMessages, UserMessages
+from . import bell
+from .utils import adult_cache_key
+from django.core.cache import cache
 from django.conf import settings
-from django.core.mail import send_mail
+from core import jobs
 from django.db import transaction
 from django.db.models.signals import pre_save
 from django.urls import reverse
@@ -31,6 +34,13 @@ def create_groups(sender, **kwargs):
         Group.objects.get_or_create(name=group_name)
 
 
+@receiver(post_save, sender=Profile)
+@receiver(post_delete, sender=Profile)
+def reset_adult_flag(sender, instance, **kwargs):
+    # дата рождения могла измениться - флаг 16+ пересчитается при следующей проверке
+    cache.delete(adult_cache_key(instance.user_id))
+
+
 @receiver(post_save, sender=Profile)
 def update_user_group(sender, instance, **kwargs):
     # После редактирования и сохранения профиля:
@@ -108,13 +118,56 @@ def send_email_on_deactivate(sender, instance, **kwargs):
         "Администрация GameHunt\n"
     )
 
-    def _send():
-        send_mail(
-            subject=subject,
-            message=body,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[instance.email],
-            fail_silently=False,
-        )
+    # письмо уходит из воркера очереди (run_jobs), задача откатится вместе с сохранением пользователя
+    jobs.enqueue("users.send_mail", subject=subject, message=body, recipient_list=[instance.email])
+
+# ---- Счётчики колокольчика (users.bell) ----
+# Запоминаем прошлое состояние сообщения, после коммита сдвигаем счётчик в кеше на +-1
+
+def _bell_key(instance, user_id=None):
+    if isinstance(instance, AdminMessages):
+        return bell.ADMIN_KEY
+    return bell.user_key(user_id if user_id is not None else instance.user_id)
+
+
+@receiver(pre_save, sender=AdminMessages)
+@receiver(pre_save, sender=UserMessages)
+def remember_prev_read(sender, instance, **kwargs):
+    if not instance.pk:
+        instance._bell_prev = None
+        return
+    fields = ("is_read", "user_id") if sender is UserMessages else ("is_read",)
+    instance._bell_prev = sender.objects.filter(pk=instance.pk).values_list(*fields).first()
+
+
+@receiver(post_save, sender=AdminMessages)
+@receiver(post_save, sender=UserMessages)
+def update_bell_on_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    prev = getattr(instance, "_bell_prev", None)
+    key = _bell_key(instance)
+
+    if created or prev is None:
+        if not instance.is_read:
+            transaction.on_commit(lambda: bell.adjust(key, 1))
+        return
+
+    if sender is UserMessages and prev[1] != instance.user_id:
+        # сообщение переназначили другому пользователю - проще пересчитать обоих
+        old_key = _bell_key(instance, prev[1])
+        transaction.on_commit(lambda: bell.reset(old_key, key))
+        return
+
+    was_read = prev[0]
+    if was_read != instance.is_read:
+        delta = -1 if instance.is_read else 1
+        transaction.on_commit(lambda: bell.adjust(key, delta))
+
 
-    transaction.on_commit(_send)
\ No newline at end of file
+@receiver(post_delete, sender=AdminMessages)
+@receiver(post_delete, sender=UserMessages)
+def update_bell_on_delete(sender, instance, **kwargs):
+    if not instance.is_read:
+        key = _bell_key(instance)
+        transaction.on_commit(lambda: bell.adjust(key, -1))
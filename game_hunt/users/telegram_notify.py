@@ -1,8 +1,26 @@
+import sys
+
 import requests
 from django.conf import settings
 
+# Сообщения транспорта "locmem" (как django.core.mail.outbox) - для тестов и работы без сети
+outbox = []
+
+
+def tg_deliver_admin(text: str) -> bool:
+    """
+    Отправляет сообщение админу. Ошибки сети/API - исключением, чтобы очередь задач повторила отправку.
+    TELEGRAM_TRANSPORT: "api" - Bot API, "console" - вывод в stdout, "locmem" - в outbox.
+    """
+    transport = getattr(settings, "TELEGRAM_TRANSPORT", "api")
+    if transport == "locmem":
+        outbox.append(text)
+        return True
+    if transport == "console":
+        sys.stdout.write(f"[telegram] {text}\n")
+        sys.stdout.flush()
+        return True
 
-def tg_send_admin(text: str) -> bool:
     token = getattr(settings, "TELEGRAM_BOT_TOKEN", "")
     chat_id = getattr(settings, "TELEGRAM_ADMIN_CHAT_ID", "")
     if not token or not chat_id:
@@ -15,8 +33,13 @@ def tg_send_admin(text: str) -> bool:
         "parse_mode": "HTML",
         "disable_web_page_preview": True,
     }
+    r = requests.post(url, data=payload, timeout=8)
+    r.raise_for_status()
+    return True
+
+
+def tg_send_admin(text: str) -> bool:
     try:
-        r = requests.post(url, data=payload, timeout=8)
-        return r.ok
+        return tg_deliver_admin(text)
     except requests.RequestException:
-        return False
\ No newline at end of file
+        return False
@@ -26,6 +26,8 @@ urlpatterns = [
     path("admin-messages/<int:pk>/read/", views.admin_message_mark_read, name="admin_message_mark_read"),
     path("contact-admin/", views.contact_admin, name="contact_admin"),
     path("admin-send-message/", views.admin_send_message, name="admin_send_message"),
+    path("admin-broadcasts/<int:pk>/", views.admin_broadcast_detail, name="admin_broadcast_detail"),
+    path("admin-broadcasts/<int:pk>/progress/", views.admin_broadcast_progress, name="admin_broadcast_progress"),
     path("notifications/<int:pk>/hide/", views.notification_unpublish, name="notification_unpublish"),
     path("admin-messages/<int:pk>/hide/", views.admin_message_unpublish, name="admin_message_unpublish"),
 
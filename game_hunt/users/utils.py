@@ -2,7 +2,13 @@ from django.conf import settings
 from django.db import models
 from cryptography.fernet import InvalidToken, Fernet
 from django.core.exceptions import ValidationError
+import hashlib
+import hmac
 import re
+from functools import lru_cache
+from datetime import date, datetime, time
+from django.core.cache import cache
+from django.utils import timezone
 from django import forms
 from django.contrib.auth import get_user_model
 from django.urls import reverse
@@ -123,6 +129,13 @@ def decrypt_text(token):
     # Расшифровывает base64-токен.
     if token is None or token == '':
         return token
+    return _decrypt_cached(str(token))
+
+
+# Кеш расшифровки в процессе по шифротексту: одни и те же профили (текущий пользователь, списки)
+# читаются постоянно, а Fernet на каждое чтение - это HMAC + AES. Размер ограничен DECRYPT_CACHE_SIZE.
+@lru_cache(maxsize=getattr(settings, 'DECRYPT_CACHE_SIZE', 4096))
+def _decrypt_cached(token):
     try:
         data = settings.FERNET.decrypt(token.encode('utf-8'))
         return data.decode('utf-8')
@@ -130,6 +143,23 @@ def decrypt_text(token):
         return token
 
 
+# Слепой индекс (blind index) для шифрованных полей: детерминированный HMAC от значения.
+# Fernet каждый раз даёт новый шифротекст, поэтому искать и проверять уникальность можно только по хешу.
+def blind_hash(value):
+    if value is None or value == '':
+        return None
+    return hmac.new(settings.BLIND_INDEX_KEY, str(value).encode('utf-8'), hashlib.sha256).hexdigest()
+
+
+# Приведение значений к одному виду перед хешированием: иначе "User@Mail.ru" и "user@mail.ru" дадут разные хеши
+def normalize_email_index(email):
+    return (email or '').strip().lower()
+
+
+def normalize_phone_index(phone):
+    return normalize_phone(phone, raise_on_error=False) or (phone or '').strip()
+
+
 # Показываем маску телефона вместо полного значения(в админке).
 def mask_phone(number):
     if not number:
@@ -181,3 +211,50 @@ def normalize_phone(phone_number, raise_on_error=True):
 
     return digits
 
+
+
+# ---- Доступ к контенту 16+ ----
+# Решение "взрослый или нет" кешируется на пользователя: горячий путь (каждый список и детальная)
+# не трогает профиль и не расшифровывает birth_date. Несовершеннолетнему флаг ставится
+# ровно до 16-летия, остальным - бессрочно; сохранение профиля сбрасывает кеш (users.signals).
+ADULT_AGE = 16
+
+
+def adult_cache_key(user_id):
+    return f"adult:{user_id}"
+
+
+def _adult_flag(birth_date):
+    # (флаг, сколько секунд он верен: None - пока не изменится профиль)
+    if not birth_date or not isinstance(birth_date, date):
+        return False, None
+    try:
+        adult_from = birth_date.replace(year=birth_date.year + ADULT_AGE)
+    except ValueError:
+        # 29 февраля -> 16 лет исполняется 1 марта
+        adult_from = date(birth_date.year + ADULT_AGE, 3, 1)
+    if timezone.localdate() >= adult_from:
+        return True, None
+    expires = timezone.make_aware(datetime.combine(adult_from, time.min))
+    return False, max(int((expires - timezone.now()).total_seconds()), 1)
+
+
+def cached_is_adult(user_id, get_birth_date):
+    key = adult_cache_key(user_id)
+    flag = cache.get(key)
+    if flag is None:
+        flag, timeout = _adult_flag(get_birth_date())
+        cache.set(key, flag, timeout)
+    return flag
+
+
+def user_is_adult(user):
+    """
+    Общая проверка доступа к контенту 16+ (games.utils.get_adult, reviews.utils.can_view_adult):
+    гость -> нельзя, staff/superuser -> можно всегда, остальные - по возрасту из профиля.
+    """
+    if not user or not user.is_authenticated:
+        return False
+    if user.is_staff or user.is_superuser:
+        return True
+    return cached_is_adult(user.pk, lambda: getattr(getattr(user, 'profile', None), 'birth_date', None))
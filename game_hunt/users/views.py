@@ -1,14 +1,13 @@
-from django.contrib.auth import get_user_model
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required, user_passes_test
 from .forms import ProfileEditForm, ProfileImageEditForm
 from django.contrib import messages
-from .models import Profile, AdminMessages, UserMessages
+from .models import Profile, AdminMessages, UserMessages, Broadcast
 from django.views.decorators.http import require_POST
 from django.http import JsonResponse
-from .forms import GuestToAdminForm, AuthUserToAdminForm, AdminSendUserMessageForm
 from django.db import transaction
-from .telegram_notify import tg_send_admin
+from .forms import GuestToAdminForm, AuthUserToAdminForm, AdminSendUserMessageForm
+from core import images, jobs, ratelimit
 from .utils import build_profile_content
 
 
@@ -74,9 +73,11 @@ def profile_image_edit(request):
         if form.is_valid():
             form.save()
 
-            # удалить старый файл, если заменили
+            # удалить старый файл, если заменили и он больше ни у кого не стоит
+            # (одинаковые картинки после нормализации - один файл, core.images)
             if "profile_image" in form.changed_data:
-                if old_image and old_image.name and old_image.name != "default.png":
+                if old_image and old_image.name and old_image.name != "default.png" \
+                        and not images.is_referenced(old_image.name):
                     old_image.delete(save=False)
 
             messages.success(request, "Фото профиля обновлено.")
@@ -270,6 +271,13 @@ def contact_admin(request):
 
     if request.method == "POST":
         form = form_class(request.POST, request.FILES)
+        # считаем только заполненные формы: ошибка в поле не съедает попытку
+        retry_after = ratelimit.check(request, "contact_admin") if form.is_valid() else 0
+        if retry_after:
+            messages.error(request, f"Слишком много сообщений подряд. Повторите через {retry_after // 60 + 1} мин.")
+            response = render(request, "users/contact_admin.html", {"form": form}, status=429)
+            response["Retry-After"] = str(retry_after)
+            return response
         if form.is_valid():
             obj = form.save(commit=False)
 
@@ -286,30 +294,28 @@ def contact_admin(request):
             # для гостя: user остаётся None, guest_name/email уже из формы
             obj.save()
 
-            def _notify():
-                if obj.user_id:
-                    who = obj.user.profile.nickname or obj.user.username
-                else:
-                    who = obj.guest_name or "Гость"
-                    if obj.guest_email:
-                        who = f"{who} ({obj.guest_email})"
-
-                if obj.topic == "other" and (obj.topic_custom or "").strip():
-                    topic = obj.topic_custom.strip()
-                else:
-                    try:
-                        topic = obj.get_topic_display()
-                    except Exception:
-                        topic = obj.topic
-
-                msg = (
-                    "<b>📩 Новое уведомление</b>\n"
-                    f"От: {who}\n"
-                    f"Тема: {topic}\n"
-                )
-                tg_send_admin(msg)
-
-            transaction.on_commit(_notify)
+            if obj.user_id:
+                who = obj.user.profile.nickname or obj.user.username
+            else:
+                who = obj.guest_name or "Гость"
+                if obj.guest_email:
+                    who = f"{who} ({obj.guest_email})"
+
+            if obj.topic == "other" and (obj.topic_custom or "").strip():
+                topic = obj.topic_custom.strip()
+            else:
+                try:
+                    topic = obj.get_topic_display()
+                except Exception:
+                    topic = obj.topic
+
+            msg = (
+                "<b>📩 Новое уведомление</b>\n"
+                f"От: {who}\n"
+                f"Тема: {topic}\n"
+            )
+            # уведомление в Telegram отправит воркер очереди (run_jobs), запрос его не ждёт
+            jobs.enqueue("users.tg_admin", text=msg)
 
             messages.success(request, "Сообщение отправлено администрации.")
             return redirect("homepage")
@@ -321,7 +327,6 @@ def contact_admin(request):
 
 @user_passes_test(_is_admin, login_url="account_login")
 def admin_send_message(request):
-    User = get_user_model()
     if request.method == "POST":
         form = AdminSendUserMessageForm(request.POST, request.FILES)
         if form.is_valid():
@@ -335,29 +340,59 @@ def admin_send_message(request):
             link = (form.cleaned_data["link"] or "").strip()
             image = form.cleaned_data["image"]
 
-            if send_to == "all":
-                qs = User.objects.filter(is_active=True).select_related("profile")
-            elif send_to == "one":
-                qs = [recipient]
-            else:  # many
-                qs = list(recipients)
+            title = topic_custom if topic == "other" else ""  # "Кратко"
 
-            created = 0
-            for u in qs:
+            if send_to == "one":
                 UserMessages.objects.create(
-                    user=u,
+                    user=recipient,
                     sender="Администрация сайта",
                     topic=topic,
-                    title=topic_custom if topic == "other" else "",  # "Кратко"
+                    title=title,
+                    text=text,
+                    link=link,
+                    image=image if image else None,
+                )
+                messages.success(request, "Отправлено уведомлений: 1")
+                return redirect("admin_messages_inbox")
+
+            # Многим получателям - рассылка: картинка сохраняется один раз,
+            # уведомления создаёт фоновая задача пачками (users.jobs.broadcast_job)
+            with transaction.atomic():
+                broadcast = Broadcast.objects.create(
+                    created_by=request.user,
+                    send_to=Broadcast.SEND_TO_ALL if send_to == "all" else Broadcast.SEND_TO_MANY,
+                    recipient_ids=[] if send_to == "all" else list(recipients.values_list("pk", flat=True)),
+                    topic=topic,
+                    title=title,
                     text=text,
                     link=link,
                     image=image if image else None,
                 )
-                created += 1
+                jobs.enqueue("users.broadcast", broadcast_id=broadcast.pk)
 
-            messages.success(request, f"Отправлено уведомлений: {created}")
-            return redirect("admin_messages_inbox")
+            messages.success(request, "Рассылка поставлена в очередь.")
+            return redirect("admin_broadcast_detail", pk=broadcast.pk)
     else:
         form = AdminSendUserMessageForm()
 
-    return render(request, "users/admin_send_message.html", {"form": form})
\ No newline at end of file
+    return render(request, "users/admin_send_message.html", {"form": form})
+
+
+@user_passes_test(_is_admin, login_url="account_login")
+def admin_broadcast_detail(request, pk):
+    broadcast = get_object_or_404(Broadcast, pk=pk)
+    return render(request, "users/admin_broadcast_detail.html", {"broadcast": broadcast})
+
+
+@user_passes_test(_is_admin, login_url="account_login")
+def admin_broadcast_progress(request, pk):
+    # опрашивается страницей рассылки, пока задача создаёт уведомления
+    broadcast = get_object_or_404(Broadcast, pk=pk)
+    return JsonResponse({
+        "ok": True,
+        "status": broadcast.status,
+        "status_display": broadcast.get_status_display(),
+        "sent": broadcast.sent,
+        "total": broadcast.total,
+        "progress": broadcast.progress,
+    })
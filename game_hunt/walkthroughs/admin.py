@@ -6,6 +6,9 @@ from django.contrib.auth import get_user_model
 from ckeditor_uploader.widgets import CKEditorUploadingWidget
 
 from .models import Walkthrough, WalkthroughImage, WalkthroughVote, WalkthroughComment
+from core import pagecache
+from core.search import reindex
+from games.utils import bump_list_counts
 
 User = get_user_model()
 
@@ -111,11 +114,19 @@ class WalkthroughAdmin(admin.ModelAdmin):
     get_small_cover.short_description = "Обложка"
 
     def publish_selected(self, request, queryset):
+        ids = list(queryset.values_list("pk", flat=True))
         queryset.update(is_published=True)
+        reindex("walkthrough", ids)
+        bump_list_counts("walkthroughs")
+        pagecache.bump("walkthroughs")
     publish_selected.short_description = "Опубликовать выбранные"
 
     def unpublish_selected(self, request, queryset):
+        ids = list(queryset.values_list("pk", flat=True))
         queryset.update(is_published=False)
+        reindex("walkthrough", ids)
+        bump_list_counts("walkthroughs")
+        pagecache.bump("walkthroughs")
     unpublish_selected.short_description = "Снять с публикации"
 
 
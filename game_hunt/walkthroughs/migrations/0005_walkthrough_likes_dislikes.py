@@ -0,0 +1,42 @@
+from django.db import migrations, models
+from django.db.models import (
+    Count, ExpressionWrapper, F, FloatField, IntegerField, OuterRef, Subquery, Value,
+)
+from django.db.models.functions import Cast, Coalesce, NullIf, Round
+
+
+def backfill_vote_counters(apps, schema_editor):
+    Walkthrough = apps.get_model('walkthroughs', 'Walkthrough')
+    WalkthroughVote = apps.get_model('walkthroughs', 'WalkthroughVote')
+
+    def votes_count(value):
+        counted = (WalkthroughVote.objects.filter(walkthrough=OuterRef('pk'), value=value)
+                   .order_by().values('walkthrough').annotate(c=Count('pk')).values('c'))
+        return Coalesce(Subquery(counted, output_field=IntegerField()), Value(0))
+
+    Walkthrough.objects.update(likes=votes_count(1), dislikes=votes_count(-1))
+    # liked_percent из уже посчитанных счётчиков (отдельной UPDATE - в одной видны старые значения)
+    ratio = ExpressionWrapper(F('likes') * Value(100.0) / NullIf(F('likes') + F('dislikes'), Value(0)),
+                              output_field=FloatField())
+    Walkthrough.objects.update(liked_percent=Coalesce(Cast(Round(ratio), IntegerField()), Value(0)))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('walkthroughs', '0004_alter_walkthrough_video_url'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='walkthrough',
+            name='likes',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Лайки'),
+        ),
+        migrations.AddField(
+            model_name='walkthrough',
+            name='dislikes',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Дизлайки'),
+        ),
+        migrations.RunPython(backfill_vote_counters, migrations.RunPython.noop),
+    ]
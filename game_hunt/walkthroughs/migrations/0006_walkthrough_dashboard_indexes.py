@@ -0,0 +1,21 @@
+# Generated by Django 5.2.8 on 2026-10-18 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('walkthroughs', '0005_walkthrough_likes_dislikes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='walkthrough',
+            index=models.Index(fields=['is_published', '-updated_at'], name='walkthrough_pub_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='walkthrough',
+            index=models.Index(fields=['author', '-updated_at'], name='walkthrough_author_updated_idx'),
+        ),
+    ]
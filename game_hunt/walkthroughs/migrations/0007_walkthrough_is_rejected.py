@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-18 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('walkthroughs', '0006_walkthrough_dashboard_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='walkthrough',
+            name='is_rejected',
+            field=models.BooleanField(default=False, editable=False, verbose_name='Отклонён'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.8 on 2026-10-18 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('walkthroughs', '0007_walkthrough_is_rejected'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='walkthrough',
+            index=models.Index(condition=models.Q(('is_published', True)), fields=['-updated_at', '-id'], name='wt_pub_new_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='walkthrough',
+            index=models.Index(condition=models.Q(('is_published', True)), fields=['-views_count', '-updated_at', '-id'], name='wt_pub_popular_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='walkthroughcomment',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['walkthrough', '-created_at'], name='wtcomment_live_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='walkthroughcomment',
+            index=models.Index(fields=['user', '-created_at'], name='wtcomment_user_idx'),
+        ),
+    ]
@@ -1,6 +1,7 @@
 from django.db import models
 from django.contrib.auth.models import User
 from django.db.models import Count, Q
+from core.votes import VoteCountsMixin, liked_percent_value
 from games.models import Game
 from slugify import slugify  # python-slugify
 
@@ -18,7 +19,7 @@ def unique_slugify(instance, base: str, slug_field: str = "slug"):
     return slug
 
 
-class Walkthrough(models.Model):
+class Walkthrough(VoteCountsMixin, models.Model):
     game = models.ForeignKey(Game, on_delete=models.CASCADE, related_name="walkthroughs", verbose_name="Игра")
     author = models.ForeignKey(User, on_delete=models.CASCADE, related_name="walkthroughs", verbose_name="Автор")
 
@@ -38,8 +39,13 @@ class Walkthrough(models.Model):
     video_url = models.URLField(blank=True, verbose_name="Ссылка на видео", max_length=3000)
 
     is_published = models.BooleanField(default=False, verbose_name="Опубликован")
+    # отклонён модератором: не публикуется и не висит в очереди, пока автор не исправит
+    is_rejected = models.BooleanField(default=False, editable=False, verbose_name="Отклонён")
     views_count = models.PositiveIntegerField(default=0, verbose_name="Просмотры")
     liked_percent = models.PositiveSmallIntegerField(blank=True, default=0, verbose_name="Понравилось")
+    # Денормализованные счётчики голосов, двигаются сигналами голосов (core.votes)
+    likes = models.PositiveIntegerField(default=0, editable=False, verbose_name="Лайки")
+    dislikes = models.PositiveIntegerField(default=0, editable=False, verbose_name="Дизлайки")
 
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Создан")
     updated_at = models.DateTimeField(auto_now=True, verbose_name="Обновлён")
@@ -55,6 +61,16 @@ class Walkthrough(models.Model):
         verbose_name = "прохождение"
         verbose_name_plural = "прохождения"
         ordering = ["-created_at"]
+        # админ-панель и очередь модерации: фильтр по статусу/автору + сортировка по updated_at
+        indexes = [
+            models.Index(fields=["is_published", "-updated_at"], name="walkthrough_pub_updated_idx"),
+            models.Index(fields=["author", "-updated_at"], name="walkthrough_author_updated_idx"),
+            # публичный список: только опубликованные (частичные индексы)
+            models.Index(fields=["-updated_at", "-id"], condition=models.Q(is_published=True),
+                         name="wt_pub_new_idx"),
+            models.Index(fields=["-views_count", "-updated_at", "-id"], condition=models.Q(is_published=True),
+                         name="wt_pub_popular_idx"),
+        ]
 
     def __str__(self):
         return f"{self.title} — {self.game}"
@@ -67,14 +83,14 @@ class Walkthrough(models.Model):
         super().save(*args, **kwargs)
 
     def recalc_liked_percent(self):
-        votes = self.votes.all()
-        agg = votes.aggregate(
-            total=Count("id"),
+        # Полный пересчёт по всем голосам (сверка); обычно счётчики двигает core.votes
+        agg = self.votes.aggregate(
             likes=Count("id", filter=Q(value=WalkthroughVote.LIKE)),
+            dislikes=Count("id", filter=Q(value=WalkthroughVote.DISLIKE)),
         )
-        total = agg["total"] or 0
-        self.liked_percent = round((agg["likes"] / total) * 100) if total > 0 else 0
-        self.save(update_fields=["liked_percent"])
+        self.likes, self.dislikes = agg["likes"], agg["dislikes"]
+        self.liked_percent = liked_percent_value(self.likes, self.dislikes)
+        self.save(update_fields=["likes", "dislikes", "liked_percent"])
 
 
 class WalkthroughVote(models.Model):
@@ -112,6 +128,13 @@ class WalkthroughComment(models.Model):
         verbose_name = "комментарий к прохождению"
         verbose_name_plural = "комментарии к прохождениям"
         ordering = ["-created_at"]
+        indexes = [
+            # лента комментариев на странице: только неудалённые (частичный индекс)
+            models.Index(fields=["walkthrough", "-created_at"], condition=models.Q(is_deleted=False),
+                         name="wtcomment_live_idx"),
+            # ограничение "1 комментарий в минуту": последний комментарий пользователя
+            models.Index(fields=["user", "-created_at"], name="wtcomment_user_idx"),
+        ]
 
     def __str__(self):
         return f"Комментарий от {self.user} к {self.walkthrough}"
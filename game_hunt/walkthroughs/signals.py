@@ -1,13 +1,23 @@
-from django.db.models.signals import post_save, post_delete
+from django.db.models.signals import post_save, post_delete, pre_save
 from django.dispatch import receiver
-from .models import WalkthroughVote
+from core import votes
+from .models import Walkthrough, WalkthroughVote
+
+
+# Счётчики лайков прохождения двигаются на дельту голоса (core.votes), без пересчёта всех голосов
+
+@receiver(pre_save, sender=WalkthroughVote)
+def remember_prev_walkthrough_vote(sender, instance, **kwargs):
+    votes.remember_prev_vote(instance)
 
 
 @receiver(post_save, sender=WalkthroughVote)
 def walkthrough_vote_saved(sender, instance, **kwargs):
-    instance.walkthrough.recalc_liked_percent()
+    votes.apply_vote_change(
+        Walkthrough, instance.walkthrough_id, getattr(instance, "_prev_vote_value", None), instance.value
+    )
 
 
 @receiver(post_delete, sender=WalkthroughVote)
 def walkthrough_vote_deleted(sender, instance, **kwargs):
-    instance.walkthrough.recalc_liked_percent()
\ No newline at end of file
+    votes.apply_vote_change(Walkthrough, instance.walkthrough_id, instance.value, None)
@@ -1,21 +1,21 @@
-from games.utils import paginate_games
+from games.utils import paginate_games, adult_counts, bump_list_counts, filter_signature
 from django.db.models import Q
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.db.models import F
 from django.http import JsonResponse, HttpResponseForbidden
 from django.template.loader import render_to_string
 from games.models import Game
 from reviews.utils import can_view_adult, _youtube_to_embed
+from core.search import search_ids, reindex
+from core import counters, pagecache, ratelimit
 from .models import Walkthrough, WalkthroughVote, WalkthroughComment
 from .forms import WalkthroughFormUser, WalkthroughImageFormSet, WalkthroughCommentForm, WalkthroughFormStaff
 from django.views.decorators.http import require_POST
-from datetime import timedelta
-from django.utils import timezone
 from django.utils.http import url_has_allowed_host_and_scheme
 
 
+@pagecache.cache_anonymous("walkthroughs", "games")
 def walkthrough_list(request):
     qs = (
         Walkthrough.objects
@@ -23,24 +23,31 @@ def walkthrough_list(request):
         .filter(is_published=True)
     )
 
-    # ---- поиск: по названию игры + по нику автора ----
+    # ---- поиск: по названию игры + по нику автора (единый индекс core.search) ----
     search_query = request.GET.get("search", "").strip()
     if search_query:
-        qs = qs.filter(
-            Q(title__icontains=search_query) |
-            Q(game__title__icontains=search_query) |
-            Q(author__username__icontains=search_query) |
-            Q(author__profile__nickname__icontains=search_query)
-        )
+        found_ids = search_ids("walkthrough", search_query)
+        if found_ids is not None:
+            qs = qs.filter(pk__in=found_ids)
+        else:
+            qs = qs.filter(
+                Q(title__icontains=search_query) |
+                Q(game__title__icontains=search_query) |
+                Q(author__username__icontains=search_query) |
+                Q(author__profile__nickname__icontains=search_query)
+            )
 
     # ---- возрастной фильтр (16+) ----
-    total_found = qs.count()  # всего найдено (включая 16+)
+    # всего найдено (включая 16+) и сколько из них 16+ - одним запросом
+    total_found, adult_found = adult_counts(
+        qs, "game__is_adult_only", "walkthroughs", filter_signature(request)
+    )
     adult_allowed = can_view_adult(request)
 
     if not adult_allowed:
         qs = qs.exclude(game__is_adult_only=True)
 
-    visible_total = qs.count()  # сколько реально можно показать
+    visible_total = total_found if adult_allowed else total_found - adult_found  # сколько реально можно показать
 
     adult_blocked_only = (not adult_allowed) and (total_found > 0) and (visible_total == 0)
     has_more_adult = (not adult_allowed) and (total_found > visible_total)
@@ -53,10 +60,11 @@ def walkthrough_list(request):
         qs = qs.order_by("-updated_at", "-id")
 
     # ---- пагинация: 3 карточки ----
-    walkthroughs, custom_range = paginate_games(request, qs, 3)
+    walkthroughs, custom_range = paginate_games(request, qs, 3, total=visible_total)
 
     params = request.GET.copy()
     params.pop("page", None)
+    params.pop("cursor", None)
     extra_query = params.urlencode()
 
     return render(request, "walkthroughs/walkthrough_list.html", {
@@ -72,8 +80,8 @@ def walkthrough_list(request):
 
 def walkthrough_detail(request, slug):
     walkthrough = get_object_or_404(
-        Walkthrough.objects.select_related("game", "author", "author__profile")
-        .prefetch_related("images"),
+        # картинки не подгружаем заранее: галерея - кешируемый фрагмент ({% cache_for %})
+        Walkthrough.objects.select_related("game", "author", "author__profile"),
         slug=slug,
     )
 
@@ -90,7 +98,7 @@ def walkthrough_detail(request, slug):
     # views_count 1 раз за сессию
     viewed = request.session.get("viewed_walkthroughs", [])
     if walkthrough.id not in viewed:
-        Walkthrough.objects.filter(pk=walkthrough.id).update(views_count=F("views_count") + 1)
+        counters.increment(Walkthrough, walkthrough.id, "views_count")
         viewed.append(walkthrough.id)
         request.session["viewed_walkthroughs"] = viewed
 
@@ -180,7 +188,12 @@ def walkthrough_edit(request, slug):
 
             # после правок обычного пользователя снова на модерацию
             if not request.user.is_staff:
-                Walkthrough.objects.filter(pk=wt.pk).update(is_published=False)
+                Walkthrough.objects.filter(pk=wt.pk).update(is_published=False, is_rejected=False)
+                # update() не вызывает сигналы - обновляем поисковый индекс, счётчики списка и кеш страниц вручную
+                bump_list_counts("walkthroughs")
+                reindex("walkthrough", [wt.pk])
+                # сигнал form.save() сбросил кеш ещё опубликованной версии - сбрасываем снова
+                pagecache.bump("walkthroughs")
 
             messages.success(request, "Прохождение обновлено.")
 
@@ -232,6 +245,7 @@ def walkthrough_delete(request, slug):
 
 
 @login_required
+@ratelimit.limit("vote", methods=("POST",))
 def walkthrough_vote(request, slug):
     wt = get_object_or_404(Walkthrough, slug=slug)
 
@@ -268,21 +282,12 @@ def walkthrough_add_comment(request, slug):
             return redirect("walkthrough_detail", slug=slug)
         return JsonResponse({"error": "Комментарий пустой"}, status=400)
 
-    # 🔴 ограничение: 1 комментарий в минуту (как в games)
-    last_comment = (
-        WalkthroughComment.objects
-        .filter(user=request.user, walkthrough=wt)
-        .order_by("-created_at")
-        .first()
-    )
-    if last_comment:
-        delta = timezone.now() - last_comment.created_at
-        if delta < timedelta(minutes=1):
-            seconds_left = 60 - int(delta.total_seconds())
-            msg = f"Можно комментировать раз в минуту. Подождите {seconds_left} сек."
-            if request.headers.get("X-Requested-With") != "XMLHttpRequest":
-                return redirect("walkthrough_detail", slug=slug)
-            return JsonResponse({"error": msg}, status=429)
+    # ограничение частоты (как в games)
+    retry_after = ratelimit.check(request, "comment", scope="walkthroughs")
+    if retry_after:
+        if request.headers.get("X-Requested-With") != "XMLHttpRequest":
+            return redirect("walkthrough_detail", slug=slug)
+        return ratelimit.limited_response(request, retry_after, f"Можно комментировать не так часто. Подождите {retry_after} сек.")
 
     comment = WalkthroughComment.objects.create(
         walkthrough=wt,